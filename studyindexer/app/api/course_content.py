@@ -118,7 +118,7 @@ async def search_courses(
     query: str = Query("", description="Search query for content matching"),
     course_ids: Optional[List[str]] = Query(None, description="Optional list of course IDs to filter search results"),
     limit: int = Query(10, description="Maximum number of results to return"),
-    min_score: float = Query(0.01, description="Minimum relevance score threshold (0.0-1.0)"),
+    min_score: float = Query(0.01, description="Minimum vector similarity for semantic matches (0.0-1.0)"),
     exact_match_boost: float = Query(0.1, description="Boost factor for exact term matches (0.0-1.0)"),
     phrase_match_boost: float = Query(0.15, description="Boost for exact phrase matches (0.0-1.0)"),
     description_threshold: float = Query(0.05, description="Threshold for including course descriptions (0.0-1.0)")
@@ -139,7 +139,7 @@ async def search_courses(
     to StudyAI for generating responses based on course content.
     
     Advanced parameters allow fine-tuning of search behavior:
-    - min_score: Controls minimum relevance needed (lower = more results)
+    - min_score: Controls minimum semantic similarity needed (lower = more results)
     - exact_match_boost: Controls boost for keyword matches
     - phrase_match_boost: Controls boost for exact phrase matches
     - description_threshold: Controls when to include course descriptions
@@ -399,6 +399,9 @@ async def import_course_files(
             "course_ids": []
         }
         
+        # Read every file first so all courses go through one batched ingest
+        courses = []
+        course_files = []
         for file in files:
             try:
                 # Save the file temporarily
@@ -410,11 +413,8 @@ async def import_course_files(
                 # Load the JSON
                 with open(file_path, 'r', encoding='utf-8') as f:
                     course_data = json.load(f)
-                
-                # Add the course content
-                course_id = await course_content_service.add_course_content(course_data)
-                results["total_imported"] += 1
-                results["course_ids"].append(course_id)
+                courses.append(course_data)
+                course_files.append(file.filename)
                 
                 # Clean up the temp file
                 os.remove(file_path)
@@ -425,6 +425,28 @@ async def import_course_files(
                 })
                 results["success"] = False
         
+        if courses:
+            report = await course_content_service.add_courses(courses)
+            results["total_imported"] = len(report["course_ids"])
+            results["course_ids"] = report["course_ids"]
+            results["chunks_added"] = report["chunks_added"]
+            for key in ("added", "updated", "unchanged", "removed"):
+                results[key] = report[key]
+            results["batches"] = report["batches"]
+            for failure in report["failed_courses"]:
+                results["failed_items"].append({
+                    "file": course_files[failure["index"]],
+                    "error": failure["error"]
+                })
+            for failure in report["failed_batches"]:
+                results["failed_items"].append({
+                    "batch": [failure["start"], failure["end"]],
+                    "course_ids": failure["course_ids"],
+                    "error": failure["error"]
+                })
+            if report["failed_courses"] or report["failed_batches"]:
+                results["success"] = False
+        
         return BaseResponse(
             success=results["success"],
             message=f"Imported {results['total_imported']} courses",
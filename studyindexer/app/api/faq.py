@@ -123,7 +123,12 @@ async def add_faq(faq: FAQCreateRequest):
         )
 
 @router.post("/import", response_model=JSONLImportResponse)
-async def import_jsonl(file: UploadFile = File(...)):
+async def import_jsonl(
+    file: UploadFile = File(...),
+    dedup_threshold: Optional[float] = Query(
+        None, ge=0, le=1, description="Drop FAQs at least this similar to an earlier FAQ in the file"
+    )
+):
     """Import FAQs from a JSONL file"""
     if not file.filename.endswith('.jsonl'):
         raise HTTPException(
@@ -144,12 +149,15 @@ async def import_jsonl(file: UploadFile = File(...)):
         user_id = "system"
             
         # Process the file
-        successful_imports, failed_imports = await faq_service.import_jsonl(temp_file_path, user_id)
+        successful_imports, failed_imports, duplicate_items = await faq_service.import_jsonl(
+            temp_file_path, user_id, dedup_threshold=dedup_threshold
+        )
         
         return JSONLImportResponse(
             success=True,
             total_imported=successful_imports,
             failed_items=failed_imports if failed_imports else None,
+            duplicate_items=duplicate_items if duplicate_items else None,
             message=f"Successfully imported {successful_imports} FAQs from {file.filename}"
         )
         
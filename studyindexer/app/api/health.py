@@ -2,6 +2,10 @@
 Health check endpoints for the API
 """
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..services.embeddings import EmbeddingService
+from ..services.chroma import ChromaService
 
 router = APIRouter()
 
@@ -11,4 +15,42 @@ async def health_check():
     """
     Health check endpoint
     """
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness check endpoint
+    
+    Reports "warming" while the embedding model loads and "ready" once it can
+    serve requests. Responds with 503 until the service is ready.
+    """
+    status = EmbeddingService().get_status()
+    return JSONResponse(
+        status_code=200 if status["status"] == "ready" else 503,
+        content=status
+    )
+
+@router.get("/embeddings")
+async def embedding_stats():
+    """
+    Embedding service metrics: model status and cache/batcher counters
+    """
+    embedding_service = EmbeddingService()
+    return {
+        "model": embedding_service.get_status(),
+        "query_cache": embedding_service.get_query_cache_stats(),
+        "embedding_cache": embedding_service.get_cache_stats(),
+        "batcher": embedding_service.get_batcher_stats()
+    }
+
+@router.get("/chroma")
+async def chroma_stats():
+    """
+    ChromaDB metrics: executor queue depth and waits, search result cache counters
+    """
+    chroma_service = ChromaService()
+    return {
+        "executor": chroma_service.get_executor_stats(),
+        "result_cache": chroma_service.get_result_cache_stats()
+    }
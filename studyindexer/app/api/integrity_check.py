@@ -15,6 +15,7 @@
 - GET /search-assignments: Search for assignments with a text query
 - POST /index: Index a new graded assignment for future integrity checks
 - POST /bulk-index: Index multiple assignments in a single request
+- GET /cross-check: Find near-duplicate questions across indexed assignments
 """
 from fastapi import APIRouter, HTTPException, Depends, status, Query, UploadFile, File
 from typing import List, Dict, Any, Optional, Union
@@ -95,29 +96,8 @@ async def get_assignment(assignment_id: str):
 @router.post("/bulk-index", response_model=BaseResponse)
 async def bulk_index_assignments(assignments: List[Dict[str, Any]]):
     """Index multiple assignments in a single request"""
-    results = {
-        "success": True,
-        "total_indexed": 0,
-        "failed": [],
-        "indexed": []
-    }
-    
-    for assignment_data in assignments:
-        try:
-            assignment_id = await integrity_check_service.index_assignment(assignment_data)
-            results["indexed"].append({
-                "assignment_id": assignment_id,
-                "title": assignment_data.get("title", "")
-            })
-            results["total_indexed"] += 1
-        except Exception as e:
-            results["failed"].append({
-                "title": assignment_data.get("title", ""),
-                "error": str(e)
-            })
-    
-    if results["failed"]:
-        results["success"] = False
+    # All questions are embedded in one pass, off the event loop
+    results = await integrity_check_service.index_assignments_bulk(assignments)
     
     return BaseResponse(
         success=True,
@@ -152,6 +132,34 @@ async def list_assignments():
             detail=f"Error retrieving assignments: {str(e)}"
         )
 
+@router.get("/cross-check", response_model=BaseResponse)
+async def cross_check_assignments(
+    course_id: Optional[str] = Query(None, description="Only cross-check assignments of this course"),
+    threshold: float = Query(0.9, ge=0, le=1, description="Minimum similarity for a pair of questions"),
+    limit: int = Query(100, description="Maximum number of pairs to return")
+):
+    """Find questions that nearly duplicate a question of another assignment"""
+    try:
+        pairs = await integrity_check_service.cross_check_assignments(
+            course_id=course_id,
+            threshold=threshold,
+            limit=limit
+        )
+        
+        return BaseResponse(
+            success=True,
+            message=f"Found {len(pairs)} similar question pairs",
+            data={
+                "pairs": pairs,
+                "total": len(pairs)
+            }
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error cross-checking assignments: {str(e)}"
+        )
+
 @router.get("/search-assignments", response_model=BaseResponse)
 async def search_graded_assignments(
     query: Optional[str] = None,
@@ -0,0 +1,99 @@
+"""
+Snapshot API endpoints for StudyIndexerNew
+
+Export a vector collection to a compact snapshot and bulk-load it into this
+or another node without re-embedding anything.
+
+Key Endpoints:
+- GET /: List the snapshots stored under SNAPSHOT_DIR
+- POST /export: Export a collection to a named snapshot under SNAPSHOT_DIR
+- POST /import: Load a named snapshot into a collection
+
+Snapshots are addressed by name only; names resolving outside SNAPSHOT_DIR
+are rejected.
+"""
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from ..models.base import BaseResponse
+from ..services.chroma import ChromaServiceBusyError
+from ..services.snapshot import (
+    list_snapshots, resolve_snapshot_path, export_collection_async, import_snapshot_async
+)
+
+router = APIRouter()
+
+
+class SnapshotExportRequest(BaseModel):
+    """Request to export a collection"""
+    collection: str = Field(..., description="Collection to export")
+    name: Optional[str] = Field(None, description="Snapshot name under SNAPSHOT_DIR (default: the collection name)")
+
+
+class SnapshotImportRequest(BaseModel):
+    """Request to load a snapshot"""
+    name: str = Field(..., description="Snapshot name under SNAPSHOT_DIR")
+    collection: Optional[str] = Field(None, description="Target collection (default: the exported one)")
+    replace: bool = Field(False, description="Drop the target collection before loading")
+
+
+@router.get("/", response_model=BaseResponse)
+async def get_snapshots():
+    """List the snapshots stored under SNAPSHOT_DIR"""
+    snapshots = list_snapshots()
+    return BaseResponse(
+        success=True,
+        message=f"Found {len(snapshots)} snapshots",
+        data={"snapshots": snapshots}
+    )
+
+
+@router.post("/export", response_model=BaseResponse)
+async def export_snapshot(request: SnapshotExportRequest):
+    """Export a collection's ids, embeddings, documents and metadata"""
+    try:
+        output_dir = resolve_snapshot_path(request.name or request.collection)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        result = await export_collection_async(request.collection, output_dir)
+        return BaseResponse(
+            success=True,
+            message=f"Exported {result['count']} records from {request.collection}",
+            data=result
+        )
+    except ChromaServiceBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error exporting snapshot: {str(e)}"
+        )
+
+
+@router.post("/import", response_model=BaseResponse)
+async def import_snapshot(request: SnapshotImportRequest):
+    """Bulk-load a snapshot into a collection"""
+    try:
+        snapshot_dir = resolve_snapshot_path(request.name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        result = await import_snapshot_async(snapshot_dir, request.collection, request.replace)
+        return BaseResponse(
+            success=not result["failed_batches"],
+            message=f"Imported {result['imported']} records into {result['collection']}",
+            data=result
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ChromaServiceBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error importing snapshot: {str(e)}"
+        )
@@ -94,4 +94,5 @@ class JSONLImportResponse(BaseModel):
     success: bool
     total_imported: int
     failed_items: Optional[List[Dict[str, Any]]] = None
+    duplicate_items: Optional[List[Dict[str, Any]]] = None
     message: Optional[str] = None 
\ No newline at end of file
@@ -5,15 +5,136 @@
 import chromadb
 from chromadb.config import Settings
 from chromadb.api.models.Collection import Collection
-from typing import List, Dict, Any, Optional, Tuple, Union
-from .embeddings import EmbeddingService, ChromaEmbeddingFunction
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable, Iterator
+from .vector_backends import create_vector_client
+from .embeddings import EmbeddingService, ChromaEmbeddingFunction, QueryEmbeddingCache
 import logging
 import asyncio
 import concurrent.futures
+import threading
+import time
+import json
+import hashlib
+from collections import deque, OrderedDict
+import numpy as np
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# Embeddings may be passed as nested lists or as a (n, dimensions) numpy array
+Embeddings = Union[List[List[float]], np.ndarray]
+Embedding = Union[List[float], np.ndarray]
+
+
+def _to_chroma_embeddings(embeddings: Optional[Embeddings]) -> Optional[List[List[float]]]:
+    """Convert embeddings to the list form sent to ChromaDB, once, at the client boundary"""
+    if isinstance(embeddings, list) and embeddings and isinstance(embeddings[0], np.ndarray):
+        # A list of 1-D rows, e.g. [embeddings[i]]
+        embeddings = np.stack(embeddings)
+    if isinstance(embeddings, np.ndarray):
+        # float16 arrays are widened so the stored vectors stay float32
+        return embeddings.astype(np.float32, copy=False).tolist()
+    return embeddings
+
+
+def _to_chroma_query(query_embedding: Embedding) -> List[List[float]]:
+    """Wrap a single query embedding as the query_embeddings list ChromaDB expects"""
+    if isinstance(query_embedding, np.ndarray):
+        return query_embedding.astype(np.float32, copy=False).reshape(1, -1).tolist()
+    return [query_embedding]
+
+
+class ChromaServiceBusyError(RuntimeError):
+    """Raised when too many ChromaDB calls are already queued"""
+
+
+class BoundedExecutor:
+    """
+    Shared thread pool for blocking ChromaDB calls made from async code
+    
+    At most max_workers calls run at once and at most max_queue more may wait;
+    beyond that calls are rejected with ChromaServiceBusyError so overload shows
+    up as fast failures instead of an ever-growing queue. Time spent waiting for
+    a worker is recorded for the stats.
+    """
+    
+    def __init__(self, max_workers: int = 8, max_queue: int = 64, thread_name_prefix: str = "chroma"):
+        """Create the pool; threads are started lazily by ThreadPoolExecutor"""
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=thread_name_prefix
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self._wait_ms = deque(maxlen=1024)
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) on the pool and await its result"""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ChromaServiceBusyError(
+                    f"ChromaDB executor is busy ({self._in_flight} calls in flight)"
+                )
+            self._in_flight += 1
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._in_flight - self._running)
+        
+        submitted_at = time.perf_counter()
+        
+        def task():
+            with self._lock:
+                self._running += 1
+                self._wait_ms.append((time.perf_counter() - submitted_at) * 1000)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+        
+        try:
+            return await asyncio.get_event_loop().run_in_executor(self._executor, task)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.completed += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and queue wait counters"""
+        with self._lock:
+            waits = sorted(self._wait_ms)
+            in_flight, running = self._in_flight, self._running
+            stats = {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": running,
+                "queued": in_flight - running,
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
+        if waits:
+            stats["queue_wait_ms"] = {
+                "p50": round(waits[len(waits) // 2], 3),
+                "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3),
+                "max": round(waits[-1], 3),
+                "samples": len(waits)
+            }
+        return stats
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False)
+
+
 class ChromadbResult(BaseModel):
     """Class to hold search results from ChromaDB in a structured way"""
     ids: List[str]
@@ -23,6 +144,174 @@ class ChromadbResult(BaseModel):
     embeddings: Optional[List[List[float]]] = None
 
 
+class SearchResultCache:
+    """
+    Bounded LRU of search results, invalidated by per-collection versions
+    
+    Every write made through ChromaService bumps the collection's version, and
+    the version is part of each cache key, so a write makes all earlier
+    results for that collection unreachable at once. Stale entries then age
+    out of the LRU. The TTL covers writes made outside this process.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        """Create an empty cache"""
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Tuple, Tuple[float, ChromadbResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def make_key(
+        self,
+        collection_name: str,
+        query: Union[str, Embedding, None],
+        where: Optional[Dict[str, Any]],
+        n_results: int,
+        include: Optional[List[str]]
+    ) -> Tuple:
+        """Key for one search; query is the query text or the query embedding"""
+        if isinstance(query, str) or query is None:
+            # Same normalization as the query embedding cache: case can change the embedding
+            query_key = "text:" + QueryEmbeddingCache.normalize(query or "")
+        else:
+            vector = np.asarray(query, dtype=np.float32)
+            query_key = "vec:" + hashlib.blake2b(vector.tobytes(), digest_size=16).hexdigest()
+        where_key = json.dumps(where, sort_keys=True, default=str) if where else ""
+        with self._lock:
+            version = self._versions.get(collection_name, 0)
+        return (collection_name, version, query_key, where_key, n_results, tuple(include or ()))
+    
+    def get(self, key: Tuple) -> Optional[ChromadbResult]:
+        """Return a deep copy of the cached result, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl_seconds > 0 and time.monotonic() - entry[0] > self.ttl_seconds):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = entry[1]
+        # Callers annotate result metadatas in place, so never hand out the cached object
+        return result.model_copy(deep=True)
+    
+    def put(self, key: Tuple, result: ChromadbResult) -> None:
+        """Store a copy of a result unless its collection changed since the key was made"""
+        result = result.model_copy(deep=True)
+        with self._lock:
+            if key[1] != self._versions.get(key[0], 0):
+                return
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, collection_name: str) -> None:
+        """Bump the collection's version so its cached results are no longer served"""
+        with self._lock:
+            self._versions[collection_name] = self._versions.get(collection_name, 0) + 1
+            self.invalidations += 1
+    
+    def clear(self) -> None:
+        """Remove every cached result"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+def _parse_query_result(result: Any, index: int = 0) -> ChromadbResult:
+    """
+    Turn row `index` of a ChromaDB query response into a ChromadbResult
+    
+    Fields that were not included or are malformed are filled with defaults
+    of the right length, so callers can always zip ids, distances, metadatas
+    and documents together.
+    """
+    # Check if result is None or missing expected keys
+    if result is None or not isinstance(result, dict):
+        logger.error("ChromaDB query returned None or unexpected type")
+        # Return an empty result to prevent downstream errors
+        return ChromadbResult(ids=[], documents=[], metadatas=[], distances=[])
+    
+    def row(key: str):
+        rows = result.get(key)
+        return rows[index] if rows and isinstance(rows, list) and len(rows) > index else None
+    
+    # Always expect 'ids' to be present in a valid non-error response
+    ids = row("ids") or []
+    num_results = len(ids)
+    
+    # Safely get other fields based on potential inclusion
+    distances = row("distances")
+    metadatas = row("metadatas")
+    documents = row("documents")
+    embeddings = row("embeddings")
+    
+    # Ensure all mandatory lists have the same length as ids, providing defaults if necessary
+    distances = distances if distances is not None and len(distances) == num_results else ([0.0] * num_results)
+    metadatas = metadatas if metadatas is not None and len(metadatas) == num_results else ([{}] * num_results)
+    documents = documents if documents is not None and len(documents) == num_results else ([""] * num_results)
+    # Embeddings are optional
+    embeddings = embeddings if embeddings is not None and len(embeddings) == num_results and num_results else None
+    
+    return ChromadbResult(
+        ids=ids,
+        distances=distances,
+        metadatas=metadatas,
+        documents=documents,
+        embeddings=embeddings
+    )
+
+
+def _parse_get_result(result: Any) -> ChromadbResult:
+    """Turn a ChromaDB get response into a ChromadbResult (distances are zero placeholders)"""
+    if result is None or not isinstance(result, dict):
+        logger.error("ChromaDB get returned None or unexpected type")
+        return ChromadbResult(ids=[], documents=[], metadatas=[], distances=[])
+    
+    ids = result.get("ids") or []
+    num_results = len(ids)
+    metadatas = result.get("metadatas")
+    documents = result.get("documents")
+    embeddings = result.get("embeddings")
+    
+    metadatas = [m or {} for m in metadatas] if metadatas is not None and len(metadatas) == num_results else ([{}] * num_results)
+    documents = [d or "" for d in documents] if documents is not None and len(documents) == num_results else ([""] * num_results)
+    if embeddings is not None and len(embeddings) == num_results and num_results:
+        embeddings = embeddings.tolist() if isinstance(embeddings, np.ndarray) else embeddings
+    else:
+        embeddings = None
+    
+    return ChromadbResult(
+        ids=ids,
+        documents=documents,
+        metadatas=metadatas,
+        distances=[0.0] * num_results,  # get doesn't return distances
+        embeddings=embeddings
+    )
+
+
 class ChromaService:
     """Service for managing interactions with ChromaDB"""
     
@@ -51,22 +340,68 @@ def __init__(self):
         self.embedding_service = EmbeddingService()
         self.embedding_function = ChromaEmbeddingFunction(self.embedding_service)
         
+        # One bounded pool for every async method instead of a new thread pool per call
+        self.executor = BoundedExecutor(
+            max_workers=int(os.environ.get("CHROMA_EXECUTOR_WORKERS", "8")),
+            max_queue=int(os.environ.get("CHROMA_EXECUTOR_MAX_QUEUE", "64"))
+        )
+        
+        # Search results keyed by collection version, invalidated on every write
+        self.result_cache = None
+        if os.environ.get("CHROMA_RESULT_CACHE_ENABLED", "true").lower() == "true":
+            self.result_cache = SearchResultCache(
+                max_entries=int(os.environ.get("CHROMA_RESULT_CACHE_MAX_ENTRIES", "1024")),
+                ttl_seconds=float(os.environ.get("CHROMA_RESULT_CACHE_TTL_SECONDS", "300"))
+            )
+        
+        # http (chroma server), persistent (embedded chroma) or local (in-process index)
+        self.vector_backend = os.environ.get("VECTOR_BACKEND", "http").lower()
+        
         try:
-            # Initialize client with new API format
-            logger.info("Initializing ChromaDB HTTP client...")
-            self.client = chromadb.HttpClient(
+            logger.info(f"Initializing vector store client ({self.vector_backend})...")
+            self.client = create_vector_client(
+                self.vector_backend,
                 host="127.0.0.1",
-                port=int(os.environ.get("CHROMA_PORT", "8000"))
+                port=int(os.environ.get("CHROMA_PORT", "8000")),
+                persist_dir=self.persistent_dir
             )
             self._initialized = True
             self.collections = {}  # Cache for collections
-            logger.info("ChromaDB initialized successfully with HTTP client")
+            logger.info(f"ChromaDB initialized successfully with {self.vector_backend} backend")
         except Exception as e:
             logger.error(f"Error initializing ChromaDB: {str(e)}")
             self.client = None
             self._initialized = False
             raise
     
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Get queue depth and queue wait metrics for the shared executor"""
+        return self.executor.stats()
+    
+    def get_result_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the search result cache"""
+        if self.result_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.result_cache.stats()}
+    
+    def _collection_changed(self, collection_name: str) -> None:
+        """Invalidate cached search results after a write to a collection"""
+        if self.result_cache is not None:
+            self.result_cache.invalidate(collection_name)
+    
+    def _result_cache_key(
+        self,
+        collection_name: str,
+        query: Union[str, Embedding, None],
+        where: Optional[Dict[str, Any]],
+        n_results: int,
+        include: Optional[List[str]]
+    ) -> Optional[Tuple]:
+        """Cache key for a search, or None when the result cache is disabled"""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.make_key(collection_name, query, where, n_results, include)
+    
     # Synchronous wrapper methods
     def get_or_create_collection_sync(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> Collection:
         """Synchronous wrapper for get_or_create_collection"""
@@ -101,7 +436,7 @@ def add_documents_sync(
         documents: List[str],
         metadatas: Optional[List[Dict[str, Any]]] = None,
         ids: Optional[List[str]] = None,
-        embeddings: Optional[List[List[float]]] = None
+        embeddings: Optional[Embeddings] = None
     ) -> List[str]:
         """Synchronous wrapper for add_documents"""
         try:
@@ -120,14 +455,81 @@ def add_documents_sync(
                 documents=documents,
                 metadatas=metadatas,
                 ids=ids,
-                embeddings=embeddings
+                embeddings=_to_chroma_embeddings(embeddings)
             )
             
+            self._collection_changed(collection_name)
             logger.info(f"Successfully added {len(documents)} documents to collection {collection_name}")
             return ids
         except Exception as e:
             logger.error(f"Error in add_documents_sync: {str(e)}")
             raise
+    
+    def get_max_batch_size(self) -> int:
+        """Largest number of records the server accepts in one add/upsert"""
+        if getattr(self, "_max_batch_size", None) is None:
+            configured = int(os.environ.get("CHROMA_UPSERT_BATCH_SIZE", "1000"))
+            try:
+                server_limit = self.client.max_batch_size
+            except Exception as e:
+                logger.warning(f"Could not read ChromaDB max batch size: {str(e)}")
+                server_limit = configured
+            self._max_batch_size = max(1, min(configured, server_limit))
+        return self._max_batch_size
+    
+    def upsert_documents_sync(
+        self,
+        collection_name: str,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        embeddings: Optional[Embeddings] = None,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Insert or replace documents in batches the server accepts
+        
+        A failing batch does not stop the remaining ones; each failure is
+        reported with the ids it covered.
+        
+        Returns:
+            Dictionary with upserted count, batch count and failed_batches
+        """
+        if not self._initialized or self.client is None:
+            raise ValueError("ChromaDB client not initialized")
+        
+        if ids is None:
+            ids = [f"doc_{i}" for i in range(len(documents))]
+        batch_size = min(batch_size or self.get_max_batch_size(), self.get_max_batch_size())
+        collection = self.get_or_create_collection_sync(collection_name)
+        
+        report = {"upserted": 0, "batches": 0, "failed_batches": []}
+        for start in range(0, len(ids), batch_size):
+            end = min(start + batch_size, len(ids))
+            report["batches"] += 1
+            try:
+                collection.upsert(
+                    ids=ids[start:end],
+                    documents=documents[start:end],
+                    metadatas=metadatas[start:end] if metadatas is not None else None,
+                    embeddings=_to_chroma_embeddings(embeddings[start:end]) if embeddings is not None else None
+                )
+                report["upserted"] += end - start
+            except Exception as e:
+                logger.error(f"Upsert batch {start}-{end} into {collection_name} failed: {str(e)}")
+                report["failed_batches"].append({
+                    "start": start,
+                    "end": end,
+                    "ids": ids[start:end],
+                    "error": str(e)
+                })
+        
+        self._collection_changed(collection_name)
+        logger.info(
+            f"Upserted {report['upserted']}/{len(ids)} documents into {collection_name} "
+            f"in {report['batches']} batches"
+        )
+        return report
             
     def search_sync(
         self,
@@ -135,7 +537,7 @@ def search_sync(
         query: str,
         n_results: int = 10,
         where: Optional[Dict[str, Any]] = None,
-        query_embedding: Optional[List[float]] = None,
+        query_embedding: Optional[Embedding] = None,
         include: Optional[List[str]] = None
     ) -> ChromadbResult:
         """Synchronous wrapper for search"""
@@ -146,6 +548,16 @@ def search_sync(
             logger.info(f"Searching collection {collection_name} with query: '{query}'")
             if where:
                 logger.info(f"Using filter: {where}")
+            
+            # Serve repeated searches from the result cache
+            cache_key = self._result_cache_key(
+                collection_name, query_embedding if query_embedding is not None else query,
+                where, n_results, include
+            )
+            if cache_key is not None:
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    return cached
                 
             collection = self.get_or_create_collection_sync(collection_name)
             
@@ -169,11 +581,11 @@ def search_sync(
             if query_embedding is not None:
                 logger.info("Using embedding-based search")
                 # Use embedding search
-                query_params["query_embeddings"] = [query_embedding]
+                query_params["query_embeddings"] = _to_chroma_query(query_embedding)
             elif query and len(query.strip()) > 0:
                 logger.info("Using text-based search")
-                # Use text search if no embedding but valid query text
-                query_params["query_texts"] = [query]
+                # Embed the query text ourselves so repeated queries hit the query cache
+                query_params["query_embeddings"] = [self.embedding_service.embed_query(query)]
             else:
                 logger.info("Using empty query fallback")
                 # Emergency fallback - use empty query
@@ -188,48 +600,73 @@ def search_sync(
                 # Provide detailed error for debugging
                 raise Exception(f"ChromaDB query failed: {str(e)} with params: {query_params}")
                 
-            # Check if result is None or missing expected keys
-            if result is None or not isinstance(result, dict):
-                logger.error("ChromaDB query returned None or unexpected type")
-                # Return an empty result to prevent downstream errors
-                return ChromadbResult(ids=[], documents=[], metadatas=[], distances=[])
-
-            # Process results, handling potential missing keys or None values gracefully
-            # Always expect 'ids' to be present in a valid non-error response
-            ids_list = result.get("ids")
-            ids = ids_list[0] if ids_list and isinstance(ids_list, list) and len(ids_list) > 0 else []
-            num_results = len(ids)
-
-            # Safely get other fields based on potential inclusion
-            distances_list = result.get("distances")
-            distances = distances_list[0] if distances_list and isinstance(distances_list, list) and len(distances_list) > 0 else ([0.0] * num_results)
-            
-            metadatas_list = result.get("metadatas")
-            metadatas = metadatas_list[0] if metadatas_list and isinstance(metadatas_list, list) and len(metadatas_list) > 0 else ([{}] * num_results)
-            
-            documents_list = result.get("documents")
-            documents = documents_list[0] if documents_list and isinstance(documents_list, list) and len(documents_list) > 0 else ([""] * num_results)
-            
-            embeddings_list = result.get("embeddings")
-            embeddings = embeddings_list[0] if embeddings_list and isinstance(embeddings_list, list) and len(embeddings_list) > 0 else None
-
-            # Ensure all mandatory lists have the same length as ids, providing defaults if necessary
-            distances = distances if len(distances) == num_results else ([0.0] * num_results)
-            metadatas = metadatas if len(metadatas) == num_results else ([{}] * num_results)
-            documents = documents if len(documents) == num_results else ([""] * num_results)
-            # Embeddings are optional
-            embeddings = embeddings if embeddings and len(embeddings) == num_results else None
-
-            return ChromadbResult(
-                ids=ids,
-                distances=distances,
-                metadatas=metadatas,
-                documents=documents,
-                embeddings=embeddings
-            )
+            parsed = _parse_query_result(result)
+            if cache_key is not None:
+                self.result_cache.put(cache_key, parsed)
+            return parsed
         except Exception as e:
             logger.error(f"Error in search_sync: {str(e)}")
             raise
+    
+    def search_many_sync(
+        self,
+        collection_name: str,
+        query_embeddings: Embeddings,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> List[ChromadbResult]:
+        """
+        Search a collection with several query embeddings in one round trip
+        
+        Args:
+            collection_name: Collection to search
+            query_embeddings: (n, dimensions) array or list of query vectors
+            n_results: Results per query
+            where: Filter applied to every query
+            include: Fields to return, defaults to metadatas, documents and distances
+            
+        Returns:
+            One ChromadbResult per query embedding, in input order
+        """
+        if not self._initialized or self.client is None:
+            raise ValueError("ChromaDB client not initialized")
+        if query_embeddings is None or len(query_embeddings) == 0:
+            return []
+        
+        # Only queries missing from the result cache go to ChromaDB
+        results: List[Optional[ChromadbResult]] = [None] * len(query_embeddings)
+        cache_keys = [
+            self._result_cache_key(collection_name, embedding, where, n_results, include)
+            for embedding in query_embeddings
+        ]
+        if self.result_cache is not None:
+            results = [self.result_cache.get(key) for key in cache_keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        
+        collection = self.get_or_create_collection_sync(collection_name)
+        query_params = {
+            "query_embeddings": _to_chroma_embeddings([query_embeddings[i] for i in missing]),
+            "n_results": n_results,
+            "include": include if include is not None else ["metadatas", "documents", "distances"]
+        }
+        if where is not None:
+            query_params["where"] = where
+        
+        try:
+            result = collection.query(**query_params)
+        except Exception as e:
+            logger.error(f"Error in search_many_sync: {str(e)}")
+            raise Exception(f"ChromaDB query failed: {str(e)} for {len(missing)} queries")
+        
+        logger.info(f"Batched search of {collection_name} with {len(missing)} queries")
+        for row, i in enumerate(missing):
+            results[i] = _parse_query_result(result, row)
+            if cache_keys[i] is not None:
+                self.result_cache.put(cache_keys[i], results[i])
+        return results
             
     def get_sync(
         self,
@@ -251,37 +688,7 @@ def get_sync(
             # Get documents directly using the include parameter
             result = collection.get(ids=ids, include=include)
                 
-            # Process the result safely, handling potentially missing keys
-            if result is None or not isinstance(result, dict):
-                logger.error("ChromaDB get returned None or unexpected type")
-                return ChromadbResult(ids=[], documents=[], metadatas=[], distances=[])
-
-            result_ids = result.get("ids")
-            ids_list = result_ids if result_ids and isinstance(result_ids, list) else []
-            num_results = len(ids_list)
-            
-            # Safely get other fields based on what was included
-            metadatas_list = result.get("metadatas")
-            metadatas = metadatas_list if metadatas_list and isinstance(metadatas_list, list) else ([{}] * num_results)
-            
-            documents_list = result.get("documents")
-            documents = documents_list if documents_list and isinstance(documents_list, list) else ([""] * num_results)
-            
-            embeddings_list = result.get("embeddings")
-            embeddings = embeddings_list[0] if embeddings_list and isinstance(embeddings_list, list) and len(embeddings_list) > 0 and embeddings_list[0] is not None else None # get can return [None]
-            
-            # Ensure lists have the correct length
-            metadatas = metadatas if len(metadatas) == num_results else ([{}] * num_results)
-            documents = documents if len(documents) == num_results else ([""] * num_results)
-            embeddings = embeddings if embeddings and len(embeddings) == num_results else None
-
-            return ChromadbResult(
-                ids=ids_list,
-                documents=documents,
-                metadatas=metadatas,
-                distances=[0.0] * num_results,  # get doesn't return distances
-                embeddings=embeddings
-            )
+            return _parse_get_result(result)
         except Exception as e:
             logger.error(f"Error in get_sync: {str(e)}")
             raise
@@ -295,17 +702,14 @@ async def get_or_create_collection(self, name: str, metadata: Optional[Dict[str,
         if name in self.collections:
             return self.collections[name]
             
-        # This operation is blocking, run it in a thread pool
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            collection = await loop.run_in_executor(
-                executor, 
-                lambda: self.client.get_or_create_collection(
-                    name=name,
-                    metadata=metadata,
-                    embedding_function=self.embedding_function
-                )
+        # This operation is blocking, run it on the shared executor
+        collection = await self.executor.run(
+            lambda: self.client.get_or_create_collection(
+                name=name,
+                metadata=metadata,
+                embedding_function=self.embedding_function
             )
+        )
             
         # Cache the collection
         self.collections[name] = collection
@@ -318,26 +722,13 @@ async def get_collection_info(self, name: str) -> Dict[str, Any]:
             
         collection = await self.get_or_create_collection(name)
         
-        # This operation is blocking, run it in a thread pool
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            
-            # Get collection count
-            count = await loop.run_in_executor(
-                executor,
-                lambda: len(collection.get()["ids"]) if collection.get()["ids"] else 0
-            )
-            
-            # Get collection metadata
-            metadata = await loop.run_in_executor(
-                executor,
-                lambda: collection.metadata
-            )
-            
+        # Counting is a blocking HTTP call, run it on the shared executor
+        count = await self.executor.run(collection.count)
+        
         return {
             "name": name,
             "count": count,
-            "metadata": metadata
+            "metadata": collection.metadata
         }
     
     async def add_documents(
@@ -346,7 +737,7 @@ async def add_documents(
         documents: List[str],
         metadatas: Optional[List[Dict[str, Any]]] = None,
         ids: Optional[List[str]] = None,
-        embeddings: Optional[List[List[float]]] = None
+        embeddings: Optional[Embeddings] = None
     ) -> List[str]:
         """Add documents to a collection"""
         if not self._initialized or self.client is None:
@@ -358,33 +749,57 @@ async def add_documents(
         if ids is None:
             ids = [f"doc_{i}" for i in range(len(documents))]
             
-        # Run in a thread pool
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                executor,
-                lambda: collection.add(
-                    documents=documents,
-                    metadatas=metadatas,
-                    ids=ids,
-                    embeddings=embeddings
-                )
+        # Run on the shared executor
+        result = await self.executor.run(
+            lambda: collection.add(
+                documents=documents,
+                metadatas=metadatas,
+                ids=ids,
+                embeddings=_to_chroma_embeddings(embeddings)
             )
+        )
+        self._collection_changed(collection_name)
             
         return ids
     
+    async def upsert_documents(
+        self,
+        collection_name: str,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        embeddings: Optional[Embeddings] = None,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Async wrapper for upsert_documents_sync"""
+        return await self.executor.run(
+            lambda: self.upsert_documents_sync(
+                collection_name, documents, metadatas, ids, embeddings, batch_size
+            )
+        )
+    
     async def search(
         self,
         collection_name: str,
         query: str,
         n_results: int = 10,
         where: Optional[Dict[str, Any]] = None,
-        query_embedding: Optional[List[float]] = None,
+        query_embedding: Optional[Embedding] = None,
         include: Optional[List[str]] = None
     ) -> ChromadbResult:
         """Search for documents in a collection"""
         if not self._initialized or self.client is None:
             raise ValueError("ChromaDB client not initialized")
+        
+        # Serve repeated searches from the result cache without touching the executor
+        cache_key = self._result_cache_key(
+            collection_name, query_embedding if query_embedding is not None else query,
+            where, n_results, include
+        )
+        if cache_key is not None:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
             
         collection = await self.get_or_create_collection(collection_name)
         
@@ -407,92 +822,85 @@ async def search(
         # Determine which query method to use - prefer embeddings if available
         if query_embedding is not None:
             # Use embedding search
-            query_params["query_embeddings"] = [query_embedding]
+            query_params["query_embeddings"] = _to_chroma_query(query_embedding)
         elif query and len(query.strip()) > 0:
-            # Use text search if no embedding but valid query text
-            query_params["query_texts"] = [query]
+            # Embed the query text ourselves, through the query cache and batcher, as search_sync does
+            query_params["query_embeddings"] = [await self.embedding_service.embed_query_async(query)]
         else:
             # Emergency fallback - use empty query
             query_params["query_texts"] = [""]
             
         try:
-            # Run in a thread pool
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                loop = asyncio.get_event_loop()
-                logger.debug(f"Executing async ChromaDB query with params: {query_params}")
-                result = await loop.run_in_executor(
-                    executor,
-                    lambda: collection.query(**query_params)
-                )
+            # Run on the shared executor
+            logger.debug(f"Executing async ChromaDB query with params: {query_params}")
+            result = await self.executor.run(
+                lambda: collection.query(**query_params)
+            )
+        except ChromaServiceBusyError:
+            raise
         except Exception as e:
             # Provide detailed error for debugging
             raise Exception(f"ChromaDB query failed: {str(e)} with params: {query_params}")
 
-        # Check if result is None or missing expected keys
-        if result is None or not isinstance(result, dict):
-            logger.error("Async ChromaDB query returned None or unexpected type")
-            # Return an empty result to prevent downstream errors
-            return ChromadbResult(ids=[], documents=[], metadatas=[], distances=[])
-            
-        # Process results, handling potential missing keys or None values gracefully
-        ids_list = result.get("ids")
-        ids = ids_list[0] if ids_list and isinstance(ids_list, list) and len(ids_list) > 0 else []
-        num_results = len(ids)
-
-        # Safely get other fields based on potential inclusion
-        distances_list = result.get("distances")
-        distances = distances_list[0] if distances_list and isinstance(distances_list, list) and len(distances_list) > 0 else ([0.0] * num_results)
-        
-        metadatas_list = result.get("metadatas")
-        metadatas = metadatas_list[0] if metadatas_list and isinstance(metadatas_list, list) and len(metadatas_list) > 0 else ([{}] * num_results)
-        
-        documents_list = result.get("documents")
-        documents = documents_list[0] if documents_list and isinstance(documents_list, list) and len(documents_list) > 0 else ([""] * num_results)
-        
-        embeddings_list = result.get("embeddings")
-        embeddings = embeddings_list[0] if embeddings_list and isinstance(embeddings_list, list) and len(embeddings_list) > 0 else None
-
-        # Ensure all mandatory lists have the same length as ids, providing defaults if necessary
-        distances = distances if len(distances) == num_results else ([0.0] * num_results)
-        metadatas = metadatas if len(metadatas) == num_results else ([{}] * num_results)
-        documents = documents if len(documents) == num_results else ([""] * num_results)
-        # Embeddings are optional
-        embeddings = embeddings if embeddings and len(embeddings) == num_results else None
-
-        return ChromadbResult(
-            ids=ids,
-            distances=distances,
-            metadatas=metadatas,
-            documents=documents,
-            embeddings=embeddings
+        parsed = _parse_query_result(result)
+        if cache_key is not None:
+            self.result_cache.put(cache_key, parsed)
+        return parsed
+    
+    async def search_many(
+        self,
+        collection_name: str,
+        query_embeddings: Embeddings,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> List[ChromadbResult]:
+        """Async wrapper for search_many_sync"""
+        return await self.executor.run(
+            lambda: self.search_many_sync(collection_name, query_embeddings, n_results, where, include)
         )
     
-    async def update(
+    def update_sync(
         self,
         collection_name: str,
         ids: List[str],
         documents: Optional[List[str]] = None,
         metadatas: Optional[List[Dict[str, Any]]] = None,
-        embeddings: Optional[List[List[float]]] = None
+        embeddings: Optional[Embeddings] = None
     ) -> None:
-        """Update documents in a collection"""
+        """Update existing documents in batches the server accepts; fields left as None are kept"""
         if not self._initialized or self.client is None:
             raise ValueError("ChromaDB client not initialized")
-            
-        collection = await self.get_or_create_collection(collection_name)
         
-        # Run in a thread pool
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                executor,
-                lambda: collection.update(
-                    ids=ids,
-                    documents=documents,
-                    metadatas=metadatas,
-                    embeddings=embeddings
-                )
+        collection = self.get_or_create_collection_sync(collection_name)
+        batch_size = self.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            end = min(start + batch_size, len(ids))
+            collection.update(
+                ids=ids[start:end],
+                documents=documents[start:end] if documents is not None else None,
+                metadatas=metadatas[start:end] if metadatas is not None else None,
+                embeddings=_to_chroma_embeddings(embeddings[start:end]) if embeddings is not None else None
             )
+        self._collection_changed(collection_name)
+    
+    async def update(
+        self,
+        collection_name: str,
+        ids: List[str],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        embeddings: Optional[Embeddings] = None
+    ) -> None:
+        """Update documents in a collection"""
+        await self.executor.run(
+            self.update_sync,
+            collection_name,
+            ids,
+            documents,
+            metadatas,
+            embeddings
+        )
     
     async def delete(
         self,
@@ -506,43 +914,73 @@ async def delete(
             
         collection = await self.get_or_create_collection(collection_name)
         
-        # Run in a thread pool
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                executor,
-                lambda: collection.delete(
-                    ids=ids,
-                    where=where
-                )
+        # Run on the shared executor
+        await self.executor.run(
+            lambda: collection.delete(
+                ids=ids,
+                where=where
             )
+        )
+        self._collection_changed(collection_name)
     
     async def get_metadata_keys(self, collection_name: str, key: str) -> List[str]:
         """Get all unique values for a metadata key in a collection"""
         if not self._initialized or self.client is None:
             raise ValueError("ChromaDB client not initialized")
-            
-        # Get all documents with their metadata
-        collection = await self.get_or_create_collection(collection_name)
         
-        # Run in a thread pool
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                executor,
-                lambda: collection.get(
-                    limit=10000  # Set a reasonable limit
-                )
-            )
+        def collect_values():
+            # Metadata-only scan, page by page
+            values = set()
+            for page in self.iter_collection(collection_name, include=["metadatas"]):
+                for metadata in page.metadatas:
+                    if key in metadata:
+                        values.add(metadata[key])
+            return list(values)
+        
+        # Run on the shared executor
+        return await self.executor.run(collect_values)
+    
+    def iter_collection(
+        self,
+        collection_name: str,
+        page_size: Optional[int] = None,
+        include: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        offset: int = 0
+    ) -> Iterator[ChromadbResult]:
+        """
+        Page through a collection without loading it into memory at once
+        
+        Args:
+            collection_name: Collection to read
+            page_size: Records fetched per request (default CHROMA_PAGE_SIZE)
+            include: Fields to fetch, e.g. ["metadatas"] for metadata-only scans
+            where: Optional metadata filter
+            offset: Number of matching records to skip first
             
-        # Extract unique values for the specified key
-        values = set()
-        if "metadatas" in result and result["metadatas"]:
-            for metadata in result["metadatas"]:
-                if metadata and key in metadata:
-                    values.add(metadata[key])
-                    
-        return list(values)
+        Yields:
+            One ChromadbResult per page, in collection order
+        """
+        if not self._initialized or self.client is None:
+            raise ValueError("ChromaDB client not initialized")
+        
+        page_size = page_size or int(os.environ.get("CHROMA_PAGE_SIZE", "1000"))
+        include = include if include is not None else ["metadatas", "documents"]
+        collection = self.get_or_create_collection_sync(collection_name)
+        
+        while True:
+            page = _parse_get_result(collection.get(
+                where=where,
+                limit=page_size,
+                offset=offset,
+                include=include
+            ))
+            if not page.ids:
+                return
+            yield page
+            if len(page.ids) < page_size:
+                return
+            offset += page_size
     
     def get_collection_docs_sync(
         self,
@@ -554,45 +992,16 @@ def get_collection_docs_sync(
     ) -> ChromadbResult:
         """Get all documents from a collection with pagination"""
         try:
-            if not self._initialized or self.client is None:
-                raise ValueError("ChromaDB client not initialized")
-                
-            collection = self.get_or_create_collection_sync(collection_name)
-            
-            # Use get() with no ids to get all documents, then handle pagination manually
-            result = collection.get()
-            
-            if not result or not result.get("ids"):
-                return ChromadbResult(
-                    ids=[],
-                    documents=[],
-                    metadatas=[],
-                    distances=[]
-                )
-            
-            # Apply pagination
-            total_docs = len(result["ids"])
-            end_idx = min(offset + limit, total_docs)
-            
-            if offset >= total_docs:
-                # Empty result if offset is beyond available documents
-                return ChromadbResult(
-                    ids=[],
-                    documents=[],
-                    metadatas=[],
-                    distances=[]
-                )
+            include = ["documents"]
+            if include_metadata:
+                include.append("metadatas")
+            if include_values:
+                include.append("embeddings")
             
-            # Extract paginated results
-            paginated_ids = result["ids"][offset:end_idx]
-            paginated_documents = result["documents"][offset:end_idx] if "documents" in result else []
-            paginated_metadatas = result["metadatas"][offset:end_idx] if "metadatas" in result else []
-            
-            return ChromadbResult(
-                ids=paginated_ids,
-                documents=paginated_documents,
-                metadatas=paginated_metadatas,
-                distances=[0.0] * len(paginated_ids)  # Placeholder for distances
+            # Fetch only the requested page instead of the whole collection
+            return next(
+                self.iter_collection(collection_name, page_size=limit, include=include, offset=offset),
+                ChromadbResult(ids=[], documents=[], metadatas=[], distances=[])
             )
         except Exception as e:
             logger.error(f"Error in get_collection_docs_sync: {str(e)}")
@@ -618,12 +1027,46 @@ def delete_sync(
                 collection.delete(where=where)
             else:
                 raise ValueError("Either IDs or where filter must be provided")
+            self._collection_changed(collection_name)
                 
             return True
         except Exception as e:
             logger.error(f"Error in delete_sync: {str(e)}")
             raise 
 
+    def delete_where_sync(self, collection_name: str, where: Dict[str, Any]) -> int:
+        """
+        Delete every document matching a metadata filter
+        
+        Matching ids are counted with an ids-only get (no documents, metadatas or
+        embeddings are transferred) and removed with a single filtered delete.
+        
+        Returns:
+            Number of documents deleted
+        """
+        if not self._initialized or self.client is None:
+            raise ValueError("ChromaDB client not initialized")
+        if not where:
+            raise ValueError("A where filter is required, use delete_collection_sync to empty a collection")
+        
+        collection = self.get_or_create_collection_sync(collection_name)
+        count = len(collection.get(where=where, include=[]).get("ids") or [])
+        if count:
+            collection.delete(where=where)
+            self._collection_changed(collection_name)
+        logger.info(f"Deleted {count} documents from {collection_name} matching {where}")
+        return count
+    
+    async def delete_where(self, collection_name: str, where: Dict[str, Any]) -> int:
+        """Async wrapper for delete_where_sync"""
+        return await self.executor.run(self.delete_where_sync, collection_name, where)
+    
+    def list_collection_names(self) -> List[str]:
+        """Names of all collections in the store"""
+        if not self._initialized or self.client is None:
+            raise ValueError("ChromaDB client not initialized")
+        return [collection.name for collection in self.client.list_collections()]
+    
     def delete_collection_sync(self, collection_name: str) -> bool:
         """Delete an entire collection synchronously"""
         try:
@@ -636,6 +1079,7 @@ def delete_collection_sync(self, collection_name: str) -> bool:
             # Remove from cache if exists
             if collection_name in self.collections:
                 del self.collections[collection_name]
+            self._collection_changed(collection_name)
                 
             return True
         except Exception as e:
@@ -644,13 +1088,10 @@ def delete_collection_sync(self, collection_name: str) -> bool:
             
     async def delete_collection(self, collection_name: str) -> bool:
         """Async wrapper for delete_collection_sync"""
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                executor,
-                self.delete_collection_sync,
-                collection_name
-            )
+        return await self.executor.run(
+            self.delete_collection_sync,
+            collection_name
+        )
             
     def reset_all_sync(self) -> bool:
         """Delete all collections and reset ChromaDB state synchronously"""
@@ -670,6 +1111,8 @@ def reset_all_sync(self) -> bool:
                     
             # Clear collection cache
             self.collections = {}
+            if self.result_cache is not None:
+                self.result_cache.clear()
             
             return True
         except Exception as e:
@@ -678,9 +1121,6 @@ def reset_all_sync(self) -> bool:
             
     async def reset_all(self) -> bool:
         """Async wrapper for reset_all_sync"""
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                executor,
-                self.reset_all_sync
-            ) 
\ No newline at end of file
+        return await self.executor.run(
+            self.reset_all_sync
+        ) 
\ No newline at end of file
@@ -24,21 +24,61 @@
 """
 import os
 import json
+import asyncio
 import logging
 import uuid
 import time
 import re
 import math  # Import math module at the top level
-from typing import List, Dict, Any, Optional, Union, Set
+import hashlib
+import threading
+import concurrent.futures
+from typing import List, Dict, Any, Optional, Union, Set, Tuple
 from datetime import datetime
 
 from ..models.course_selector import CourseInfo, CourseTopic, CourseContent, WeekOverview
-from .chroma import ChromaService
+from .chroma import ChromaService, ChromadbResult
 from .embeddings import EmbeddingService
+from .course_store import CourseStore, tokenize_terms
+from .lexical_index import BM25Index, reciprocal_rank_fusion, tokenize as lexical_tokenize
 from app.services.embeddings import TextChunker
 
 logger = logging.getLogger(__name__)
 
+# Weight of a result found through an acronym/synonym variant relative to the original query
+EXPANSION_SCORE_WEIGHT = 0.95
+
+# Reciprocal-rank fusion constant for combining the vector and BM25 rankings
+RRF_K = 60
+
+# Metadata keys that hold the hashes themselves and are left out of the metadata hash
+HASH_KEYS = ("content_hash", "metadata_hash")
+
+
+def _record_hashes(model_name: str, document: str, metadata: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Hashes used to skip unchanged records on re-index
+    
+    content_hash covers the text and the embedding model, so a change means the
+    record must be re-embedded; metadata_hash covers everything else.
+    """
+    content = hashlib.blake2b(f"{model_name}\0{document}".encode("utf-8"), digest_size=16)
+    fields = {key: value for key, value in metadata.items() if key not in HASH_KEYS}
+    meta = hashlib.blake2b(json.dumps(fields, sort_keys=True, default=str).encode("utf-8"), digest_size=16)
+    return {"content_hash": content.hexdigest(), "metadata_hash": meta.hexdigest()}
+
+
+def _join_terms(value: Any) -> str:
+    """Comma-separated text of a list field (keywords, concepts); strings pass through and None is empty"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value if item is not None)
+    return str(value)
+
+
 class CourseContentService:
     """Service for managing course content"""
     
@@ -63,6 +103,32 @@ def __init__(self):
         # Set collection name for course content data
         self.collection_name = "course-content"
         
+        # Course- and week-level fields are stored once here instead of in every chunk
+        self.store = CourseStore(
+            path=os.environ.get("COURSE_STORE_PATH", "./data/course_store.sqlite3"),
+            max_merged_expansions=int(os.environ.get("COURSE_EXPANSION_CACHE_MAX_ENTRIES", "256"))
+        )
+        # Indexed courses whose original JSON is not in the store (ingested before it kept documents)
+        self._courses_without_documents: Set[str] = set()
+        
+        # BM25 index over lecture chunks, built on first search and updated on every chunk write
+        self.lexical_index = None
+        if os.environ.get("COURSE_CONTENT_LEXICAL_INDEX", "true").lower() == "true":
+            self.lexical_index = BM25Index()
+        self._lexical_ready = False
+        self._lexical_lock = threading.Lock()
+        
+        # Optionally keep each course's lecture chunks in a collection of its own, so a
+        # course-filtered search only walks that course's index
+        self.sharded = os.environ.get("COURSE_CONTENT_SHARDED", "false").lower() == "true"
+        self.shard_prefix = f"{self.collection_name}-"
+        self._known_shards: Optional[Set[str]] = None
+        self._shards_listed_at = 0.0
+        self.shard_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=int(os.environ.get("COURSE_SHARD_SEARCH_WORKERS", "8")),
+            thread_name_prefix="course-shard"
+        )
+        
         # Flag for initialization status
         self._initialized = False
         
@@ -87,6 +153,9 @@ def initialize_sync(self) -> bool:
             count = len(result.get("ids", [])) if result else 0
             logger.info(f"Course content collection initialized with {count} entries")
             
+            # The course store outlives in-memory vector backends, so match it to what is indexed
+            self._reconcile_store()
+            
             self._initialized = True
             logger.info("CourseContent service initialization complete")
             return True
@@ -94,6 +163,88 @@ def initialize_sync(self) -> bool:
             logger.error(f"Failed to initialize CourseContent service: {str(e)}")
             return False
     
+    def _backfill_store(self) -> Set[str]:
+        """
+        Add courses indexed before the course store existed (or whose store was lost) from their overviews
+        
+        The original course JSON cannot be rebuilt from the index, so courses
+        without a stored document are only noted; they are read back from the
+        vector store until they are re-ingested.
+        
+        Returns:
+            IDs of every course with an overview in the collection
+        """
+        overview_ids = set()
+        for page in self.chroma.iter_collection(
+            self.collection_name,
+            include=["metadatas", "documents"],
+            where={"content_type": "course_description"}
+        ):
+            for metadata, document in zip(page.metadatas, page.documents):
+                course_id = str(metadata.get("course_id", ""))
+                if course_id:
+                    overview_ids.add(course_id)
+                if course_id and not self.store.has_document(course_id):
+                    self._courses_without_documents.add(course_id)
+                if not course_id or self.store.has_course(course_id):
+                    continue
+                self.store.put_course(
+                    course_id,
+                    {
+                        "course_description": metadata.get("description") or document,
+                        "course_summary": metadata.get("course_summary", ""),
+                        "course_concepts": metadata.get("course_concepts", ""),
+                        "acronyms_json": metadata.get("acronyms_json", "{}"),
+                        "synonyms_json": metadata.get("synonyms_json", "{}")
+                    },
+                    {},
+                    course_code=metadata.get("course_code")
+                )
+                logger.info(f"Added course {course_id} to the course store from its overview")
+        return overview_ids
+    
+    def resync_sync(self) -> Dict[str, Any]:
+        """
+        Bring the course store and BM25 index in line with the collections
+        
+        Needed after the collections were written without going through this
+        service, e.g. by a snapshot import: courses no longer indexed are
+        dropped from the store, newly indexed ones are added from their
+        overviews, and the BM25 index is rebuilt on the next search.
+        """
+        if not self._initialized:
+            self.initialize_sync()
+        
+        self._known_shards = None
+        if self.lexical_index is not None:
+            with self._lexical_lock:
+                self.lexical_index.clear()
+                self._lexical_ready = False
+        
+        overview_ids, removed = self._reconcile_store()
+        logger.info(f"Resynced course store with {len(overview_ids)} indexed courses ({len(removed)} removed)")
+        return {"courses": len(overview_ids), "removed_from_store": len(removed)}
+    
+    def _reconcile_store(self) -> Tuple[Set[str], List[str]]:
+        """
+        Backfill the course store from the indexed overviews and drop courses that are not indexed
+        
+        The store is kept on disk even when VECTOR_BACKEND=local holds the
+        collections in memory only; without this, a restart would list courses
+        that have no searchable chunks.
+        
+        Returns:
+            IDs of the indexed courses and of the courses removed from the store
+        """
+        self._courses_without_documents = set()
+        overview_ids = self._backfill_store()
+        removed = [course_id for course_id in self.store.course_ids() if course_id not in overview_ids]
+        for course_id in removed:
+            self.store.delete_course(course_id)
+        if removed:
+            logger.warning(f"Removed {len(removed)} courses from the course store that are not indexed: {removed}")
+        return overview_ids, removed
+    
     async def initialize(self) -> bool:
         """Async wrapper for initialize_sync"""
         return self.initialize_sync()
@@ -113,129 +264,510 @@ def add_course_content_sync(self, course_data: Dict[str, Any]) -> Union[int, str
         Returns:
             The course ID
         """
+        report = self.add_courses_sync([course_data])
+        if report["failed_courses"]:
+            raise Exception(report["failed_courses"][0]["error"])
+        if report["failed_batches"]:
+            raise Exception(f"Failed to index course content: {report['failed_batches'][0]['error']}")
+        return report["course_ids"][0]
+    
+    def add_courses_sync(self, courses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Add or re-index several courses through one batched embed-and-upsert pipeline
+        
+        Each record carries a content hash. Records already stored with the same
+        hash are skipped, records whose only change is metadata are updated in
+        place without re-embedding, and stored records that no longer exist are
+        deleted. The records that do need embedding are pooled across courses
+        and processed in batches of the ChromaDB max batch size: each batch is
+        embedded in one call and upserted in one request. A failing batch is
+        reported and the rest still run.
+        
+        Metadata updates, deletions and the course store are only written for
+        a course once all of its upserts succeeded, so a failed course keeps
+        its previous records and is picked up again by the next re-index.
+        
+        Args:
+            courses: List of course dictionaries as accepted by add_course_content_sync
+            
+        Returns:
+            Dictionary with the fully indexed course_ids, chunks_added (records
+            embedded and upserted), added/updated/unchanged/removed record counts,
+            the batch count, failed_batches (with the courses they touched) and
+            failed_courses (courses that could not be prepared or finalized)
+        """
         if not self._initialized:
             self.initialize_sync()
-            
-        try:
-            # Extract course info
-            course_info = course_data.get("course", {})
-            course_id = str(course_info.get("course_id", ""))
-            course_code = course_info.get("code", "")
-            course_title = course_info.get("title", "")
-            
-            # Extract acronyms and synonyms early
-            acronyms = course_info.get("acronyms", {})
-            synonyms = course_info.get("synonyms", {})
-            acronyms_json = json.dumps(acronyms if acronyms else {})
-            synonyms_json = json.dumps(synonyms if synonyms else {})
-            logger.info(f"Prepared acronyms/synonyms JSON for course {course_code}")
-            
-            if not course_id:
-                course_id = str(uuid.uuid4())
+        
+        report = {
+            "course_ids": [],
+            "chunks_added": 0,
+            "added": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "removed": 0,
+            "batches": 0,
+            "failed_batches": [],
+            "failed_courses": []
+        }
+        
+        # Chunk and diff every course first so records can be batched across course boundaries
+        ids, documents, metadatas, owners, targets = [], [], [], [], []
+        prepared = []
+        for index, course_data in enumerate(courses):
+            try:
+                records = self._build_course_records(course_data)
+                changes = self._diff_course_records(records)
+            except Exception as e:
+                logger.error(f"Error preparing course content: {str(e)}")
+                report["failed_courses"].append({"index": index, "error": str(e)})
+                continue
+            prepared.append((index, records, changes))
+            for i in changes["embed"]:
+                ids.append(records["ids"][i])
+                documents.append(records["documents"][i])
+                metadatas.append(records["metadatas"][i])
+                owners.append(records["course_id"])
+                targets.append(records["collections"][i])
+        
+        batch_size = self.chroma.get_max_batch_size()
+        failed_course_ids = set()
+        for start in range(0, len(ids), batch_size):
+            end = min(start + batch_size, len(ids))
+            batch_courses = list(dict.fromkeys(owners[start:end]))
+            report["batches"] += 1
+            try:
+                # Large batches fan out to the embedding worker processes
+                embeddings = self.embedder.generate_embeddings_array(documents[start:end])
                 
-            # Get lectures and weeks
-            lectures = course_data.get("lectures", [])
-            weeks = course_data.get("weeks", [])
-            
-            # Build week lookup map for faster access
-            week_map = {}
-            for week in weeks:
-                week_id = str(week.get("week_id", ""))
-                if week_id:
-                    week_map[week_id] = week
+                # One upsert per target collection (a single one unless sharding is enabled)
+                for collection_name in dict.fromkeys(targets[start:end]):
+                    rows = [i for i in range(start, end) if targets[i] == collection_name]
+                    result = self.chroma.upsert_documents_sync(
+                        collection_name=collection_name,
+                        documents=[documents[i] for i in rows],
+                        metadatas=[metadatas[i] for i in rows],
+                        ids=[ids[i] for i in rows],
+                        embeddings=embeddings[[i - start for i in rows]],
+                        batch_size=batch_size
+                    )
+                    if collection_name != self.collection_name and self._known_shards is not None:
+                        self._known_shards.add(collection_name)
+                    if result["failed_batches"]:
+                        raise Exception(result["failed_batches"][0]["error"])
+                    report["chunks_added"] += result["upserted"]
+                    self._index_lexical(
+                        [ids[i] for i in rows], [documents[i] for i in rows], [metadatas[i] for i in rows]
+                    )
+            except Exception as e:
+                logger.error(f"Error indexing course content batch {start}-{end}: {str(e)}")
+                failed_course_ids.update(batch_courses)
+                report["failed_batches"].append({
+                    "start": start,
+                    "end": end,
+                    "course_ids": batch_courses,
+                    "error": str(e)
+                })
+        
+        # Only courses whose new records are all stored get their old state replaced
+        for index, records, changes in prepared:
+            if records["course_id"] in failed_course_ids:
+                continue
+            try:
+                self._finalize_course_records(records, changes)
+            except Exception as e:
+                logger.error(f"Error finalizing course {records['course_code']}: {str(e)}")
+                report["failed_courses"].append({"index": index, "course_id": records["course_id"], "error": str(e)})
+                continue
+            for key in ("added", "updated", "unchanged", "removed"):
+                report[key] += changes[key]
+            report["course_ids"].append(records["course_id"])
+            logger.info(f"Indexed course {records['course_code']} with {len(records['ids']) - 1} content chunks")
+        
+        logger.info(
+            f"Indexed {len(report['course_ids'])}/{len(courses)} courses: {report['added']} added, "
+            f"{report['updated']} updated, {report['unchanged']} unchanged, {report['removed']} removed "
+            f"({report['chunks_added']} records embedded in {report['batches']} batches)"
+        )
+        return report
+    
+    def _build_course_records(self, course_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the ids, documents and metadatas stored for one course
+        
+        The first record is the course overview, followed by the chunks of
+        every lecture.
+        """
+        # Extract course info
+        course_info = course_data.get("course", {})
+        course_id = str(course_info.get("course_id", ""))
+        course_code = course_info.get("code", "")
+        course_title = course_info.get("title", "")
+        
+        # Extract acronyms and synonyms early
+        acronyms = course_info.get("acronyms", {})
+        synonyms = course_info.get("synonyms", {})
+        acronyms_json = json.dumps(acronyms if acronyms else {})
+        synonyms_json = json.dumps(synonyms if synonyms else {})
+        logger.info(f"Prepared acronyms/synonyms JSON for course {course_code}")
+        
+        if not course_id:
+            course_id = str(uuid.uuid4())
             
-            # Initialize chunker
-            chunker = TextChunker(chunk_size=500, chunk_overlap=100)
+        # Get lectures and weeks
+        lectures = course_data.get("lectures", [])
+        weeks = course_data.get("weeks", [])
+        
+        # Build week lookup map for faster access
+        week_map = {}
+        for week in weeks:
+            week_id = str(week.get("week_id", ""))
+            if week_id:
+                week_map[week_id] = week
+        
+        # Initialize chunker - sized in model tokens so no chunk is truncated when embedded
+        chunker = TextChunker.for_model(self.embedder, chunk_size=128, chunk_overlap=24)
+        
+        # First, store the course overview as a document
+        overview_metadata = {
+            "course_id": course_id,
+            "course_code": course_code,
+            "course_title": course_title,
+            "content_type": "course_description",
+            "description": course_info.get("description", ""),
+            "department": course_info.get("department", ""),
+            "credits": course_info.get("credits", 0),
+            "course_summary": course_info.get("LLM_Summary", {}).get("summary", ""),
+            "course_concepts": _join_terms(course_info.get("LLM_Summary", {}).get("concepts_covered")),
+            "acronyms_json": acronyms_json,  # Add serialized acronyms
+            "synonyms_json": synonyms_json   # Add serialized synonyms
+        }
+        
+        chunk_ids = [f"course_{course_id}"]
+        chunk_documents = [course_info.get("description", "")]
+        chunk_metadatas = [overview_metadata]
+        
+        # Overviews always stay in the main collection; chunks go to the course shard if enabled
+        chunk_collection = self._shard_name(course_code or course_id) if self.sharded else self.collection_name
+        
+        # Process each lecture for detailed content chunks
+        for lecture in lectures:
+            # Extract lecture content (transcript or extract)
+            content = lecture.get("content_transcript") or lecture.get("content_extract", "")
+            if not content:
+                continue
+                
+            # Get lecture metadata
+            lecture_id = str(lecture.get("lecture_id", ""))
+            week_id = str(lecture.get("week_id", ""))
+            lecture_title = lecture.get("title", "")
             
-            # Process each lecture
-            chunks_added = 0
+            # Get week info from the map
+            week_info = week_map.get(week_id, {})
+            week_title = week_info.get("title", "")
+            week_number = week_info.get("order", "")
             
-            # First, store the course overview as a document
-            overview_metadata = {
+            # Create metadata for chunks - course and week fields live in the course store
+            metadata = {
                 "course_id": course_id,
                 "course_code": course_code,
                 "course_title": course_title,
-                "content_type": "course_description",
-                "description": course_info.get("description", ""),
-                "department": course_info.get("department", ""),
-                "credits": course_info.get("credits", 0),
-                "course_summary": course_info.get("LLM_Summary", {}).get("summary", ""),
-                "course_concepts": ", ".join(course_info.get("LLM_Summary", {}).get("concepts_covered", [])),
-                "acronyms_json": acronyms_json,  # Add serialized acronyms
-                "synonyms_json": synonyms_json   # Add serialized synonyms
+                "week_id": week_id,
+                "week_title": week_title,
+                "week_number": week_number,
+                "lecture_id": lecture_id,
+                "lecture_title": lecture_title,
+                "content_type": "lecture_chunk",
+                "resource_type": lecture.get("resource_type", ""),
+                "keywords": _join_terms(lecture.get("keywords")),
+                "duration_minutes": lecture.get("duration_minutes", 0)
             }
             
-            self.chroma.add_documents_sync(
-                    collection_name=self.collection_name,
-                documents=[course_info.get("description", "")],
-                metadatas=[overview_metadata],
-                ids=[f"course_{course_id}"]
-            )
-            
-            # Process each lecture for detailed content chunks
-            for lecture in lectures:
-                # Extract lecture content (transcript or extract)
-                content = lecture.get("content_transcript") or lecture.get("content_extract", "")
-                if not content:
-                    continue
-                    
-                # Get lecture metadata
-                lecture_id = str(lecture.get("lecture_id", ""))
-                week_id = str(lecture.get("week_id", ""))
-                lecture_title = lecture.get("title", "")
-                
-                # Get week info from the map
-                week_info = week_map.get(week_id, {})
-                week_title = week_info.get("title", "")
-                week_number = week_info.get("order", "")
-                
-                # Create metadata for chunks
-            metadata = {
+            # Chunk the content lazily, recording where each chunk sits in the transcript
+            first_chunk = len(chunk_metadatas)
+            for idx, chunk in enumerate(chunker.iter_chunks(content)):
+                chunk_ids.append(f"{course_id}_{lecture_id}_{idx}")
+                chunk_documents.append(chunk["content"])
+                chunk_metadatas.append({
+                    **metadata,
+                    "chunk_index": idx,
+                    "char_start": chunk["start"],
+                    "char_end": chunk["end"]
+                })
+            for chunk_metadata in chunk_metadatas[first_chunk:]:
+                chunk_metadata["total_chunks"] = len(chunk_metadatas) - first_chunk
+        
+        for document, metadata in zip(chunk_documents, chunk_metadatas):
+            metadata.update(_record_hashes(self.embedder.model_name, document, metadata))
+        
+        return {
+            "course_id": course_id,
+            "course_code": course_code,
+            "document": {**course_data, "course": {**course_info, "course_id": course_id}},
+            "listing": {
                 "course_id": course_id,
-                    "course_code": course_code,
-                    "course_title": course_title,
-                    "week_id": week_id,
-                    "week_title": week_title,
-                    "week_number": week_number,
-                    "lecture_id": lecture_id,
-                    "lecture_title": lecture_title,
-                    "content_type": "lecture_chunk",
-                    "resource_type": lecture.get("resource_type", ""),
-                    "course_description": course_info.get("description", ""),
-                    "course_summary": course_info.get("LLM_Summary", {}).get("summary", ""),
-                    "course_concepts": ", ".join(course_info.get("LLM_Summary", {}).get("concepts_covered", [])),
-                    "week_summary": week_info.get("LLM_Summary", {}).get("summary", ""),
-                    "week_concepts": ", ".join(week_info.get("LLM_Summary", {}).get("concepts_covered", [])),
-                    "keywords": ", ".join(lecture.get("keywords", [])),
-                    "duration_minutes": lecture.get("duration_minutes", 0),
-                    "acronyms_json": acronyms_json,  # Add serialized acronyms
-                    "synonyms_json": synonyms_json   # Add serialized synonyms
+                "code": course_code,
+                "title": course_title,
+                "department": course_info.get("department", ""),
+                "credits": course_info.get("credits", 0),
+                "description": course_info.get("description", ""),
+                "created_at": course_info.get("created_at")
+            },
+            "ids": chunk_ids,
+            "documents": chunk_documents,
+            "metadatas": chunk_metadatas,
+            "collections": [self.collection_name] + [chunk_collection] * (len(chunk_ids) - 1),
+            "store_course": {
+                "course_description": course_info.get("description", ""),
+                "course_summary": overview_metadata["course_summary"],
+                "course_concepts": overview_metadata["course_concepts"],
+                "acronyms_json": acronyms_json,
+                "synonyms_json": synonyms_json
+            },
+            "store_weeks": {
+                week_id: {
+                    "week_summary": week.get("LLM_Summary", {}).get("summary", ""),
+                    "week_concepts": _join_terms(week.get("LLM_Summary", {}).get("concepts_covered"))
                 }
-            
-            # Chunk the content
-            content_chunks = chunker.chunk_text(content, metadata)
-            
-            # Generate chunk IDs and index in ChromaDB
-            for idx, chunk in enumerate(content_chunks):
-                chunk_id = f"{course_id}_{lecture_id}_{idx}"
-                chunk_content = chunk["content"]
-                chunk_metadata = chunk["metadata"]
-                
-                # Add to ChromaDB
-                self.chroma.add_documents_sync(
+                for week_id, week in week_map.items()
+            }
+        }
+    
+    def _diff_course_records(self, records: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Diff a course's new records against the stored ones by hash, without writing anything
+        
+        Returns:
+            Dictionary with the indices of records that must be embedded ("embed"),
+            the indices of metadata-only changes per collection ("metadata_updates"),
+            the ids of stored records that no longer exist per collection ("orphans")
+            and added/updated/unchanged/removed counts
+        """
+        collections = list(dict.fromkeys(records["collections"]))
+        changes = {
+            "embed": [], "metadata_updates": {}, "orphans": {},
+            "added": 0, "updated": 0, "unchanged": 0, "removed": 0
+        }
+        
+        # Hashes of what is stored for this course, per collection it may live in
+        stored = {}
+        for collection_name in collections:
+            stored[collection_name] = {}
+            if collection_name != self.collection_name and collection_name not in self._list_shards():
+                continue
+            for page in self.chroma.iter_collection(
+                collection_name,
+                include=["metadatas"],
+                where={"course_id": records["course_id"]}
+            ):
+                for record_id, metadata in zip(page.ids, page.metadatas):
+                    stored[collection_name][record_id] = (metadata.get("content_hash"), metadata.get("metadata_hash"))
+        
+        for i, (record_id, metadata, collection_name) in enumerate(
+            zip(records["ids"], records["metadatas"], records["collections"])
+        ):
+            previous = stored[collection_name].pop(record_id, None)
+            if previous is None:
+                changes["added"] += 1
+                changes["embed"].append(i)
+            elif previous[0] != metadata["content_hash"]:
+                changes["updated"] += 1
+                changes["embed"].append(i)
+            elif previous[1] != metadata["metadata_hash"]:
+                changes["updated"] += 1
+                changes["metadata_updates"].setdefault(collection_name, []).append(i)
+            else:
+                changes["unchanged"] += 1
+        
+        # Whatever is left in stored no longer exists in the course
+        for collection_name, orphans in stored.items():
+            if orphans:
+                changes["orphans"][collection_name] = list(orphans)
+                changes["removed"] += len(orphans)
+        return changes
+    
+    def _finalize_course_records(self, records: Dict[str, Any], changes: Dict[str, Any]) -> None:
+        """
+        Apply the changes of a course that need no embedding, once its new records are stored
+        
+        Metadata-only changes are updated in place, which also records their new
+        hashes. ChromaDB 0.4 cannot remove metadata keys in place, so keys a new
+        version dropped stay on the record; course and week fields among them are
+        shadowed by the course store when results are hydrated. Orphaned records
+        are deleted last, then the course store is updated.
+        """
+        for collection_name, rows in changes["metadata_updates"].items():
+            self.chroma.update_sync(
+                collection_name=collection_name,
+                ids=[records["ids"][i] for i in rows],
+                metadatas=[records["metadatas"][i] for i in rows]
+            )
+            self._index_lexical(
+                [records["ids"][i] for i in rows],
+                [records["documents"][i] for i in rows],
+                [records["metadatas"][i] for i in rows]
+            )
+        
+        for collection_name, orphans in changes["orphans"].items():
+            self.chroma.delete_sync(collection_name=collection_name, ids=orphans)
+            if self.lexical_index is not None:
+                self.lexical_index.remove(orphans)
+        
+        self.store.put_course(
+            records["course_id"], records["store_course"], records["store_weeks"],
+            course_code=records["course_code"]
+        )
+        self.store.put_document(
+            records["course_id"], records["document"], records["listing"], course_code=records["course_code"]
+        )
+        self._courses_without_documents.discard(records["course_id"])
+    
+    def _index_lexical(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Add written lecture chunks to the BM25 index"""
+        if self.lexical_index is None:
+            return
+        self.lexical_index.add_many(
+            (record_id, document, metadata.get("course_id", ""), metadata.get("course_code", ""))
+            for record_id, document, metadata in zip(ids, documents, metadatas)
+            if metadata.get("content_type") == "lecture_chunk"
+        )
+    
+    def _ensure_lexical_index(self) -> bool:
+        """Build the BM25 index from the stored chunks on first use; returns whether it is available"""
+        if self.lexical_index is None:
+            return False
+        if self._lexical_ready:
+            return True
+        with self._lexical_lock:
+            if not self._lexical_ready:
+                start_time = time.time()
+                collections = [self.collection_name] + (sorted(self._list_shards(refresh=True)) if self.sharded else [])
+                for collection_name in collections:
+                    for page in self.chroma.iter_collection(
+                        collection_name,
+                        include=["documents", "metadatas"],
+                        where={"content_type": "lecture_chunk"}
+                    ):
+                        self._index_lexical(page.ids, page.documents, page.metadatas)
+                self._lexical_ready = True
+                logger.info(f"Built BM25 index over {len(self.lexical_index)} chunks in {time.time() - start_time:.2f}s")
+        return True
+    
+    def _get_chunks(self, ids: List[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Fetch lecture chunks by id from the collections that hold them, as id -> (document, metadata)"""
+        by_collection: Dict[str, List[str]] = {}
+        for record_id in ids:
+            owner = self.lexical_index.owner(record_id) if self.lexical_index is not None else None
+            collection_name = self.collection_name
+            if self.sharded and owner:
+                collection_name = self._shard_name(owner[1] or owner[0])
+            by_collection.setdefault(collection_name, []).append(record_id)
+        
+        chunks = {}
+        for collection_name, collection_ids in by_collection.items():
+            result = self.chroma.get_sync(collection_name, ids=collection_ids, include=["documents", "metadatas"])
+            for record_id, document, metadata in zip(result.ids, result.documents, result.metadatas):
+                chunks[record_id] = (document, self.store.hydrate(metadata))
+        return chunks
+    
+    def _shard_name(self, course_code: str) -> str:
+        """Collection holding one course's chunks when sharding is enabled"""
+        # Collection names allow [A-Za-z0-9_-] and must end with a letter or digit
+        safe_code = re.sub(r"[^A-Za-z0-9_-]", "-", str(course_code)).strip("-_") or "unknown"
+        return f"{self.shard_prefix}{safe_code}"[:63].rstrip("-_")
+    
+    def _list_shards(self, refresh: bool = False) -> Set[str]:
+        """Names of existing course shards, cached and re-listed at most every 30s on request"""
+        if self._known_shards is None or (refresh and time.time() - self._shards_listed_at > 30):
+            self._known_shards = {
+                name for name in self.chroma.list_collection_names() if name.startswith(self.shard_prefix)
+            }
+            self._shards_listed_at = time.time()
+        return self._known_shards
+    
+    def _search_chunks(
+        self,
+        query: str,
+        n_results: int,
+        where: Dict[str, Any],
+        include: List[str],
+        course_codes: Optional[List[str]] = None
+    ) -> ChromadbResult:
+        """Search lecture chunks with one query (see _search_chunks_many)"""
+        return self._search_chunks_many([query], n_results, where, include, course_codes)[0]
+    
+    def _search_chunks_many(
+        self,
+        queries: List[str],
+        n_results: int,
+        where: Dict[str, Any],
+        include: List[str],
+        course_codes: Optional[List[str]] = None
+    ) -> List[ChromadbResult]:
+        """
+        Search lecture chunks with several queries, optionally limited to some courses
+        
+        The queries are embedded together and sent as one batched search. Without
+        sharding this is one filtered search of the main collection. With
+        sharding, each targeted course shard (every shard when no courses are
+        given) is searched in parallel without a course filter, alongside the
+        course overviews left in the main collection, and the results are merged
+        by distance. Chunk metadata is hydrated from the course store.
+        """
+        query_embeddings = self.embedder.embed_queries(queries)
+        
+        if not self.sharded:
+            results = self.chroma.search_many_sync(
                 collection_name=self.collection_name,
-                    documents=[chunk_content],
-                    metadatas=[chunk_metadata],
-                    ids=[chunk_id]
-                )
-                chunks_added += 1
-            
-            logger.info(f"Added course {course_code} with {chunks_added} content chunks")
-            return course_id
-            
-        except Exception as e:
-            logger.error(f"Error adding course content: {str(e)}")
-            raise
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where or None,
+                include=include
+            )
+            for result in results:
+                result.metadatas = self.store.hydrate_many(result.metadatas)
+            return results
+        
+        if course_codes:
+            wanted = list(dict.fromkeys(self._shard_name(code) for code in course_codes))
+            shards = [name for name in wanted if name in self._list_shards()]
+            if len(shards) < len(wanted):
+                # A course may have been indexed since the shards were listed
+                shards = [name for name in wanted if name in self._list_shards(refresh=True)]
+        else:
+            shards = sorted(self._list_shards())
+        
+        # Overviews stay in the main collection, so it is searched for them like a shard
+        overview_where: Dict[str, Any] = {"content_type": "course_description"}
+        if course_codes:
+            overview_where = {"$and": [overview_where, {"course_code": {"$in": list(course_codes)}}]}
+        targets = [(self.collection_name, overview_where)] + [(shard, None) for shard in shards]
+        
+        # Distances are needed to merge the shards
+        shard_include = include if "distances" in include else include + ["distances"]
+        futures = [
+            self.shard_executor.submit(
+                self.chroma.search_many_sync, name, query_embeddings, n_results, target_where, shard_include
+            )
+            for name, target_where in targets
+        ]
+        shard_results = [future.result() for future in futures]
+        
+        merged = []
+        for index in range(len(queries)):
+            rows = []
+            for results in shard_results:
+                result = results[index]
+                rows.extend(zip(result.distances, result.ids, result.metadatas, result.documents))
+            rows.sort(key=lambda row: row[0])
+            rows = rows[:n_results]
+            merged.append(ChromadbResult(
+                ids=[row[1] for row in rows],
+                distances=[row[0] for row in rows],
+                metadatas=self.store.hydrate_many([row[2] for row in rows]),
+                documents=[row[3] for row in rows]
+            ))
+        return merged
     
     def _delete_course_chunks(self, course_code: str) -> bool:
         """
@@ -248,32 +780,40 @@ def _delete_course_chunks(self, course_code: str) -> bool:
             True if successful, False otherwise
         """
         try:
-            # Search for chunks with this course code
-            results = self.chroma.search_sync(
+            if self.sharded:
+                # The whole shard belongs to this course
+                shard = self._shard_name(course_code)
+                if shard in self._list_shards(refresh=True):
+                    self.chroma.delete_collection_sync(shard)
+                    self._known_shards.discard(shard)
+                    if self.lexical_index is not None:
+                        self.lexical_index.remove_course(course_code=course_code)
+                    logger.info(f"Deleted shard {shard} for course {course_code}")
+                return True
+            
+            # Delete the course's lecture chunks server-side in one filtered call
+            deleted = self.chroma.delete_where_sync(
                 collection_name=self.collection_name,
-                query="",
-                n_results=1000,  # Large number to get all chunks
-                where={"code": course_code}
+                where={"$and": [{"course_code": course_code}, {"content_type": "lecture_chunk"}]}
             )
-            
-            if results.ids and len(results.ids) > 0:
-                # Delete all found documents
-                self.chroma.delete_sync(
-                    collection_name=self.collection_name,
-                    ids=results.ids
-                )
-                logger.info(f"Deleted {len(results.ids)} chunks for course {course_code}")
-                return True
-            else:
-                logger.info(f"No chunks found for course {course_code}")
-                return True
+            logger.info(f"Deleted {deleted} chunks for course {course_code}")
+            if self.lexical_index is not None:
+                self.lexical_index.remove_course(course_code=course_code)
+            return True
         except Exception as e:
             logger.error(f"Error deleting chunks for course {course_code}: {str(e)}")
             return False
     
     async def add_course_content(self, course_content: Union[Dict[str, Any], CourseContent]) -> str:
         """Async wrapper for add_course_content_sync"""
-        return self.add_course_content_sync(course_content)
+        # Ingestion is CPU heavy - keep it off the event loop so other requests are served
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.add_course_content_sync, course_content)
+    
+    async def add_courses(self, courses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Async wrapper for add_courses_sync"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.add_courses_sync, courses)
         
     def get_course_content_sync(self, course_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -289,10 +829,15 @@ def get_course_content_sync(self, course_id: str) -> Optional[Dict[str, Any]]:
             self.initialize_sync()
             
         try:
-            logger.info(f"DEBUG: get_course_content_sync called with course_id={course_id}")
+            logger.debug(f"get_course_content_sync called with course_id={course_id}")
+            
+            # Courses ingested with the document store are a single keyed read
+            document = self.store.get_document(course_id)
+            if document is not None:
+                return self._course_document_view(document)
             
             # First, try to find course by ID
-            logger.info(f"DEBUG: Trying to find course by ID: {course_id}")
+            logger.debug(f"Trying to find course by ID: {course_id}")
             results = self.chroma.search_sync(
                     collection_name=self.collection_name,
                 query="",  # Empty query to get all results
@@ -300,22 +845,22 @@ def get_course_content_sync(self, course_id: str) -> Optional[Dict[str, Any]]:
                 where={"course_id": course_id}
             )
             
-            logger.info(f"DEBUG: ID search returned {len(results.ids) if results and results.ids else 0} results")
+            logger.debug(f"ID search returned {len(results.ids) if results and results.ids else 0} results")
             
             # If not found by ID, try to find by course code
             if not results.ids:
-                logger.info(f"DEBUG: Course not found by ID, trying by course_code: {course_id}")
+                logger.debug(f"Course not found by ID, trying by course_code: {course_id}")
                 results = self.chroma.search_sync(
                     collection_name=self.collection_name,
                     query="",  # Empty query to get all results
                     n_results=1,
                     where={"course_code": course_id}
                 )
-                logger.info(f"DEBUG: course_code search returned {len(results.ids) if results and results.ids else 0} results")
+                logger.debug(f"course_code search returned {len(results.ids) if results and results.ids else 0} results")
                 
             # Try a less restrictive query with contains if still not found
             if not results.ids:
-                logger.info(f"DEBUG: Course not found by exact match, trying broader query")
+                logger.debug(f"Course not found by exact match, trying broader query")
                 # Dump all collection documents to see what's there
                 all_docs = self.chroma.get_collection_docs_sync(
                     collection_name=self.collection_name,
@@ -323,18 +868,18 @@ def get_course_content_sync(self, course_id: str) -> Optional[Dict[str, Any]]:
                     offset=0,
                     include_metadata=True
                 )
-                logger.info(f"DEBUG: Found {len(all_docs.ids) if all_docs and all_docs.ids else 0} total documents in collection")
-                logger.info("DEBUG: Checking first 5 documents for course codes:")
+                logger.debug(f"Found {len(all_docs.ids) if all_docs and all_docs.ids else 0} total documents in collection")
+                logger.debug("Checking first 5 documents for course codes:")
                 for i, doc_id in enumerate(all_docs.ids[:5] if all_docs and all_docs.ids else []):
-                    logger.info(f"DEBUG: Doc {i} - Metadata: {all_docs.metadatas[i]}")
+                    logger.debug(f"Doc {i} - Metadata: {all_docs.metadatas[i]}")
                 
                 # Try a less strict query that looks for course_code containing the course_id
                 for field in ["course_code", "code"]:
                     found = False
-                    logger.info(f"DEBUG: Scanning collection for documents with {field}={course_id}")
+                    logger.debug(f"Scanning collection for documents with {field}={course_id}")
                     for i, metadata in enumerate(all_docs.metadatas if all_docs and all_docs.metadatas else []):
                         if field in metadata and metadata[field] == course_id:
-                            logger.info(f"DEBUG: Found match in document {i} with {field}={course_id}")
+                            logger.debug(f"Found match in document {i} with {field}={course_id}")
                             results = type('obj', (object,), {
                                 'ids': [all_docs.ids[i]],
                                 'metadatas': [all_docs.metadatas[i]]
@@ -352,25 +897,25 @@ def get_course_content_sync(self, course_id: str) -> Optional[Dict[str, Any]]:
             course_code = results.metadatas[0].get("course_code", "")
             if not course_code:
                 logger.error(f"Course {course_id} found but has no course_code")
-                logger.info(f"DEBUG: Found course metadata: {results.metadatas[0]}")
+                logger.debug(f"Found course metadata: {results.metadatas[0]}")
                 
                 # Try alternate fields
                 for field in ["code", "course_code"]:
                     if field in results.metadatas[0]:
                         course_code = results.metadatas[0][field]
-                        logger.info(f"DEBUG: Found course_code in alternate field {field}: {course_code}")
+                        logger.debug(f"Found course_code in alternate field {field}: {course_code}")
                         break
                         
                 if not course_code:
                     # If we still don't have a course code, use the course_id as the code
                     course_code = course_id
-                    logger.info(f"DEBUG: Using course_id as course_code: {course_code}")
+                    logger.debug(f"Using course_id as course_code: {course_code}")
                 
-            logger.info(f"DEBUG: Found course_code: {course_code}, retrieving all content")
+            logger.debug(f"Found course_code: {course_code}, retrieving all content")
                 
             # Retrieve all course content by course code - use both course_code and code fields
             # Since we can't do OR conditions, we'll need to do separate searches
-            logger.info(f"DEBUG: Querying for all content with course_code={course_code}")
+            logger.debug(f"Querying for all content with course_code={course_code}")
             
             # Search by course_code
             all_results_by_code = self.chroma.search_sync(
@@ -408,7 +953,7 @@ def add_results(results):
                 for i, doc_id in enumerate(results.ids):
                     if doc_id not in all_ids:  # Only add if not already present
                         all_ids.append(doc_id)
-                        all_metadatas.append(results.metadatas[i])
+                        all_metadatas.append(self.store.hydrate(results.metadatas[i]))
                         all_documents.append(results.documents[i])
             
             # Add results from all searches, avoiding duplicates
@@ -416,7 +961,16 @@ def add_results(results):
             add_results(all_results_by_alt_code)
             add_results(all_results_by_id)
             
-            logger.info(f"DEBUG: Found total of {len(all_ids)} unique documents across all searches")
+            # With sharding the lecture chunks live in the course's own collection
+            if self.sharded and self._shard_name(course_code) in self._list_shards(refresh=True):
+                add_results(self.chroma.search_sync(
+                    collection_name=self._shard_name(course_code),
+                    query="",
+                    n_results=1000,
+                    where=None
+                ))
+            
+            logger.debug(f"Found total of {len(all_ids)} unique documents across all searches")
             
             if not all_ids:
                 logger.warning(f"No content found for course {course_code}")
@@ -437,11 +991,11 @@ def add_results(results):
                 content = all_documents[i]
                 content_type = metadata.get("content_type", "")
                 
-                logger.info(f"DEBUG: Processing document {i}, type={content_type}")
+                logger.debug(f"Processing document {i}, type={content_type}")
                 
                 if content_type == "course_description":
                     # Found course overview
-                    logger.info(f"DEBUG: Found course description")
+                    logger.debug(f"Found course description")
                     course_metadata = {
                         "course_id": metadata.get("course_id", ""),
                         "code": metadata.get("course_code", ""),
@@ -453,14 +1007,14 @@ def add_results(results):
                         "concepts": metadata.get("course_concepts", "")
                     }
                     course_description = content
-                    logger.info(f"DEBUG: Found course description with summary length {len(metadata.get('course_summary', ''))}")
+                    logger.debug(f"Found course description with summary length {len(metadata.get('course_summary', ''))}")
                 
                 elif content_type == "lecture_chunk":
                     # Construct lecture information
                     lecture_id = metadata.get("lecture_id", "")
                     week_id = metadata.get("week_id", "")
                     
-                    logger.info(f"DEBUG: Found lecture chunk - lecture_id={lecture_id}, week_id={week_id}")
+                    logger.debug(f"Found lecture chunk - lecture_id={lecture_id}, week_id={week_id}")
                     
                     # Check if we've already processed this lecture
                     existing_lecture = next((l for l in lectures if l.get("lecture_id") == lecture_id), None)
@@ -483,7 +1037,7 @@ def add_results(results):
                         }
                         lectures.append(lecture)
                         lecture_count += 1
-                        logger.info(f"DEBUG: Added new lecture: {lecture['title']} with {len(content)} chars")
+                        logger.debug(f"Added new lecture: {lecture['title']} with {len(content)} chars")
                     else:
                         # Append content to existing lecture
                         existing_lecture["content_transcript"] += "\n\n" + content
@@ -492,7 +1046,7 @@ def add_results(results):
                                     "course_concepts", "week_concepts"]:
                             if field not in existing_lecture and field in metadata:
                                 existing_lecture[field] = metadata[field]
-                        logger.info(f"DEBUG: Appended to existing lecture: {existing_lecture['title']}, now {len(existing_lecture['content_transcript'])} chars")
+                        logger.debug(f"Appended to existing lecture: {existing_lecture['title']}, now {len(existing_lecture['content_transcript'])} chars")
                     
                     # Check if we need to add this week
                     if week_id:
@@ -507,13 +1061,13 @@ def add_results(results):
                             }
                             weeks.append(week)
                             week_count += 1
-                            logger.info(f"DEBUG: Added new week: {week['title']} with summary length {len(week['summary'])}")
+                            logger.debug(f"Added new week: {week['title']} with summary length {len(week['summary'])}")
             
-            logger.info(f"DEBUG: Processed {lecture_count} unique lectures and {week_count} unique weeks")
+            logger.debug(f"Processed {lecture_count} unique lectures and {week_count} unique weeks")
             
             # If no course metadata was found but we have content, create a placeholder
             if not course_metadata and lectures:
-                logger.info(f"DEBUG: No course metadata found, creating placeholder from lecture metadata")
+                logger.debug(f"No course metadata found, creating placeholder from lecture metadata")
                 first_metadata = all_metadatas[0]
                 course_metadata = {
                     "course_id": first_metadata.get("course_id", ""),
@@ -525,7 +1079,7 @@ def add_results(results):
                     "summary": first_metadata.get("course_summary", ""),
                     "concepts": first_metadata.get("course_concepts", "")
                 }
-                logger.info(f"DEBUG: Created placeholder course metadata: {course_metadata}")
+                logger.debug(f"Created placeholder course metadata: {course_metadata}")
             
             # Construct final course content structure
             if course_metadata:
@@ -534,18 +1088,76 @@ def add_results(results):
                     "weeks": weeks,
                     "lectures": lectures
                 }
-                logger.info(f"DEBUG: Returning complete course content with {len(lectures)} lectures and {len(weeks)} weeks")
+                logger.debug(f"Returning complete course content with {len(lectures)} lectures and {len(weeks)} weeks")
                 return result
             
-            logger.warning(f"DEBUG: Could not construct course content, returning None")
+            logger.warning(f"Could not construct course content, returning None")
             return None
             
         except Exception as e:
             logger.error(f"Error retrieving course content for {course_id}: {str(e)}")
             import traceback
-            logger.error(f"DEBUG: Full traceback: {traceback.format_exc()}")
+            logger.error(f"Full traceback: {traceback.format_exc()}")
             return None
     
+    def _course_document_view(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Shape a stored course document like the content rebuilt from the index
+        
+        The original fields are kept; the course, week and lecture keys that
+        get_course_content_sync has always returned are added on top.
+        """
+        course_info = document.get("course", {})
+        course_summary = course_info.get("LLM_Summary", {}) or {}
+        course = {
+            **course_info,
+            "course_id": str(course_info.get("course_id", "")),
+            "code": course_info.get("code", ""),
+            "title": course_info.get("title", ""),
+            "description": course_info.get("description", ""),
+            "department": course_info.get("department", ""),
+            "credits": course_info.get("credits", 0),
+            "summary": course_summary.get("summary", ""),
+            "concepts": _join_terms(course_summary.get("concepts_covered"))
+        }
+        
+        weeks = []
+        week_map = {}
+        for week_info in document.get("weeks", []):
+            week_summary = week_info.get("LLM_Summary", {}) or {}
+            week = {
+                **week_info,
+                "week_id": str(week_info.get("week_id", "")),
+                "title": week_info.get("title", ""),
+                "order": week_info.get("order", 0),
+                "summary": week_summary.get("summary", ""),
+                "concepts": _join_terms(week_summary.get("concepts_covered"))
+            }
+            weeks.append(week)
+            week_map[week["week_id"]] = week
+        
+        lectures = []
+        for lecture_info in document.get("lectures", []):
+            content = lecture_info.get("content_transcript") or lecture_info.get("content_extract", "")
+            week = week_map.get(str(lecture_info.get("week_id", "")), {})
+            lectures.append({
+                **lecture_info,
+                "lecture_id": str(lecture_info.get("lecture_id", "")),
+                "week_id": str(lecture_info.get("week_id", "")),
+                "title": lecture_info.get("title", ""),
+                "content_extract": lecture_info.get("content_extract") or content[:1000],
+                "content_transcript": content,
+                "resource_type": lecture_info.get("resource_type", ""),
+                "keywords": _join_terms(lecture_info.get("keywords")),
+                "duration_minutes": lecture_info.get("duration_minutes", 0),
+                "course_summary": course["summary"],
+                "week_summary": week.get("summary", ""),
+                "course_concepts": course["concepts"],
+                "week_concepts": week.get("concepts", "")
+            })
+        
+        return {"course": course, "weeks": weeks, "lectures": lectures}
+    
     async def get_course_content(self, course_id: Union[int, str]) -> Optional[CourseContent]:
         """Async wrapper for get_course_content_sync"""
         return self.get_course_content_sync(course_id)
@@ -570,15 +1182,12 @@ def update_course_content_sync(self, course_id: Union[int, str], course_content:
                 logger.warning(f"Course content with ID {course_id} not found for update")
                 return False
                 
-            # Ensure course_id in the content matches the provided ID
-            course_info = course_data.get("course_info", {})
-            course_info["course_id"] = course_id_str
-            course_data["course_info"] = course_info
+            # Ensure course_id in the content matches the stored course, so records are diffed in place
+            course_info = dict(course_data.get("course") or {})
+            course_info["course_id"] = existing.get("course", {}).get("course_id") or course_id_str
+            course_data = {**course_data, "course": course_info}
             
-            # Delete the existing course content
-            self.delete_course_content_sync(course_id)
-            
-            # Add the updated course content
+            # Re-index: only new or changed chunks are embedded, orphaned ones are deleted
             self.add_course_content_sync(course_data)
             
             logger.info(f"Updated course content for ID: {course_id_str}")
@@ -600,59 +1209,66 @@ def delete_course_content_sync(self, course_id: Union[int, str]) -> bool:
         logger.info(f"Attempting to delete course with ID: {course_id_str}")
         
         try:
-            # First check if the course exists using get method
+            # First check if the course exists using get method (raw or overview document id)
             result = self.chroma.get_sync(
                 collection_name=self.collection_name,
-                ids=[course_id_str]
+                ids=[course_id_str, f"course_{course_id_str}"],
+                include=["metadatas"]
             )
             
             if not result.ids or len(result.ids) == 0:
                 logger.warning(f"Course with ID {course_id_str} not found using direct lookup")
                 
-                # Try searching by code if the ID might be a course code
-                if any(c.isalpha() for c in course_id_str):
-                    search_results = self.chroma.search_sync(
-                        collection_name=self.collection_name,
-                        query="",
-                        n_results=1,
-                        where={"code": course_id_str}
-                    )
-                    
-                    if search_results.ids and len(search_results.ids) > 0:
-                        actual_id = search_results.ids[0]
-                        logger.info(f"Found course with code {course_id_str}, actual ID: {actual_id}")
-                        course_id_str = actual_id
-                    else:
-                        logger.warning(f"Course with code {course_id_str} not found for deletion")
-                        return False
-                else:
-                    logger.warning(f"Course with ID {course_id_str} not found for deletion")
+                # Look the overview up by course id or code, fetching metadata only
+                result = next(
+                    self.chroma.iter_collection(
+                        self.collection_name,
+                        page_size=1,
+                        include=["metadatas"],
+                        where={"$and": [
+                            {"content_type": "course_description"},
+                            {"$or": [
+                                {"course_id": course_id_str},
+                                {"course_code": course_id_str},
+                                {"code": course_id_str}
+                            ]}
+                        ]}
+                    ),
+                    None
+                )
+                if result is None:
+                    logger.warning(f"Course with ID or code {course_id_str} not found for deletion")
                     return False
+                logger.info(f"Found course {course_id_str}, actual ID: {result.ids[0]}")
             else:
                 logger.info(f"Found course with ID {course_id_str} for deletion")
             
-            # Delete the course from ChromaDB
-            logger.info(f"Deleting course with ID: {course_id_str}")
-            delete_result = self.chroma.delete_sync(
-                collection_name=self.collection_name,
-                ids=[course_id_str]
-            )
-            
-            # Log delete result
-            logger.info(f"Delete operation result: {delete_result}")
-            
-            # Verify deletion was successful
-            verification = self.chroma.get_sync(
-                collection_name=self.collection_name,
-                ids=[course_id_str]
-            )
-            
-            if verification.ids and len(verification.ids) > 0:
-                logger.error(f"Deletion failed - course {course_id_str} still exists")
-                return False
+            metadata = result.metadatas[0]
+            actual_course_id = metadata.get("course_id")
+            if actual_course_id:
+                # One server-side delete removes the overview and every chunk of the course
+                deleted = self.chroma.delete_where_sync(
+                    collection_name=self.collection_name,
+                    where={"course_id": str(actual_course_id)}
+                )
+            else:
+                # Legacy record without course metadata - delete just that document
+                self.chroma.delete_sync(collection_name=self.collection_name, ids=[result.ids[0]])
+                deleted = 1
+            logger.info(f"Deleted {deleted} documents for course {course_id_str}")
+            if actual_course_id:
+                self.store.delete_course(str(actual_course_id))
+                self._courses_without_documents.discard(str(actual_course_id))
+                if self.lexical_index is not None:
+                    self.lexical_index.remove_course(course_id=str(actual_course_id))
+            
+            # Drop the course's shard along with its overview
+            course_code = metadata.get("course_code") or metadata.get("code")
+            if self.sharded and course_code:
+                self._delete_course_chunks(course_code)
             
             logger.info(f"Successfully deleted course with ID: {course_id_str}")
-            return True
+            return deleted > 0
         except Exception as e:
             logger.error(f"Error deleting course content: {str(e)}")
             import traceback
@@ -670,31 +1286,30 @@ def list_courses_sync(self, limit: int = 100, offset: int = 0) -> List[Dict[str,
             self.initialize_sync()
             
         try:
-            logger.info(f"DEBUG: List courses called with limit={limit}, offset={offset}")
-            
-            # First try with content_type filter
-            logger.info("DEBUG: Trying to query with content_type=course_description")
-            results = self.chroma.get_collection_docs_sync(
-                collection_name=self.collection_name,
-                limit=limit,
-                offset=offset,
-                include_metadata=True
+            logger.debug(f"List courses called with limit={limit}, offset={offset}")
+            
+            # Serve the page from the document store once it holds every indexed course
+            if not self._courses_without_documents and self.store.document_count():
+                return self.store.list_documents(limit=limit, offset=offset)
+            
+            # First try with content_type filter - only the requested page is fetched
+            logger.debug("Trying to query with content_type=course_description")
+            results = next(
+                self.chroma.iter_collection(
+                    self.collection_name,
+                    page_size=limit,
+                    where={"content_type": "course_description"},
+                    offset=offset
+                ),
+                ChromadbResult(ids=[], documents=[], metadatas=[], distances=[])
             )
             
-            logger.info(f"DEBUG: Initial query returned {len(results.ids if results.ids else [])} results")
+            logger.debug(f"Initial query returned {len(results.ids if results.ids else [])} results")
             
             # If no results, try a broader query to find any course data
-            if not results.ids or len(results.ids) == 0:
+            if not results.ids and offset == 0:
                 logger.warning("No course descriptions found with content_type filter, trying broader query")
-                logger.info("DEBUG: Trying broader query with no filters")
-                results = self.chroma.get_collection_docs_sync(
-                    collection_name=self.collection_name,
-                    limit=1000,  # Get all and we'll filter
-                    offset=0,
-                    include_metadata=True
-                )
-                
-                logger.info(f"DEBUG: Broader query returned {len(results.ids if results.ids else [])} results")
+                logger.debug("Trying broader query with no filters")
                 
                 # Find any entries that have course_code
                 filtered_ids = []
@@ -702,39 +1317,34 @@ def list_courses_sync(self, limit: int = 100, offset: int = 0) -> List[Dict[str,
                 filtered_metadatas = []
                 seen_courses = set()
                 
-                # Dump all metadata for debugging
-                logger.info("DEBUG: Dumping metadata from first 5 results:")
-                for i, doc_id in enumerate(results.ids[:5] if results.ids else []):
-                    logger.info(f"DEBUG: Result {i} - ID: {doc_id}, Metadata: {results.metadatas[i]}")
-                
-                for i, doc_id in enumerate(results.ids if results.ids else []):
-                    metadata = results.metadatas[i]
-                    course_code = metadata.get("course_code", "")
-                    
-                    # Skip if no course code or already processed this course
-                    if not course_code or course_code in seen_courses:
-                        continue
+                # Page through the collection until enough distinct courses are found
+                for page in self.chroma.iter_collection(self.collection_name):
+                    for doc_id, metadata, document in zip(page.ids, page.metadatas, page.documents):
+                        course_code = metadata.get("course_code", "")
                         
-                    logger.info(f"DEBUG: Found course with code {course_code}")
-                    seen_courses.add(course_code)
-                    filtered_ids.append(doc_id)
-                    filtered_documents.append(results.documents[i] if i < len(results.documents) else "")
-                    filtered_metadatas.append(metadata)
-                    
-                    # Only collect up to the limit
+                        # Skip if no course code or already processed this course
+                        if not course_code or course_code in seen_courses:
+                            continue
+                            
+                        logger.debug(f"Found course with code {course_code}")
+                        seen_courses.add(course_code)
+                        filtered_ids.append(doc_id)
+                        filtered_documents.append(document)
+                        filtered_metadatas.append(metadata)
+                        
+                        # Only collect up to the limit
+                        if len(filtered_ids) >= limit:
+                            break
                     if len(filtered_ids) >= limit:
                         break
                         
-                # Replace results with filtered version
-                # Create a new object to mimic ChromaDB result structure
-                class FilteredResults:
-                    def __init__(self, ids, documents, metadatas):
-                        self.ids = ids
-                        self.documents = documents
-                        self.metadatas = metadatas
-                        
-                results = FilteredResults(filtered_ids, filtered_documents, filtered_metadatas)
-                logger.info(f"DEBUG: After filtering, found {len(results.ids if results.ids else [])} unique courses")
+                results = ChromadbResult(
+                    ids=filtered_ids,
+                    documents=filtered_documents,
+                    metadatas=filtered_metadatas,
+                    distances=[0.0] * len(filtered_ids)
+                )
+                logger.debug(f"After filtering, found {len(results.ids if results.ids else [])} unique courses")
             
             if not results.ids:
                 logger.warning("No course data found at all")
@@ -757,14 +1367,14 @@ def __init__(self, ids, documents, metadatas):
                     "created_at": metadata.get("created_at", None)
                 }
                 courses.append(course)
-                logger.info(f"DEBUG: Added course {course['code'] or course['course_id']} to result list")
+                logger.debug(f"Added course {course['code'] or course['course_id']} to result list")
                 
-            logger.info(f"DEBUG: Returning {len(courses)} courses")
+            logger.debug(f"Returning {len(courses)} courses")
             return courses
         except Exception as e:
             logger.error(f"Error listing courses: {str(e)}")
             import traceback
-            logger.error(f"DEBUG: Full traceback: {traceback.format_exc()}")
+            logger.error(f"Full traceback: {traceback.format_exc()}")
             return []
     
     async def list_courses(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
@@ -803,20 +1413,34 @@ def search_courses_sync(
     ) -> dict:
         """
         Search for course content by query, incorporating query expansion using
-        acronyms and synonyms found in the metadata of initially retrieved chunks.
+        the acronyms and synonyms of the targeted courses.
+        
+        Up to expansion_query_limit rewrites of the query (e.g. "dl" -> "deep
+        learning") are searched together with it in one batched request and the
+        results are fused by best score. metadata_expansion_limit is no longer
+        used: expansions come from the index built at ingest time.
+        
+        The vector ranking is then fused with a BM25 ranking of the lecture chunks
+        by reciprocal rank, and exact_match_boost / phrase_match_boost reward
+        chunks containing the query terms or the query phrase.
+        
+        min_score is a floor on vector similarity, applied before fusion: vector
+        hits below it are dropped whether or not the query has BM25 hits, and
+        fusion only orders what remains. Chunks found by BM25 alone matched the
+        query terms and are not subject to it.
         """
         try:
-            logger.info(f"DEBUG: Search called with query='{query}', limit={limit}, course_ids={course_ids}, min_score={min_score}")
+            logger.debug(f"Search called with query='{query}', limit={limit}, course_ids={course_ids}, min_score={min_score}")
             
             if not query or not query.strip():
-                logger.warning("DEBUG: Empty query provided, returning empty results")
+                logger.warning("Empty query provided, returning empty results")
                 return {"content_chunks": [], "total_count": 0, "query": query, "limit": limit}
             
             # 1. Lowercase and Normalize Query
             original_query_lower = query.lower()
             # Keep normalization for consistency? Or rely on embeddings? Let's keep it for now.
             normalized_query_lower = self._normalize_query(original_query_lower) 
-            logger.info(f"DEBUG: Normalized query: '{normalized_query_lower}'")
+            logger.debug(f"Normalized query: '{normalized_query_lower}'")
             
             # Prepare filter based on course_ids
             filter_dict = {}
@@ -825,212 +1449,109 @@ def search_courses_sync(
                 # Ensure course_ids are strings if they aren't already
                 safe_course_ids = [str(cid) for cid in course_ids if cid] # Filter out empty/None IDs
                 if safe_course_ids:
-                    logger.info(f"DEBUG: Using course filter: {{'course_code': {{\'$in\': safe_course_ids}}}}\"")
+                    logger.debug(f"Using course filter: {{'course_code': {{\'$in\': safe_course_ids}}}}\"")
                     # Assuming 'course_code' is the metadata field to filter on
                     filter_dict = {"course_code": {"$in": safe_course_ids}}
                 else:
-                    logger.warning("DEBUG: course_ids provided but were empty after validation.")
+                    logger.warning("course_ids provided but were empty after validation.")
                     course_ids = None # Treat as no filter if validation results in empty list
             
-            # Get collections (both needed now)
-            content_collection = self.chroma.get_or_create_collection_sync(self.collection_name)
-            selector_collection_name = "course-selector" # Assuming this is the name
-            selector_collection = self.chroma.get_or_create_collection_sync(selector_collection_name)
-            logger.info(f"DEBUG: Using collections: {self.collection_name}, {selector_collection_name}")
-
-            # --- Query Expansion Logic ---
-            aggregated_acronyms: Dict[str, str] = {}
-            aggregated_synonyms: Dict[str, List[str]] = {}
-
-            # --- Refined Metadata Gathering ---           
-            if safe_course_ids: # If specific courses are targeted
-                logger.info(f"DEBUG: Fetching metadata directly from {selector_collection_name} for courses: {safe_course_ids}")
-                try:
-                    # Use the get method of ChromaService which handles fetching by ID (course code)
-                    selector_results = self.chroma.get_sync(
-                        collection_name=selector_collection_name,
-                        ids=safe_course_ids, # Fetch metadata for specified course codes
-                        include=['metadatas'] # Only fetch metadata
-                    )
-                    
-                    if selector_results and selector_results.metadatas:
-                        logger.info(f"DEBUG: Got metadata from {len(selector_results.metadatas)} entries in {selector_collection_name}")
-                        # --- Log retrieved metadata --- BEGIN
-                        for i, metadata in enumerate(selector_results.metadatas):
-                            if not metadata: continue
-                            course_code = metadata.get('course_code', 'N/A')
-                            acr_json = metadata.get('acronyms_json', '{}')
-                            syn_json = metadata.get('synonyms_json', '{}')
-                            logger.info(f"DEBUG: Metadata for {course_code} [Entry {i}]: AcronymsJSON=\"{acr_json}\", SynonymsJSON=\"{syn_json}\"")
-                        # --- Log retrieved metadata --- END
-                        for metadata in selector_results.metadatas:
-                            if not metadata: continue
-                            # Parse Acronyms (using same logic as before)
-                            try:
-                                acronyms_json = metadata.get("acronyms_json", '{}')
-                                if acronyms_json and acronyms_json != '{}':
-                                    acronyms = json.loads(acronyms_json)
-                                    if isinstance(acronyms, dict):
-                                        for k, v in acronyms.items():
-                                            if k and v and k not in aggregated_acronyms:
-                                                aggregated_acronyms[k.lower()] = str(v).lower()
-                            except Exception as e:
-                                logger.warning(f"DEBUG: Error parsing acronyms_json from course-selector metadata {metadata.get('code', '?')}: {e}")
+            # --- Query Expansion ---
+            # Variants come from the acronym/synonym index compiled when the courses were indexed
+            expansion_index = self.store.expansion_index(safe_course_ids)
+            variants = expansion_index.variants(normalized_query_lower, expansion_query_limit)
+            queries = [normalized_query_lower] + variants
+            logger.debug(f"Searching with {len(variants)} expanded variants: {variants}")
 
-                            # Parse Synonyms (using same logic as before)
-                            try:
-                                synonyms_json = metadata.get("synonyms_json", '{}')
-                                if synonyms_json and synonyms_json != '{}':
-                                    synonyms = json.loads(synonyms_json)
-                                    if isinstance(synonyms, dict):
-                                        for k, v_list in synonyms.items():
-                                            if k and isinstance(v_list, list):
-                                                lower_k = k.lower()
-                                                lower_v_list = [str(v).lower() for v in v_list if v]
-                                                if lower_k not in aggregated_synonyms:
-                                                    aggregated_synonyms[lower_k] = []
-                                                for syn in lower_v_list:
-                                                     if syn not in aggregated_synonyms[lower_k]:
-                                                         aggregated_synonyms[lower_k].append(syn)
-                            except Exception as e:
-                                logger.warning(f"DEBUG: Error parsing synonyms_json from course-selector metadata {metadata.get('code', '?')}: {e}")
-                    else:
-                        logger.warning(f"DEBUG: No results or metadata found in {selector_collection_name} for IDs: {safe_course_ids}")
-
-                except Exception as e:
-                    logger.error(f"DEBUG: Failed to fetch metadata from {selector_collection_name}: {e}", exc_info=True)
-                    # Continue without metadata if selector fetch fails, fallback handled below
-
-            # Fallback or If NO course_ids were provided: Use initial search on course-content
-            if not aggregated_acronyms and not aggregated_synonyms and not safe_course_ids:
-                logger.info(f"DEBUG: No course filter or metadata found from {selector_collection_name}. Performing initial search on {self.collection_name} for metadata.")
-                try:
-                    initial_results = self.chroma.search_sync(
-                    collection_name=self.collection_name,
-                        query=normalized_query_lower,
-                        n_results=metadata_expansion_limit, # Fetch results for metadata
-                        where=filter_dict, # Will be empty if no course_ids
-                        include=['metadatas'] # Only need metadata
+            # Lexical candidates are cheap; when they fill the limit, fewer vector candidates are needed
+            lexical_ranking = []
+            if self._ensure_lexical_index():
+                lexical_ranking = [
+                    doc_id for doc_id, _ in self.lexical_index.search(
+                        " ".join(queries), top_k=limit * 2, course_codes=safe_course_ids
                     )
-
-                    if initial_results and initial_results.metadatas:
-                        logger.info(f"DEBUG: Extracting metadata from {len(initial_results.metadatas)} initial {self.collection_name} results.")
-                        for metadata in initial_results.metadatas:
-                            if not metadata: continue
-                            # Parse Acronyms (same logic)
-                            try:
-                                acronyms_json = metadata.get("acronyms_json", '{}')
-                                if acronyms_json and acronyms_json != '{}':
-                                    acronyms = json.loads(acronyms_json)
-                                    if isinstance(acronyms, dict):
-                                        for k, v in acronyms.items():
-                                            if k and v and k not in aggregated_acronyms:
-                                                aggregated_acronyms[k.lower()] = str(v).lower()
-                            except Exception as e:
-                                logger.warning(f"DEBUG: Error parsing acronyms_json from course-content metadata: {e}")
-                            # Parse Synonyms (same logic)
-                            try:
-                                synonyms_json = metadata.get("synonyms_json", '{}')
-                                if synonyms_json and synonyms_json != '{}':
-                                    synonyms = json.loads(synonyms_json)
-                                    if isinstance(synonyms, dict):
-                                        for k, v_list in synonyms.items():
-                                            if k and isinstance(v_list, list):
-                                                lower_k = k.lower()
-                                                lower_v_list = [str(v).lower() for v in v_list if v]
-                                                if lower_k not in aggregated_synonyms:
-                                                    aggregated_synonyms[lower_k] = []
-                                                for syn in lower_v_list:
-                                                     if syn not in aggregated_synonyms[lower_k]:
-                                                         aggregated_synonyms[lower_k].append(syn)
-                            except Exception as e:
-                                logger.warning(f"DEBUG: Error parsing synonyms_json from course-content metadata: {e}")
-                except Exception as e:
-                    logger.error(f"DEBUG: Initial search on {self.collection_name} failed: {e}", exc_info=True)
-                    # Proceed without expansion if initial search fails
-
-            logger.info(f"DEBUG: Aggregated {len(aggregated_acronyms)} unique acronyms and {len(aggregated_synonyms)} synonym keys for expansion.")
-            if aggregated_acronyms or aggregated_synonyms:
-                logger.debug(f"DEBUG: Using Acronyms: {aggregated_acronyms}")
-                logger.debug(f"DEBUG: Using Synonyms: {aggregated_synonyms}")
-            
-            # --- Expansion Term Generation ---
-            expansion_terms: Set[str] = set()
-            query_tokens = normalized_query_lower.split()
-
-            for token in query_tokens:
-                # Acronym Key -> Full Form
-                if token in aggregated_acronyms:
-                    expansion_terms.add(aggregated_acronyms[token])
-                
-                # Synonym Key -> Synonyms List
-                if token in aggregated_synonyms:
-                    expansion_terms.update(aggregated_synonyms[token])
-
-                # Acronym Value (Full Form) -> Acronym Key
-                for acr_key, acr_val in aggregated_acronyms.items():
-                    if token == acr_val:
-                        expansion_terms.add(acr_key)
-
-                # Synonym Value -> Synonym Key
-                for syn_key, syn_list in aggregated_synonyms.items():
-                    if token in syn_list:
-                        expansion_terms.add(syn_key)
-
-            # Remove original query tokens from expansion terms to avoid redundancy
-            expansion_terms.difference_update(query_tokens)
-            logger.info(f"DEBUG: Found {len(expansion_terms)} potential expansion terms: {expansion_terms}")
-
+                ]
+            vector_candidates = limit if len(lexical_ranking) >= limit else limit * 2
+            
             # Initialize the all_search_results dictionary
             all_search_results = {}
             
-            # Perform the main search
-            main_results = self.chroma.search_sync(
-                collection_name=self.collection_name,
-                query=normalized_query_lower,
-                n_results=limit * 2,  # Get more results than needed to account for filtering
+            # Search with the query and its variants in one batched request
+            results_per_query = self._search_chunks_many(
+                queries=queries,
+                n_results=vector_candidates,
                 where=filter_dict,
-                include=['metadatas', 'documents', 'distances']
+                include=['metadatas', 'documents', 'distances'],
+                course_codes=safe_course_ids
             )
             
-            if main_results and main_results.ids:
-                logger.info(f"DEBUG: Raw search returned {len(main_results.ids)} results")
+            # Score fusion: each chunk keeps its best score, variants weighted slightly below the query
+            for query_index, main_results in enumerate(results_per_query):
+                weight = 1.0 if query_index == 0 else EXPANSION_SCORE_WEIGHT
+                if not main_results or not main_results.ids:
+                    continue
+                logger.debug(f"Raw search for query {query_index} returned {len(main_results.ids)} results")
                 for i, (result_id, metadata, document, distance) in enumerate(
                     zip(main_results.ids, main_results.metadatas, main_results.documents, main_results.distances)
                 ):
                     # Calculate a score that works for distances > 1.0
                     # For distances > 1.0, use an exponential decay function
                     if distance <= 1.0:
-                        score = 1.0 - distance
+                        similarity = 1.0 - distance
                     else:
                         # Use exp(-x) to map large distances to small positive scores
                         # For large distances like 1.65, score ≈ 0.19
-                        score = math.exp(-distance)
+                        similarity = math.exp(-distance)
+                    if similarity < min_score:
+                        continue
+                    score = similarity * weight
                     
                     # Log the first few results with more precision on the score
                     if i < 5:
-                        logger.info(f"DEBUG: Result {i}: ID={result_id}, distance={distance}, score={score:.8f}, min_score={min_score}")
+                        logger.debug(f"Result {i}: ID={result_id}, distance={distance}, score={score:.8f}")
                     
-                    if result_id not in all_search_results:
-                        # Very low threshold to capture any remotely relevant results
-                        effective_min_score = 0.00001  # Extremely low threshold
-                        
-                        if score >= effective_min_score:
-                            all_search_results[result_id] = {
-                                'id': result_id,
-                                'metadata': metadata,
-                                'content': document,
-                                'relevance_score': score
-                            }
-                        elif i < 5:  # Only log the first few filtered results
-                            logger.info(f"DEBUG: Result {i} filtered out due to low score: {score:.8f} < {effective_min_score}")
+                    existing = all_search_results.get(result_id)
+                    if existing is None or score > existing['relevance_score']:
+                        all_search_results[result_id] = {
+                            'id': result_id,
+                            'metadata': metadata,
+                            'content': document,
+                            'relevance_score': score
+                        }
 
+            # --- Hybrid Fusion ---
+            # Reciprocal-rank fusion of the vector and BM25 rankings, scaled so a chunk
+            # ranked first by both scores 1.0
+            if lexical_ranking:
+                vector_ranking = [
+                    result['id'] for result in
+                    sorted(all_search_results.values(), key=lambda x: x['relevance_score'], reverse=True)
+                ]
+                fused = reciprocal_rank_fusion([vector_ranking, lexical_ranking], k=RRF_K)
+                lexical_only = [doc_id for doc_id in lexical_ranking if doc_id not in all_search_results]
+                for doc_id, (document, metadata) in self._get_chunks(lexical_only).items():
+                    all_search_results[doc_id] = {
+                        'id': doc_id,
+                        'metadata': metadata,
+                        'content': document,
+                        'relevance_score': 0.0
+                    }
+                best_fused = 2.0 / (RRF_K + 1)
+                for doc_id, result in all_search_results.items():
+                    result['relevance_score'] = fused.get(doc_id, 0.0) / best_fused
+                logger.debug(f"Fused {len(vector_ranking)} vector and {len(lexical_ranking)} BM25 candidates "
+                            f"({len(lexical_only)} lexical only)")
+            
+            self._apply_match_boosts(
+                all_search_results.values(), normalized_query_lower, exact_match_boost, phrase_match_boost
+            )
+            
             # --- Final Ranking and Limiting ---
-            logger.info(f"DEBUG: Total results before final sorting: {len(all_search_results)}")
+            logger.debug(f"Total results before final sorting: {len(all_search_results)}")
             
-            # 8. Sort by relevance score in descending order
+            # 8. Sort by relevance score in descending order (min_score was applied before fusion)
             sorted_results = sorted(
-                all_search_results.values(), 
+                all_search_results.values(),
                 key=lambda x: x['relevance_score'], 
                 reverse=True
             )
@@ -1038,13 +1559,13 @@ def search_courses_sync(
             # 9. Limit the number of results
             final_results = sorted_results[:limit]
             
-            logger.info(f"DEBUG: Final results count: {len(final_results)} for original query: '{query}'")
+            logger.debug(f"Final results count: {len(final_results)} for original query: '{query}'")
             
             # Log first few results for inspection
             if final_results:
-                 logger.info("DEBUG: Top 3 final results:")
+                 logger.debug("Top 3 final results:")
                  for i, res in enumerate(final_results[:3]):
-                     logger.info(f"DEBUG: Rank {i+1}: ID={res.get('id')}, Score={res.get('relevance_score'):.4f}, Type={res.get('metadata', {}).get('content_type')}, Title={res.get('metadata', {}).get('lecture_title', res.get('metadata', {}).get('course_title', 'N/A'))}")
+                     logger.debug(f"Rank {i+1}: ID={res.get('id')}, Score={res.get('relevance_score'):.4f}, Type={res.get('metadata', {}).get('content_type')}, Title={res.get('metadata', {}).get('lecture_title', res.get('metadata', {}).get('course_title', 'N/A'))}")
             
             return {
                 "content_chunks": final_results, # Return the list of result dicts
@@ -1058,6 +1579,36 @@ def search_courses_sync(
             # Return empty structure on error
             return {"content_chunks": [], "total_count": 0, "query": query, "limit": limit}
 
+    def _apply_match_boosts(
+        self,
+        results: Any,
+        query: str,
+        exact_match_boost: float,
+        phrase_match_boost: float
+    ) -> None:
+        """
+        Boost results that contain the query's terms or the query as a phrase
+        
+        A result gains exact_match_boost times the share of query terms it
+        contains, plus phrase_match_boost if it contains the whole multi-word
+        query. Scores are rescaled so they stay within 0-1.
+        """
+        query_terms = set(lexical_tokenize(query))
+        phrase_tokens = tokenize_terms(query)
+        phrase = " ".join(phrase_tokens) if len(phrase_tokens) > 1 else None
+        if not query_terms and phrase is None:
+            return
+        
+        scale = 1.0 + exact_match_boost + phrase_match_boost
+        for result in results:
+            content_tokens = tokenize_terms(result.get('content') or "")
+            score = result['relevance_score']
+            if query_terms:
+                score += exact_match_boost * len(query_terms.intersection(content_tokens)) / len(query_terms)
+            if phrase is not None and phrase in " ".join(content_tokens):
+                score += phrase_match_boost
+            result['relevance_score'] = score / scale
+    
     def _transform_course_data(self, course_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Transform incoming course data to ensure it has the required structure
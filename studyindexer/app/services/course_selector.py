@@ -93,9 +93,13 @@ async def initialize(self) -> bool:
         """Async version of initialize for API use"""
         return self.initialize_sync()
     
-    def index_course_sync(self, course_data: Dict[str, Any]) -> str:
+    def index_course_sync(self, course_data: Dict[str, Any], embedding: Optional[List[float]] = None) -> str:
         """
         Index a course for semantic search
+        
+        Args:
+            course_data: Course JSON with "course", "weeks" and "lectures"
+            embedding: Optional precomputed embedding of the course text (list or numpy array)
         """
         if not self._initialized:
             self.initialize_sync()
@@ -129,10 +133,11 @@ def index_course_sync(self, course_data: Dict[str, Any]) -> str:
         combined_text = self._create_course_embedding_text(course_data)
         logger.info(f"Created combined text of length: {len(combined_text)}")
         
-        # Generate embedding
-        logger.info("Generating embedding...")
-        embedding = self.embedder.generate_embedding(combined_text)
-        logger.info("Embedding generated successfully")
+        # Generate embedding (unless a bulk import already did)
+        if embedding is None:
+            logger.info("Generating embedding...")
+            embedding = self.embedder.generate_embedding(combined_text)
+            logger.info("Embedding generated successfully")
         
         # Extract concepts with our improved method
         logger.info("Extracting concepts...")
@@ -229,8 +234,8 @@ async def index_course(self, course_data: Dict[str, Any]) -> str:
         """Async version of index_course for API use"""
         return self.index_course_sync(course_data)
     
-    async def bulk_index_courses_from_files(self, file_paths: List[str]) -> Dict[str, Any]:
-        """Index multiple courses from JSON files"""
+    def bulk_index_courses_from_files_sync(self, file_paths: List[str]) -> Dict[str, Any]:
+        """Index multiple courses from JSON files with a single embedding pass"""
         results = {
             "success": True,
             "total_indexed": 0,
@@ -239,12 +244,25 @@ async def bulk_index_courses_from_files(self, file_paths: List[str]) -> Dict[str
             "course_codes": []  # Using codes instead of IDs
         }
         
+        # Load every file and build its embedding text first
+        loaded = []
         for file_path in file_paths:
             try:
                 with open(file_path, 'r') as f:
                     course_data = json.load(f)
-                
-                course_code = self.index_course_sync(course_data)
+                loaded.append((file_path, course_data, self._create_course_embedding_text(course_data)))
+            except Exception as e:
+                results["failed"].append({
+                    "file": file_path,
+                    "error": str(e)
+                })
+        
+        # Embed all courses together (large imports fan out to worker processes)
+        embeddings = self.embedder.generate_embeddings_array([text for _, _, text in loaded]) if loaded else []
+        
+        for (file_path, course_data, _), embedding in zip(loaded, embeddings):
+            try:
+                course_code = self.index_course_sync(course_data, embedding=embedding)
                 results["indexed"].append({
                     "file": file_path,
                     "course_code": course_code
@@ -262,6 +280,12 @@ async def bulk_index_courses_from_files(self, file_paths: List[str]) -> Dict[str
             
         return results
     
+    async def bulk_index_courses_from_files(self, file_paths: List[str]) -> Dict[str, Any]:
+        """Index multiple courses from JSON files"""
+        # Keep the bulk import off the event loop so other requests are served
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.bulk_index_courses_from_files_sync, file_paths)
+    
     async def get_course(self, course_code: str) -> Dict[str, Any]:
         """Get course details by code"""
         if not self._initialized:
@@ -279,7 +303,11 @@ async def get_course(self, course_code: str) -> Dict[str, Any]:
         # Return the metadata as course info
         return result.metadatas[0]
     
-    def select_courses_sync(self, search_query: CourseSelectorQuery) -> Tuple[int, List[CourseMatchResult], float]:
+    def select_courses_sync(
+        self,
+        search_query: CourseSelectorQuery,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[int, List[CourseMatchResult], float]:
         """Find relevant courses based on a search query and subscribed courses"""
         if not self._initialized:
             self.initialize_sync()
@@ -308,8 +336,9 @@ def select_courses_sync(self, search_query: CourseSelectorQuery) -> Tuple[int, L
             )
             return self._process_search_results(results, start_time, search_text)
             
-        # For semantic search, generate embedding
-        query_embedding = self.embedder.generate_embedding(search_text)
+        # For semantic search, generate embedding (unless the caller already did)
+        if query_embedding is None:
+            query_embedding = self.embedder.embed_query(search_text)
         
         # Search collection with a higher n_results to allow more potential matches
         # We'll filter by min_score later
@@ -354,8 +383,11 @@ def select_courses_sync(self, search_query: CourseSelectorQuery) -> Tuple[int, L
     
     async def select_courses(self, search_query: CourseSelectorQuery) -> Tuple[int, List[CourseMatchResult], float]:
         """Async version of select_courses for API use"""
-        # Direct call to sync version and return its result
-        return self.select_courses_sync(search_query)
+        # Embed through the batching dispatcher so concurrent searches share a forward pass
+        query_embedding = None
+        if search_query.query:
+            query_embedding = await self.embedder.embed_query_async(search_query.query)
+        return self.select_courses_sync(search_query, query_embedding=query_embedding)
     
     def _create_course_embedding_text(self, course_data: Dict[str, Any]) -> str:
         """Create text for embedding from course data"""
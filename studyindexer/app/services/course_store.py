@@ -0,0 +1,410 @@
+"""
+Side-store for course- and week-level fields of course content
+
+Lecture chunks used to repeat the course description, summaries, concepts and
+acronym/synonym maps in every chunk's metadata. Those fields are held here once
+per course and once per week instead, in SQLite, with an in-memory copy used to
+hydrate chunk metadata after a search.
+
+Each course's acronyms and synonyms are also compiled into an ExpansionIndex
+when the course is stored, so query expansion is a dictionary lookup.
+
+The original structured course JSON is kept too, keyed by course id and code,
+with the course's list entry beside it, so reading a course or a page of the
+course list is a single keyed query instead of a scan of the vector store.
+"""
+import os
+import re
+import json
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fields kept per course and per week; the names match the chunk metadata keys they hydrate
+COURSE_FIELDS = ("course_description", "course_summary", "course_concepts", "acronyms_json", "synonyms_json")
+WEEK_FIELDS = ("week_summary", "week_concepts")
+
+_TERM_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize_terms(text: str) -> List[str]:
+    """Lowercase word tokens used for expansion lookups"""
+    return _TERM_PATTERN.findall(text.lower())
+
+
+class ExpansionIndex:
+    """
+    Inverted acronym/synonym dictionary: term or phrase -> the terms it expands to
+
+    Acronyms expand both ways (DL -> deep learning, deep learning -> DL); a
+    synonym key expands to its synonyms and each synonym back to the key.
+    """
+
+    def __init__(self, terms: Optional[Dict[str, List[str]]] = None):
+        """Wrap a compiled term dictionary"""
+        self.terms = terms or {}
+        self.max_words = max((len(term.split()) for term in self.terms), default=1)
+
+    @classmethod
+    def compile(cls, acronyms: Dict[str, Any], synonyms: Dict[str, Any]) -> "ExpansionIndex":
+        """Build the index from a course's acronym and synonym maps"""
+        terms: Dict[str, List[str]] = {}
+
+        def link(source: Any, target: Any) -> None:
+            source_key = " ".join(tokenize_terms(str(source)))
+            target_text = " ".join(str(target).lower().split())
+            if source_key and target_text and source_key != target_text:
+                expansions = terms.setdefault(source_key, [])
+                if target_text not in expansions:
+                    expansions.append(target_text)
+
+        for acronym, full_form in (acronyms or {}).items():
+            link(acronym, full_form)
+            link(full_form, acronym)
+        for term, alternatives in (synonyms or {}).items():
+            if not isinstance(alternatives, list):
+                continue
+            for alternative in alternatives:
+                link(term, alternative)
+                link(alternative, term)
+        return cls(terms)
+
+    @classmethod
+    def merge(cls, indexes: List["ExpansionIndex"]) -> "ExpansionIndex":
+        """Combine several indexes into one"""
+        terms: Dict[str, List[str]] = {}
+        for index in indexes:
+            for term, expansions in index.terms.items():
+                merged = terms.setdefault(term, [])
+                merged.extend(expansion for expansion in expansions if expansion not in merged)
+        return cls(terms)
+
+    def variants(self, query: str, limit: int) -> List[str]:
+        """
+        Rewrites of the query with one matched term replaced by an expansion
+
+        The longest matching phrase at each position wins. At most limit
+        variants are returned, in query order.
+        """
+        tokens = tokenize_terms(query)
+        variants: List[str] = []
+        i = 0
+        while i < len(tokens) and len(variants) < limit:
+            for size in range(min(self.max_words, len(tokens) - i), 0, -1):
+                expansions = self.terms.get(" ".join(tokens[i:i + size]))
+                if expansions:
+                    for expansion in expansions:
+                        variant = " ".join(tokens[:i] + [expansion] + tokens[i + size:])
+                        if variant not in variants:
+                            variants.append(variant)
+                    i += size
+                    break
+            else:
+                i += 1
+        return variants[:limit]
+
+
+class CourseStore:
+    """
+    SQLite-backed lookup of course and week fields keyed by course/week id
+
+    Every row is also kept in memory, so hydrating search results never touches
+    the database. Expansion indexes merged for a set of courses are kept in a
+    bounded LRU.
+    """
+
+    def __init__(self, path: str, max_merged_expansions: int = 256):
+        """Open (or create) the store at the given path and load it into memory"""
+        self.path = path
+        self.max_merged_expansions = max(1, max_merged_expansions)
+        self._lock = threading.Lock()
+        self._courses: Dict[str, Dict[str, Any]] = {}
+        self._weeks: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._codes: Dict[str, str] = {}
+        self._expansions: Dict[str, ExpansionIndex] = {}
+        self._merged_expansions: "OrderedDict[Tuple[str, ...], ExpansionIndex]" = OrderedDict()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS courses (course_id TEXT PRIMARY KEY, course_code TEXT, "
+            + ", ".join(f"{field} TEXT" for field in COURSE_FIELDS) + ")"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(courses)")}
+        if "course_code" not in columns:
+            self._conn.execute("ALTER TABLE courses ADD COLUMN course_code TEXT")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS weeks (course_id TEXT NOT NULL, week_id TEXT NOT NULL, "
+            + ", ".join(f"{field} TEXT" for field in WEEK_FIELDS)
+            + ", PRIMARY KEY (course_id, week_id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS course_documents (course_id TEXT PRIMARY KEY, course_code TEXT, "
+            "listing TEXT NOT NULL, document TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS course_documents_code ON course_documents (course_code)"
+        )
+        self._conn.commit()
+        self._load()
+        logger.info(f"Course store opened at {path} ({len(self._courses)} courses, {len(self._weeks)} weeks)")
+
+    def _load(self) -> None:
+        """Read every row into the in-memory lookups"""
+        with self._lock:
+            for row in self._conn.execute(f"SELECT course_id, course_code, {', '.join(COURSE_FIELDS)} FROM courses"):
+                self._set_course_locked(row[0], row[1], dict(zip(COURSE_FIELDS, row[2:])))
+            for row in self._conn.execute(f"SELECT course_id, week_id, {', '.join(WEEK_FIELDS)} FROM weeks"):
+                self._weeks[(row[0], row[1])] = dict(zip(WEEK_FIELDS, row[2:]))
+
+    def _set_course_locked(self, course_id: str, course_code: Optional[str], course: Dict[str, Any]) -> None:
+        """Cache a course row and compile its expansion index (caller holds the lock)"""
+        self._courses[course_id] = course
+        if course_code:
+            self._codes[course_code] = course_id
+
+        def parse(value: Any) -> Dict[str, Any]:
+            try:
+                parsed = json.loads(value) if value else {}
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring malformed acronym/synonym JSON for course {course_id}")
+                return {}
+            return parsed if isinstance(parsed, dict) else {}
+
+        self._expansions[course_id] = ExpansionIndex.compile(
+            parse(course.get("acronyms_json")), parse(course.get("synonyms_json"))
+        )
+        self._merged_expansions.clear()
+
+    def put_course(
+        self,
+        course_id: str,
+        course: Dict[str, Any],
+        weeks: Dict[str, Dict[str, Any]],
+        course_code: Optional[str] = None
+    ) -> None:
+        """
+        Store a course's fields and replace its weeks
+
+        Args:
+            course_id: Course ID
+            course: Course fields (keys from COURSE_FIELDS)
+            weeks: Week fields (keys from WEEK_FIELDS) by week ID
+            course_code: Course code, used to find the course's expansion index
+        """
+        course_row = {field: course.get(field, "") for field in COURSE_FIELDS}
+        week_rows = {
+            (course_id, str(week_id)): {field: week.get(field, "") for field in WEEK_FIELDS}
+            for week_id, week in weeks.items()
+        }
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO courses (course_id, course_code, {', '.join(COURSE_FIELDS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(COURSE_FIELDS))})",
+                (course_id, course_code, *course_row.values())
+            )
+            self._conn.execute("DELETE FROM weeks WHERE course_id = ?", (course_id,))
+            self._conn.executemany(
+                f"INSERT INTO weeks (course_id, week_id, {', '.join(WEEK_FIELDS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(WEEK_FIELDS))})",
+                [(key[0], key[1], *row.values()) for key, row in week_rows.items()]
+            )
+            self._conn.commit()
+
+            self._set_course_locked(course_id, course_code, course_row)
+            for key in [key for key in self._weeks if key[0] == course_id]:
+                del self._weeks[key]
+            self._weeks.update(week_rows)
+
+    def delete_course(self, course_id: str) -> None:
+        """Remove a course, its weeks and its document"""
+        with self._lock:
+            self._conn.execute("DELETE FROM courses WHERE course_id = ?", (course_id,))
+            self._conn.execute("DELETE FROM weeks WHERE course_id = ?", (course_id,))
+            self._conn.execute("DELETE FROM course_documents WHERE course_id = ?", (course_id,))
+            self._conn.commit()
+            self._courses.pop(course_id, None)
+            self._expansions.pop(course_id, None)
+            self._merged_expansions.clear()
+            for code in [code for code, owner in self._codes.items() if owner == course_id]:
+                del self._codes[code]
+            for key in [key for key in self._weeks if key[0] == course_id]:
+                del self._weeks[key]
+
+    def get_course(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """Fields of a course, or None if it is not stored"""
+        return self._courses.get(str(course_id))
+
+    def course_ids(self) -> List[str]:
+        """IDs of every course with stored fields or a stored document"""
+        with self._lock:
+            document_ids = [row[0] for row in self._conn.execute("SELECT course_id FROM course_documents")]
+            return sorted(set(self._courses) | set(document_ids))
+
+    def has_course(self, course_id: str) -> bool:
+        """Whether a course is stored"""
+        return str(course_id) in self._courses
+
+    def put_document(
+        self,
+        course_id: str,
+        document: Dict[str, Any],
+        listing: Dict[str, Any],
+        course_code: Optional[str] = None
+    ) -> None:
+        """
+        Store a course's original JSON, replacing any earlier version
+
+        Args:
+            course_id: Course ID
+            document: Structured course JSON as it was ingested
+            listing: The course's entry in the course list
+            course_code: Course code, a second key for get_document
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO course_documents (course_id, course_code, listing, document) "
+                "VALUES (?, ?, ?, ?)",
+                (course_id, course_code, json.dumps(listing), json.dumps(document))
+            )
+            self._conn.commit()
+
+    def get_document(self, key: str) -> Optional[Dict[str, Any]]:
+        """Original JSON of a course by course ID or course code, or None if it is not stored"""
+        key = str(key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT document FROM course_documents WHERE course_id = ?", (key,)
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT document FROM course_documents WHERE course_code = ? LIMIT 1", (key,)
+                ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def has_document(self, course_id: str) -> bool:
+        """Whether a course's original JSON is stored"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM course_documents WHERE course_id = ?", (str(course_id),)
+            ).fetchone()
+        return row is not None
+
+    def list_documents(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """A page of course list entries, ordered by course code"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT listing FROM course_documents ORDER BY course_code, course_id LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def document_count(self) -> int:
+        """Number of stored course documents"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM course_documents").fetchone()[0]
+
+    def expansion_index(self, course_codes: Optional[List[str]] = None) -> ExpansionIndex:
+        """
+        Expansion index for some courses (by course code or ID), or all courses
+
+        Merged indexes are cached until the next write, evicting the least
+        recently used beyond max_merged_expansions.
+        """
+        with self._lock:
+            if course_codes:
+                course_ids = tuple(sorted({self._codes.get(code, code) for code in course_codes}))
+            else:
+                course_ids = tuple(sorted(self._expansions))
+            merged = self._merged_expansions.get(course_ids)
+            if merged is not None:
+                self._merged_expansions.move_to_end(course_ids)
+                return merged
+            merged = ExpansionIndex.merge(
+                [self._expansions[course_id] for course_id in course_ids if course_id in self._expansions]
+            )
+            self._merged_expansions[course_ids] = merged
+            while len(self._merged_expansions) > self.max_merged_expansions:
+                self._merged_expansions.popitem(last=False)
+            return merged
+
+    def export_courses(self, course_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Every stored row of some courses (default all), one entry per course
+
+        Entries hold course_id, course_code, course fields, weeks by week ID
+        and, when stored, the course document and list entry; import_courses
+        loads them back.
+        """
+        wanted = set(map(str, course_ids)) if course_ids is not None else None
+        with self._lock:
+            codes = {course_id: code for code, course_id in self._codes.items()}
+            documents = {
+                row[0]: row[1:]
+                for row in self._conn.execute("SELECT course_id, course_code, listing, document FROM course_documents")
+            }
+            entries = []
+            for course_id in sorted(set(self._courses) | set(documents)):
+                if wanted is not None and course_id not in wanted:
+                    continue
+                document = documents.get(course_id)
+                entries.append({
+                    "course_id": course_id,
+                    "course_code": codes.get(course_id) or (document[0] if document else None),
+                    "course": self._courses.get(course_id, {}),
+                    "weeks": {key[1]: week for key, week in self._weeks.items() if key[0] == course_id},
+                    "listing": json.loads(document[1]) if document else None,
+                    "document": json.loads(document[2]) if document else None
+                })
+        return entries
+
+    def import_courses(self, entries: List[Dict[str, Any]]) -> int:
+        """Store entries written by export_courses, replacing the same courses; returns how many were loaded"""
+        for entry in entries:
+            course_id = str(entry["course_id"])
+            self.put_course(course_id, entry.get("course") or {}, entry.get("weeks") or {},
+                            course_code=entry.get("course_code"))
+            if entry.get("document") is not None:
+                self.put_document(course_id, entry["document"], entry.get("listing") or {},
+                                  course_code=entry.get("course_code"))
+        return len(entries)
+
+    def hydrate(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add the course and week fields of a lecture chunk's metadata
+
+        Stored fields take precedence over the same keys left in the metadata
+        by chunks written before the side-store existed; those keys are only
+        used when the store has nothing for the course or week.
+        """
+        if not metadata or metadata.get("content_type") != "lecture_chunk":
+            return metadata
+        course_id = str(metadata.get("course_id", ""))
+        course = self._courses.get(course_id)
+        week = self._weeks.get((course_id, str(metadata.get("week_id", ""))))
+        if course is None and week is None:
+            return metadata
+        return {**metadata, **(course or {}), **(week or {})}
+
+    def hydrate_many(self, metadatas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """hydrate() for a list of metadata dicts"""
+        return [self.hydrate(metadata) for metadata in metadatas]
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of stored courses and weeks"""
+        return {
+            "path": self.path,
+            "courses": len(self._courses),
+            "weeks": len(self._weeks),
+            "documents": self.document_count(),
+            "expansion_terms": sum(len(index.terms) for index in self._expansions.values())
+        }
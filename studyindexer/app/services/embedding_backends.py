@@ -0,0 +1,288 @@
+"""
+Inference backends for the embedding service
+
+The default backend runs the SentenceTransformer model in PyTorch. The ONNX
+backend runs an exported copy of the same model in ONNX Runtime with dynamic
+int8 quantization, which is considerably faster on CPU-only hosts. Both return
+float32 numpy arrays so EmbeddingService can switch between them freely.
+
+torch, sentence_transformers and onnxruntime are imported only when a backend
+is created, so importing this module is cheap.
+"""
+import numpy as np
+from typing import List, Dict, Any, Optional
+import os
+import json
+import time
+import inspect
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_BACKENDS = ("torch", "onnx")
+
+# Files written to an ONNX export directory
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+ONNX_CONFIG_FILE = "embedding_config.json"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+
+
+class TorchBackend:
+    """Runs the SentenceTransformer model in PyTorch"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str, device: str = "cpu", num_threads: Optional[int] = None):
+        """Load the SentenceTransformer model"""
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model = SentenceTransformer(model_name, device=device)
+        self.max_seq_length = self.model.max_seq_length
+        self.tokenizer = self.model.tokenizer
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode a list of texts into a (len(texts), dim) float32 array"""
+        import torch
+
+        with torch.no_grad():
+            return self.model.encode(texts)
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = True) -> Dict[str, Any]:
+    """
+    Export a SentenceTransformer model to ONNX and optionally quantize it to int8
+
+    Pooling and normalization run in numpy at inference time, so only the
+    transformer is exported. The settings they need are saved next to the graph.
+
+    Args:
+        model_name: SentenceTransformer model name or path
+        output_dir: Directory the ONNX files are written to
+        quantize: Also write a dynamically int8-quantized copy of the graph
+
+    Returns:
+        The saved embedding configuration
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    class TransformerOnly(torch.nn.Module):
+        """Wraps the transformer module so the exported graph returns token embeddings"""
+
+        def __init__(self, auto_model: torch.nn.Module):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.auto_model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids
+            )[0]
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    model.eval()
+
+    transformer = model[0]
+    pooling_mode = "mean"
+    normalize = False
+    for module in model:
+        if hasattr(module, "get_pooling_mode_str"):
+            pooling_mode = module.get_pooling_mode_str()
+        if type(module).__name__ == "Normalize":
+            normalize = True
+    if pooling_mode not in ("mean", "cls"):
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling_mode}")
+
+    fp32_path = os.path.join(output_dir, ONNX_FP32_FILE)
+    logger.info(f"Exporting {model_name} to {fp32_path}...")
+    sample = model.tokenizer(["export sample"], return_tensors="pt")
+    token_type_ids = sample.get("token_type_ids", torch.zeros_like(sample["input_ids"]))
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # The TorchScript exporter handles the dynamic batch/sequence axes directly
+        export_kwargs["dynamo"] = False
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in
+                    ("input_ids", "attention_mask", "token_type_ids", "token_embeddings")}
+    with torch.no_grad():
+        torch.onnx.export(
+            TransformerOnly(transformer.auto_model),
+            (sample["input_ids"], sample["attention_mask"], token_type_ids),
+            fp32_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            do_constant_folding=True,
+            **export_kwargs
+        )
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        int8_path = os.path.join(output_dir, ONNX_INT8_FILE)
+        logger.info(f"Quantizing {fp32_path} to int8...")
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    model.tokenizer.save_pretrained(output_dir)
+    config = {
+        "model_name": model_name,
+        "max_seq_length": model.max_seq_length,
+        "pooling_mode": pooling_mode,
+        "normalize": normalize,
+        "dimensions": model.get_sentence_embedding_dimension()
+    }
+    with open(os.path.join(output_dir, ONNX_CONFIG_FILE), "w") as f:
+        json.dump(config, f, indent=2)
+
+    logger.info(f"ONNX export complete: {output_dir}")
+    return config
+
+
+class OnnxBackend:
+    """
+    Runs an exported copy of the model in ONNX Runtime
+
+    The export is created on first use if it does not exist yet. By default the
+    int8-quantized graph is used; set quantized=False to run the fp32 graph.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        model_dir: str,
+        quantized: bool = True,
+        num_threads: Optional[int] = None
+    ):
+        """Load the tokenizer and ONNX Runtime session, exporting the model if needed"""
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        graph_file = ONNX_INT8_FILE if quantized else ONNX_FP32_FILE
+        graph_path = os.path.join(model_dir, graph_file)
+        if not os.path.exists(graph_path) or not os.path.exists(os.path.join(model_dir, ONNX_CONFIG_FILE)):
+            logger.info(f"No ONNX export found at {model_dir}, exporting {model_name}")
+            export_onnx_model(model_name, model_dir, quantize=quantized)
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE)) as f:
+            self.config = json.load(f)
+        self.max_seq_length = self.config["max_seq_length"]
+        self.pooling_mode = self.config["pooling_mode"]
+        self.normalize = self.config["normalize"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, ONNX_TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            graph_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        logger.info(f"ONNX Runtime session ready: {graph_path}")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode a list of texts into a (len(texts), dim) float32 array"""
+        if not texts:
+            # An empty batch would produce 1-D feeds the session rejects
+            return np.empty((0, self.config["dimensions"]), dtype=np.float32)
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        if self.pooling_mode == "cls":
+            embeddings = token_embeddings[:, 0]
+        else:
+            mask = feeds["attention_mask"][..., None].astype(np.float32)
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings.astype(np.float32)
+
+
+def default_onnx_dir(model_name: str) -> str:
+    """Directory the ONNX export of a model is stored in"""
+    base_dir = os.environ.get("EMBEDDING_ONNX_DIR", "./data/onnx")
+    return os.path.join(base_dir, model_name.strip("/").replace("/", "__"))
+
+
+def create_embedding_backend(
+    backend: str,
+    model_name: str,
+    device: str = "cpu",
+    num_threads: Optional[int] = None
+):
+    """
+    Create an inference backend by name
+
+    Args:
+        backend: "torch" or "onnx"
+        model_name: SentenceTransformer model name or path
+        device: Torch device (the ONNX backend always runs on CPU)
+        num_threads: Intra-op threads, or None for the library default
+
+    Returns:
+        A backend exposing encode(texts) -> np.ndarray
+    """
+    if backend == "torch":
+        return TorchBackend(model_name, device=device, num_threads=num_threads)
+    if backend == "onnx":
+        return OnnxBackend(
+            model_name,
+            model_dir=default_onnx_dir(model_name),
+            quantized=os.environ.get("EMBEDDING_ONNX_QUANTIZED", "true").lower() == "true",
+            num_threads=num_threads
+        )
+    raise ValueError(f"Unknown embedding backend '{backend}', expected one of {SUPPORTED_BACKENDS}")
+
+
+def check_backend_parity(reference, candidate, texts: List[str]) -> Dict[str, Any]:
+    """
+    Compare a candidate backend against a reference backend
+
+    Reports the cosine similarity between both backends' embeddings of the same
+    texts (drift = 1 - cosine) and the mean single-text latency of each.
+    """
+    if not texts:
+        raise ValueError("At least one text is required to compare backends")
+    ref = reference.encode(texts)
+    cand = candidate.encode(texts)
+    ref = ref / np.clip(np.linalg.norm(ref, axis=1, keepdims=True), 1e-12, None)
+    cand = cand / np.clip(np.linalg.norm(cand, axis=1, keepdims=True), 1e-12, None)
+    cosine = (ref * cand).sum(axis=1)
+
+    def single_text_latency_ms(backend) -> float:
+        start = time.perf_counter()
+        for text in texts:
+            backend.encode([text])
+        return (time.perf_counter() - start) * 1000 / max(1, len(texts))
+
+    reference_ms = single_text_latency_ms(reference)
+    candidate_ms = single_text_latency_ms(candidate)
+    return {
+        "reference": reference.name,
+        "candidate": candidate.name,
+        "texts": len(texts),
+        "mean_cosine": float(cosine.mean()),
+        "min_cosine": float(cosine.min()),
+        "max_drift": float(1.0 - cosine.min()),
+        "reference_latency_ms": round(reference_ms, 3),
+        "candidate_latency_ms": round(candidate_ms, 3),
+        "speedup": round(reference_ms / candidate_ms, 2) if candidate_ms > 0 else None
+    }
@@ -2,17 +2,435 @@
 Embedding service for generating vector embeddings of text
 Based on the implementation specification in Embedding_Service_Implementation.md
 """
-from sentence_transformers import SentenceTransformer
-import torch
 import numpy as np
-from typing import List, Union, Optional, Dict, Any
+from typing import List, Union, Optional, Dict, Any, Callable, Tuple, Iterator
+import os
 import re
+import hashlib
+import sqlite3
+import threading
+import time
+import asyncio
 import concurrent.futures
+import multiprocessing
+from collections import OrderedDict
 from asyncio import get_event_loop
 import logging
+from app.services.embedding_backends import create_embedding_backend, SUPPORTED_BACKENDS
 
 logger = logging.getLogger(__name__)
 
+# Inference backend held by each ProcessPoolEmbedder worker process
+_worker_backend = None
+
+
+def _init_embedding_worker(backend: str, model_name: str, device: str, num_threads: int) -> None:
+    """Load a private copy of the model inside a worker process"""
+    global _worker_backend
+    _worker_backend = create_embedding_backend(backend, model_name, device=device, num_threads=num_threads)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    """Encode one shard of texts inside a worker process"""
+    return _worker_backend.encode(texts)
+
+
+class EmbeddingCache:
+    """
+    Disk-backed, content-addressed cache of embedding vectors
+
+    Entries are keyed by a hash of (model name, preprocessed text), so a text
+    that has already been embedded by the same model is never encoded twice,
+    even across restarts. The cache is bounded by entry count and evicts the
+    least recently used vectors first.
+
+    Lookups never write: last-used times of hits are held in memory and
+    flushed with the next put (or once enough have piled up), and the entry
+    count is kept as a running total instead of being counted per put.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _MAX_PARAMS = 500
+
+    # Pending last-used updates flushed by a lookup once this many have accumulated
+    _TOUCH_FLUSH_SIZE = 1024
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        """Open (or create) the cache database at the given path"""
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._pending_touches: Dict[str, float] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        logger.info(f"Embedding cache opened at {path} (max_entries={max_entries}, entries={self._count})")
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """Build the content address for a (model, preprocessed text) pair"""
+        digest = hashlib.sha256()
+        digest.update(model_name.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up several keys at once, returning only the ones that were found"""
+        found: Dict[str, np.ndarray] = {}
+        if not keys:
+            return found
+
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique_keys), self._MAX_PARAMS):
+                batch = unique_keys[start:start + self._MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                self._pending_touches.update((key, now) for key in found)
+                if len(self._pending_touches) >= self._TOUCH_FLUSH_SIZE:
+                    self._flush_touches_locked()
+                    self._conn.commit()
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """Store several vectors, evicting the oldest entries if the cache is full"""
+        if not items:
+            return
+
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            # Keys are content addresses, so an existing row already holds the same vector
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                rows
+            ).rowcount
+            self._count += inserted
+            if inserted < len(rows):
+                self._pending_touches.update((key, now) for key in items)
+            self._flush_touches_locked()
+            self._evict_locked()
+            self._conn.commit()
+
+    def flush(self) -> None:
+        """Write pending last-used times to disk"""
+        with self._lock:
+            self._flush_touches_locked()
+            self._conn.commit()
+
+    def _flush_touches_locked(self) -> None:
+        """Apply pending last-used times in one statement (caller holds the lock and commits)"""
+        if not self._pending_touches:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE key = ?",
+            [(last_used, key) for key, last_used in self._pending_touches.items()]
+        )
+        self._pending_touches.clear()
+
+    def _evict_locked(self) -> None:
+        """Drop least recently used entries above max_entries (caller holds the lock)"""
+        overflow = self._count - self.max_entries
+        if overflow <= 0:
+            return
+
+        evicted = self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            "SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (overflow,)
+        ).rowcount
+        self._count -= evicted
+        self.evictions += evicted
+        logger.info(f"Evicted {evicted} entries from embedding cache")
+
+    def clear(self) -> None:
+        """Remove every cached vector"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._pending_touches.clear()
+            self._count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": self._count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "pending_touches": len(self._pending_touches),
+            "hit_rate": (self.hits / lookups) if lookups else 0.0
+        }
+
+
+class ProcessPoolEmbedder:
+    """
+    Multi-process embedding engine for bulk ingestion
+
+    Large text lists are split into shards and encoded in parallel by worker
+    processes that each hold their own copy of the model, so bulk imports use
+    every core without holding the API process's GIL. Results are returned in
+    input order.
+    """
+
+    def __init__(self, backend: str, model_name: str, device: str, workers: int, shard_size: int = 128):
+        """Configure the pool; worker processes are started on first use"""
+        self.backend = backend
+        self.model_name = model_name
+        self.device = device
+        self.workers = max(1, workers)
+        self.shard_size = max(1, shard_size)
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        """Start the worker processes if they are not running yet"""
+        with self._lock:
+            if self._pool is None:
+                # Split the cores between workers so they do not oversubscribe the CPU
+                threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+                logger.info(f"Starting {self.workers} embedding worker processes "
+                            f"({threads_per_worker} threads each)")
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # spawn avoids forking a process that already holds torch threads
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_embedding_worker,
+                    initargs=(self.backend, self.model_name, self.device, threads_per_worker)
+                )
+            return self._pool
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts across the worker processes, preserving input order"""
+        shards = [texts[i:i + self.shard_size] for i in range(0, len(texts), self.shard_size)]
+        logger.info(f"Encoding {len(texts)} texts in {len(shards)} shards across {self.workers} processes")
+        try:
+            # Executor.map yields results in submission order
+            results = list(self._get_pool().map(_encode_in_worker, shards))
+        except concurrent.futures.process.BrokenProcessPool:
+            # A worker died - drop the pool so the next call starts fresh processes
+            self.shutdown()
+            raise
+        return np.concatenate(results, axis=0)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded in-memory LRU of query embeddings with a time-to-live
+
+    Search queries repeat a lot, so their vectors are kept in process memory
+    keyed by normalized text and served without touching the model or the
+    on-disk cache. Entries older than ttl_seconds are treated as misses.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600.0):
+        """Create an empty cache"""
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Key for a query: runs of whitespace collapsed, case kept
+
+        This matches the preprocessing applied before encoding, so queries
+        that share a key are encoded to the same vector.
+        """
+        return " ".join(text.split())
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return a copy of the cached embedding, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, embedding = entry
+            if self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(embedding)
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        """Store an embedding, evicting the least recently used entries beyond max_entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(embedding))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every cached query"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+class EmbeddingBatcher:
+    """
+    Asyncio dispatcher that coalesces concurrent single-text embedding requests
+
+    Each caller awaits its own future while a single worker task collects
+    requests for up to max_wait_ms (or until max_batch_size is reached) and
+    encodes them with one batched forward pass on a shared executor.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], List[List[float]]],
+        executor: concurrent.futures.Executor,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """Initialize with the batch encode function and the executor it runs on"""
+        self.encode_batch = encode_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, text: str) -> List[float]:
+        """Queue a text for the next batch and wait for its embedding"""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the worker task on the running loop if it is not running yet"""
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run(self._queue))
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """Collect queued requests into batches and encode them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            # Keep collecting until the batch is full or the wait window closes
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up do not need an embedding
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await loop.run_in_executor(self.executor, self.encode_batch, texts)
+            except Exception as e:
+                logger.error(f"Batched embedding of {len(texts)} texts failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": (self.requests / self.batches) if self.batches else 0.0
+        }
+
+
 class EmbeddingService:
     """Service for generating text embeddings"""
     
@@ -32,76 +450,347 @@ def __init__(self):
             return
             
         # Load configuration
-        self.model_name = "all-MiniLM-L6-v2"  # From config
+        self.model_name = os.environ.get("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
         self.device = "cpu"  # From config, could be "cuda" if available
         self.embedding_dim = 384  # all-MiniLM-L6-v2 has 384 dimensions
         
-        # Initialize model
+        # Inference backend: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime, int8 by default)
+        self.backend_name = os.environ.get("EMBEDDING_BACKEND", "torch").lower()
+        if self.backend_name not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND '{self.backend_name}', expected one of {SUPPORTED_BACKENDS}")
+        # Vectors from different backends are not bit-identical, so they are cached separately
+        self.cache_namespace = self.model_name
+        if self.backend_name == "onnx":
+            quantized = os.environ.get("EMBEDDING_ONNX_QUANTIZED", "true").lower() == "true"
+            self.cache_namespace = f"{self.model_name}:onnx-{'int8' if quantized else 'fp32'}"
+        
+        # Persistent cache so unchanged text is never re-encoded
+        self.cache = None
+        if os.environ.get("EMBEDDING_CACHE_ENABLED", "true").lower() == "true":
+            cache_dir = os.environ.get("EMBEDDING_CACHE_DIR", "./data/embedding_cache")
+            try:
+                self.cache = EmbeddingCache(
+                    path=os.path.join(cache_dir, "embeddings.sqlite3"),
+                    max_entries=int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+                )
+            except Exception as e:
+                # The cache is an optimization only - keep serving without it
+                logger.warning(f"Embedding cache disabled, could not open it: {str(e)}")
+                self.cache = None
+        
+        # In-memory LRU for repeated search queries
+        self.query_cache = None
+        if os.environ.get("EMBEDDING_QUERY_CACHE_ENABLED", "true").lower() == "true":
+            self.query_cache = QueryEmbeddingCache(
+                max_entries=int(os.environ.get("EMBEDDING_QUERY_CACHE_MAX_ENTRIES", "2048")),
+                ttl_seconds=float(os.environ.get("EMBEDDING_QUERY_CACHE_TTL_SECONDS", "3600"))
+            )
+        
+        # Shared executor for async callers instead of a new thread pool per call
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=int(os.environ.get("EMBEDDING_EXECUTOR_WORKERS", "2")),
+            thread_name_prefix="embedding"
+        )
+        
+        # Worker processes for bulk ingestion (disabled when EMBEDDING_PROCESS_WORKERS=0)
+        self.process_pool = None
+        self.process_min_texts = int(os.environ.get("EMBEDDING_PROCESS_MIN_TEXTS", "256"))
+        # Texts per forward pass; inputs are bucketed by length before being split
+        self.encode_batch_size = max(1, int(os.environ.get("EMBEDDING_ENCODE_BATCH_SIZE", "32")))
+        process_workers = int(os.environ.get("EMBEDDING_PROCESS_WORKERS", "0"))
+        if process_workers > 0:
+            self.process_pool = ProcessPoolEmbedder(
+                backend=self.backend_name,
+                model_name=self.model_name,
+                device=self.device,
+                workers=process_workers,
+                shard_size=int(os.environ.get("EMBEDDING_PROCESS_SHARD_SIZE", "128"))
+            )
+        
+        # Coalesce concurrent single-query requests into batched forward passes
+        self.batcher = None
+        max_batch_size = int(os.environ.get("EMBEDDING_BATCH_MAX_SIZE", "32"))
+        if max_batch_size > 1:
+            self.batcher = EmbeddingBatcher(
+                encode_batch=self.generate_embeddings,
+                executor=self.executor,
+                max_batch_size=max_batch_size,
+                max_wait_ms=float(os.environ.get("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+            )
+        
+        # The model is loaded on first use (or by start_warmup), which keeps
+        # importing and constructing the services fast
+        self.model = None
+        self._model_lock = threading.Lock()
+        self._loading = False
+        self._load_error = None
+        self._warmup_thread = None
+        self._tokenizer = None
+        self._initialized = True
+        logger.info(f"Embedding service configured ({self.backend_name} backend), model loads on first use")
+    
+    def _ensure_model(self):
+        """Load the embedding model if it has not been loaded yet"""
+        if self.model is not None:
+            return self.model
+        
+        with self._model_lock:
+            if self.model is None:
+                self._loading = True
+                try:
+                    logger.info(f"Loading embedding model {self.model_name} on {self.device} ({self.backend_name} backend)...")
+                    start_time = time.time()
+                    self.model = create_embedding_backend(self.backend_name, self.model_name, device=self.device)
+                    self._load_error = None
+                    logger.info(f"Embedding model loaded in {time.time() - start_time:.1f}s. Dimensions: {self.embedding_dim}")
+                except Exception as e:
+                    logger.error(f"Error loading embedding model: {str(e)}")
+                    self._load_error = str(e)
+                    raise
+                finally:
+                    self._loading = False
+        return self.model
+    
+    def start_warmup(self) -> None:
+        """Load the model and run a dummy encode in a background thread"""
+        if self.model is not None or (self._warmup_thread is not None and self._warmup_thread.is_alive()):
+            return
+        self._warmup_thread = threading.Thread(target=self._warmup, name="embedding-warmup", daemon=True)
+        self._warmup_thread.start()
+    
+    def _warmup(self) -> None:
+        """Body of the warm-up thread"""
         try:
-            logger.info(f"Loading embedding model {self.model_name} on {self.device}...")
-            self.model = SentenceTransformer(self.model_name, device=self.device)
-            self._initialized = True
-            logger.info(f"Embedding model loaded successfully. Dimensions: {self.embedding_dim}")
+            start_time = time.time()
+            self._ensure_model().encode(["warm up"])
+            logger.info(f"Embedding model warmed up in {time.time() - start_time:.1f}s")
         except Exception as e:
-            logger.error(f"Error loading embedding model: {str(e)}")
-            self.model = None
-            self._initialized = False
-            raise
+            logger.error(f"Embedding model warm-up failed: {str(e)}")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Report whether the model is ready to serve requests
+        
+        Status is "ready" once the model is loaded, "warming" while it is being
+        loaded, "error" if loading failed and "cold" if nothing has loaded it yet.
+        """
+        warming = self._loading or (self._warmup_thread is not None and self._warmup_thread.is_alive())
+        if warming:
+            status = "warming"
+        elif self.model is not None:
+            status = "ready"
+        elif self._load_error is not None:
+            status = "error"
+        else:
+            status = "cold"
+        
+        result = {"status": status, "model": self.model_name, "backend": self.backend_name}
+        if self._load_error is not None:
+            result["error"] = self._load_error
+        return result
     
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for a single text string"""
-        if not self._initialized or self.model is None:
-            raise ValueError("Embedding model not initialized")
-            
+        # Convert to list of floats (compatible with ChromaDB)
+        return self.generate_embedding_array(text).tolist()
+    
+    def generate_embedding_array(self, text: str, dtype: Any = np.float32) -> np.ndarray:
+        """Generate embedding for a single text string as a 1-D numpy array"""
         logger.info("Generating embedding for text...")
         # Preprocess text if needed
         processed_text = self._preprocess_text(text)
         logger.info(f"Text preprocessed, length: {len(processed_text)}")
         
+        # Serve from the persistent cache when this text was embedded before
+        cache_key = None
+        if self.cache is not None:
+            cache_key = EmbeddingCache.make_key(self.cache_namespace, processed_text)
+            cached = self.cache.get_many([cache_key])
+            if cache_key in cached:
+                logger.info("Embedding served from cache")
+                return cached[cache_key].astype(dtype, copy=False)
+        
         # Generate embedding
-        with torch.no_grad():
-            embedding = self.model.encode(processed_text)
+        embedding = self._ensure_model().encode([processed_text])[0]
+            
+        if cache_key is not None:
+            self.cache.put_many({cache_key: embedding})
             
         logger.info(f"Generated embedding with shape: {embedding.shape}")
-        # Convert to list of floats (compatible with ChromaDB)
-        return embedding.tolist()
+        return embedding.astype(dtype, copy=False)
     
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for multiple texts (batch processing)"""
-        if not self._initialized or self.model is None:
-            raise ValueError("Embedding model not initialized")
-            
+        # Convert to list of floats (compatible with ChromaDB)
+        return self.generate_embeddings_array(texts).tolist()
+    
+    def generate_embeddings_array(self, texts: List[str], dtype: Any = np.float32) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts as a (len(texts), dimensions) numpy array
+        
+        Prefer this over generate_embeddings for bulk work: the vectors stay in one
+        contiguous float32 (or float16, via dtype) block instead of being boxed into
+        Python floats. ChromaService accepts the array directly.
+        """
         logger.info(f"Generating embeddings for {len(texts)} texts...")
         # Preprocess texts
         processed_texts = [self._preprocess_text(text) for text in texts]
         logger.info("Texts preprocessed")
         
-        # Generate embeddings in one batch for efficiency
-        with torch.no_grad():
-            embeddings = self.model.encode(processed_texts)
-            
+        if self.cache is None:
+            # Generate embeddings in one batch for efficiency
+            embeddings = self._encode_batch(processed_texts)
+            logger.info(f"Generated {len(embeddings)} embeddings with shape: {embeddings.shape}")
+            return embeddings.astype(dtype, copy=False)
+        
+        # Only encode the texts the cache has not seen before
+        keys = [EmbeddingCache.make_key(self.cache_namespace, text) for text in processed_texts]
+        cached = self.cache.get_many(keys)
+        missing = {}
+        for key, text in zip(keys, processed_texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        logger.info(f"Embedding cache: {len(texts) - len(missing)} cached, {len(missing)} to encode")
+        
+        if missing:
+            # Generate embeddings in one batch for efficiency
+            encoded = self._encode_batch(list(missing.values()))
+            fresh = dict(zip(missing.keys(), encoded))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+        
+        dimensions = len(cached[keys[0]]) if keys else self.embedding_dim
+        embeddings = np.empty((len(keys), dimensions), dtype=dtype)
+        for i, key in enumerate(keys):
+            embeddings[i] = cached[key]
         logger.info(f"Generated {len(embeddings)} embeddings with shape: {embeddings.shape}")
-        # Convert to list of floats (compatible with ChromaDB)
-        return embeddings.tolist()
+        return embeddings
+    
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode preprocessed texts in input order
+        
+        Duplicate texts are encoded once, and the unique texts are encoded in
+        order of token length so each forward pass pads to a similar length
+        (a short FAQ question is not padded to a full lecture chunk).
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        if len(unique_texts) > 1:
+            order = self._length_order(unique_texts)
+            encoded = self._encode_sorted([unique_texts[i] for i in order])
+            unique_embeddings = np.empty_like(encoded)
+            unique_embeddings[order] = encoded
+        else:
+            unique_embeddings = self._encode_sorted(unique_texts)
+        
+        if len(unique_texts) == len(texts):
+            return unique_embeddings
+        position = {text: i for i, text in enumerate(unique_texts)}
+        return unique_embeddings[[position[text] for text in texts]]
+    
+    def _length_order(self, texts: List[str]) -> np.ndarray:
+        """Indices that sort texts by token length (character length before the model is loaded)"""
+        lengths = None
+        if self.model is not None:
+            try:
+                encodings = self.get_tokenizer().encode_batch(texts, add_special_tokens=False)
+                lengths = [len(encoding.ids) for encoding in encodings]
+            except Exception as e:
+                logger.warning(f"Could not tokenize for length bucketing: {str(e)}")
+        if lengths is None:
+            lengths = [len(text) for text in texts]
+        return np.argsort(lengths, kind="stable")
+    
+    def _encode_sorted(self, texts: List[str]) -> np.ndarray:
+        """Encode length-sorted texts bucket by bucket, fanning large lists out to the worker processes"""
+        if self.process_pool is not None and len(texts) >= self.process_min_texts:
+            try:
+                # Shards are contiguous slices, so each worker also gets texts of similar length
+                return self.process_pool.encode(texts)
+            except Exception as e:
+                # Fall back to in-process encoding so an import never fails on the pool
+                logger.error(f"Process pool encoding failed, encoding in-process: {str(e)}")
+        
+        model = self._ensure_model()
+        if len(texts) <= self.encode_batch_size:
+            return model.encode(texts)
+        return np.concatenate([
+            model.encode(texts[i:i + self.encode_batch_size])
+            for i in range(0, len(texts), self.encode_batch_size)
+        ], axis=0)
     
     async def generate_embedding_async(self, text: str) -> List[float]:
         """Generate embedding asynchronously"""
+        # Concurrent requests are batched into a single forward pass
+        if self.batcher is not None:
+            return await self.batcher.submit(text)
+        
         # For sentence-transformers, we'll use a thread pool to avoid blocking
         loop = get_event_loop()
-        
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(
-                executor, self.generate_embedding, text
-            )
+        return await loop.run_in_executor(
+            self.executor, self.generate_embedding, text
+        )
     
     async def generate_embeddings_async(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings asynchronously (batch processing)"""
         loop = get_event_loop()
+        return await loop.run_in_executor(
+            self.executor, self.generate_embeddings, texts
+        )
+    
+    async def generate_embeddings_array_async(self, texts: List[str], dtype: Any = np.float32) -> np.ndarray:
+        """Generate embeddings asynchronously as a numpy array (batch processing)"""
+        loop = get_event_loop()
+        return await loop.run_in_executor(
+            self.executor, self.generate_embeddings_array, texts, dtype
+        )
+    
+    def embed_query(self, query: str) -> List[float]:
+        """Generate the embedding for a search query, serving repeated queries from memory"""
+        if self.query_cache is None:
+            return self.generate_embedding(query)
         
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(
-                executor, self.generate_embeddings, texts
-            )
+        key = QueryEmbeddingCache.normalize(query)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = self.generate_embedding(query)
+            self.query_cache.put(key, embedding)
+        return embedding
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several search queries at once as a (len(queries), dimensions) float32 array
+        
+        Queries found in the query cache are served from memory and the rest are
+        encoded together in one call.
+        """
+        if self.query_cache is None:
+            return self.generate_embeddings_array(queries)
+        
+        keys = [QueryEmbeddingCache.normalize(query) for query in queries]
+        originals: Dict[str, str] = {}
+        for key, query in zip(keys, queries):
+            originals.setdefault(key, query)
+        cached = {key: self.query_cache.get(key) for key in dict.fromkeys(keys)}
+        missing = [key for key, embedding in cached.items() if embedding is None]
+        if missing:
+            fresh = self.generate_embeddings_array([originals[key] for key in missing])
+            for key, embedding in zip(missing, fresh):
+                cached[key] = embedding.tolist()
+                self.query_cache.put(key, cached[key])
+        return np.asarray([cached[key] for key in keys], dtype=np.float32)
+    
+    async def embed_query_async(self, query: str) -> List[float]:
+        """Async version of embed_query; misses go through the batching dispatcher"""
+        if self.query_cache is None:
+            return await self.generate_embedding_async(query)
+        
+        key = QueryEmbeddingCache.normalize(query)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = await self.generate_embedding_async(query)
+            self.query_cache.put(key, embedding)
+        return embedding
     
     def _preprocess_text(self, text: str) -> str:
         """Preprocess text before embedding"""
@@ -116,15 +805,65 @@ def _preprocess_text(self, text: str) -> str:
         
         return processed
     
+    def get_tokenizer(self):
+        """
+        Get the model's own fast tokenizer for counting tokens
+        
+        Returns a private tokenizers.Tokenizer copy with truncation and padding
+        disabled, so token counts and offsets reflect the full input.
+        """
+        if self._tokenizer is None:
+            from tokenizers import Tokenizer
+            
+            tokenizer = self._ensure_model().tokenizer
+            # Hugging Face fast tokenizers wrap a tokenizers.Tokenizer
+            tokenizer = getattr(tokenizer, "backend_tokenizer", tokenizer)
+            tokenizer = Tokenizer.from_str(tokenizer.to_str())
+            tokenizer.no_truncation()
+            tokenizer.no_padding()
+            self._tokenizer = tokenizer
+        return self._tokenizer
+    
+    def get_max_seq_length(self) -> int:
+        """Get the maximum number of tokens (including special tokens) the model reads"""
+        return self._ensure_model().max_seq_length
+    
     def get_dimensions(self) -> int:
         """Get the number of dimensions in the embedding"""
         return self.embedding_dim
     
     def is_initialized(self) -> bool:
-        """Check if the model is initialized"""
-        return self._initialized and self.model is not None
+        """Check if the model is loaded"""
+        return self.model is not None
 
-    def calculate_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the persistent embedding cache"""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.stats()}
+
+    def flush_cache(self) -> None:
+        """Write the persistent cache's pending last-used times to disk"""
+        if self.cache is not None:
+            self.cache.flush()
+
+    def get_query_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the in-memory query embedding cache"""
+        if self.query_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.query_cache.stats()}
+
+    def get_batcher_stats(self) -> Dict[str, Any]:
+        """Get counters for the async micro-batching dispatcher"""
+        if self.batcher is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.batcher.stats()}
+
+    def calculate_similarity(
+        self,
+        embedding1: Union[List[float], np.ndarray],
+        embedding2: Union[List[float], np.ndarray]
+    ) -> float:
         """
         Calculate cosine similarity between two embeddings
         
@@ -135,12 +874,12 @@ def calculate_similarity(self, embedding1: List[float], embedding2: List[float])
         Returns:
             Cosine similarity score between 0 and 1
         """
-        if not embedding1 or not embedding2:
+        if embedding1 is None or embedding2 is None or len(embedding1) == 0 or len(embedding2) == 0:
             return 0.0
             
-        # Convert to numpy arrays for efficient computation
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        # Arrays from generate_embedding(s)_array are used as-is, lists are converted once
+        vec1 = np.asarray(embedding1, dtype=np.float32)
+        vec2 = np.asarray(embedding2, dtype=np.float32)
         
         # Calculate cosine similarity
         dot_product = np.dot(vec1, vec2)
@@ -156,15 +895,301 @@ def calculate_similarity(self, embedding1: List[float], embedding2: List[float])
         # Ensure value is between 0 and 1
         return float(max(0.0, min(1.0, similarity)))
 
+    @staticmethod
+    def normalize_embeddings(embeddings: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+        """Return the embeddings as a float32 matrix with unit-length rows (zero rows stay zero)"""
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def similarity_top_k(
+        self,
+        queries: Union[List[List[float]], np.ndarray],
+        candidates: Union[List[List[float]], np.ndarray],
+        k: int = 10,
+        normalized: bool = False,
+        exclude_self: bool = False,
+        only_earlier: bool = False,
+        groups: Optional[List[Any]] = None,
+        max_block_bytes: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar candidates for every query by cosine similarity
+        
+        The similarity matrix is computed in blocks that fit max_block_bytes
+        (EMBEDDING_SIMILARITY_BLOCK_MB, default 64) and reduced with argpartition,
+        so e.g. 10k x 10k comparisons never materialize the full matrix.
+        
+        Args:
+            queries: (n_queries, dimensions) embeddings
+            candidates: (n_candidates, dimensions) embeddings
+            k: Number of neighbours to return per query
+            normalized: Rows are already unit length (skips the normalizing copy)
+            exclude_self: queries and candidates are the same matrix; skip row i == candidate i
+            only_earlier: queries and candidates are the same matrix; only compare row i
+                with candidates j < i (useful for de-duplication)
+            groups: queries and candidates are the same matrix; a label per row, and
+                rows with the same label are never compared, so the k neighbours
+                all come from other groups
+            max_block_bytes: Memory budget for one block of scores
+            
+        Returns:
+            (indices, scores), both (n_queries, k) and sorted by descending score.
+            Rows with fewer than k eligible candidates are padded with index -1
+            and score -inf.
+        """
+        q = np.asarray(queries, dtype=np.float32) if normalized else self.normalize_embeddings(queries)
+        c = np.asarray(candidates, dtype=np.float32) if normalized else self.normalize_embeddings(candidates)
+        if q.ndim == 1:
+            q = q.reshape(1, -1)
+        num_queries, num_candidates = len(q), len(c)
+        k = max(0, min(k, num_candidates))
+        indices = np.full((num_queries, k), -1, dtype=np.int64)
+        scores = np.full((num_queries, k), -np.inf, dtype=np.float32)
+        if k == 0 or num_queries == 0:
+            return indices, scores
+        group_codes = None
+        if groups is not None:
+            group_codes = np.unique(np.asarray([str(group) for group in groups]), return_inverse=True)[1]
+        
+        if max_block_bytes is None:
+            max_block_bytes = int(float(os.environ.get("EMBEDDING_SIMILARITY_BLOCK_MB", "64")) * 1024 * 1024)
+        # Each score needs 4 bytes plus 8 for the argpartition index array
+        block_cells = max(1, max_block_bytes // 12)
+        query_block = max(1, min(num_queries, block_cells // min(num_candidates, 4096)))
+        candidate_block = max(1, min(num_candidates, block_cells // query_block))
+        
+        for q_start in range(0, num_queries, query_block):
+            q_end = min(q_start + query_block, num_queries)
+            best_scores = scores[q_start:q_end]
+            best_indices = indices[q_start:q_end]
+            rows = np.arange(q_start, q_end)[:, None]
+            
+            for c_start in range(0, num_candidates, candidate_block):
+                c_end = min(c_start + candidate_block, num_candidates)
+                if only_earlier and c_start >= q_end - 1:
+                    break
+                block = q[q_start:q_end] @ c[c_start:c_end].T
+                
+                # Mask pairs that must not be compared (only where the ranges overlap)
+                if (exclude_self or only_earlier) and c_start < q_end and c_end > q_start:
+                    cols = np.arange(c_start, c_end)[None, :]
+                    mask = cols >= rows if only_earlier else cols == rows
+                    block[mask] = -np.inf
+                if group_codes is not None:
+                    block[group_codes[q_start:q_end, None] == group_codes[None, c_start:c_end]] = -np.inf
+                
+                # Reduce the block to its own top-k before merging with the running best
+                if block.shape[1] > k:
+                    part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+                    block_scores = np.take_along_axis(block, part, axis=1)
+                    block_indices = part + c_start
+                else:
+                    block_scores = block
+                    block_indices = np.broadcast_to(np.arange(c_start, c_end), block.shape)
+                
+                merged_scores = np.concatenate([best_scores, block_scores], axis=1)
+                merged_indices = np.concatenate([best_indices, block_indices], axis=1)
+                part = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(merged_scores, part, axis=1)
+                best_indices = np.take_along_axis(merged_indices, part, axis=1)
+            
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            scores[q_start:q_end] = np.take_along_axis(best_scores, order, axis=1)
+            indices[q_start:q_end] = np.take_along_axis(best_indices, order, axis=1)
+        
+        # Masked (-inf) slots do not point at a real candidate
+        indices[np.isneginf(scores)] = -1
+        return indices, scores
+
+    def find_near_duplicates(
+        self,
+        embeddings: Union[List[List[float]], np.ndarray],
+        threshold: float = 0.98,
+        normalized: bool = False
+    ) -> Dict[int, Tuple[int, float]]:
+        """
+        Find items that nearly duplicate an earlier item in the same list
+        
+        Returns:
+            Mapping of duplicate index -> (index of the most similar earlier item, similarity)
+        """
+        if len(embeddings) < 2:
+            return {}
+        indices, scores = self.similarity_top_k(
+            embeddings, embeddings, k=1, normalized=normalized, only_earlier=True
+        )
+        return {
+            i: (int(indices[i, 0]), float(scores[i, 0]))
+            for i in np.nonzero(scores[:, 0] >= threshold)[0].tolist()
+        }
+
+    def mmr(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        candidates: Union[List[List[float]], np.ndarray],
+        k: int = 5,
+        lambda_mult: float = 0.5,
+        normalized: bool = False
+    ) -> List[int]:
+        """
+        Select candidates by maximal marginal relevance
+        
+        Balances similarity to the query (lambda_mult=1.0) against similarity to
+        candidates already selected (lambda_mult=0.0) to diversify results.
+        
+        Returns:
+            Indices into candidates, in selection order
+        """
+        if len(candidates) == 0:
+            return []
+        c = np.asarray(candidates, dtype=np.float32) if normalized else self.normalize_embeddings(candidates)
+        query = self.normalize_embeddings(query_embedding)[0]
+        k = min(k, len(c))
+        if k <= 0:
+            return []
+        
+        relevance = c @ query
+        redundancy = np.full(len(c), -np.inf, dtype=np.float32)
+        selected: List[int] = []
+        for _ in range(k):
+            if selected:
+                scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+            else:
+                scores = relevance.copy()
+            scores[selected] = -np.inf
+            choice = int(np.argmax(scores))
+            selected.append(choice)
+            redundancy = np.maximum(redundancy, c @ c[choice])
+        return selected
+
 
 class TextChunker:
-    """Utility for chunking documents into smaller pieces"""
+    """
+    Utility for chunking documents into smaller pieces
+    
+    By default chunk_size and chunk_overlap are measured in characters. A chunker
+    created with a tokenizer (see for_model) measures them in model tokens instead
+    and never produces a chunk longer than max_tokens.
+    """
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        tokenizer=None,
+        max_tokens: Optional[int] = None
+    ):
         """Initialize with configuration"""
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        logger.info(f"TextChunker initialized with size={chunk_size}, overlap={chunk_overlap}")
+        self.tokenizer = tokenizer
+        self.token_budget = None
+        if tokenizer is not None:
+            # Special tokens ([CLS], [SEP], ...) count against the model's limit
+            special_tokens = len(tokenizer.encode("").ids)
+            limit = (max_tokens or chunk_size) - special_tokens
+            self.token_budget = max(1, min(chunk_size, limit))
+            self.chunk_overlap = min(chunk_overlap, self.token_budget // 2)
+        unit = "tokens" if tokenizer is not None else "characters"
+        logger.info(f"TextChunker initialized with size={chunk_size}, overlap={self.chunk_overlap} ({unit})")
+    
+    @classmethod
+    def for_model(cls, embedding_service: "EmbeddingService", chunk_size: Optional[int] = None,
+                  chunk_overlap: int = 32) -> "TextChunker":
+        """
+        Create a token-aware chunker that uses the embedding model's own tokenizer
+        
+        Args:
+            embedding_service: Service whose model the chunks are embedded with
+            chunk_size: Tokens per chunk, capped at the model's maximum sequence length
+            chunk_overlap: Tokens shared between consecutive chunks
+        """
+        max_tokens = embedding_service.get_max_seq_length()
+        return cls(
+            chunk_size=chunk_size or max_tokens,
+            chunk_overlap=chunk_overlap,
+            tokenizer=embedding_service.get_tokenizer(),
+            max_tokens=max_tokens
+        )
+    
+    def iter_chunks(self, text: str) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily split text into token-bounded chunks
+        
+        Chunks end at paragraph, sentence or word boundaries where possible and
+        never exceed the token budget.
+        
+        Yields:
+            Dicts with "content", character offsets "start"/"end" into text
+            (content == text[start:end]) and "token_count"
+        """
+        if self.tokenizer is None:
+            raise ValueError("iter_chunks requires a tokenizer, use TextChunker.for_model")
+        if not text or not text.strip():
+            return
+        
+        encoding = self.tokenizer.encode(text, add_special_tokens=False)
+        offsets = encoding.offsets
+        word_ids = encoding.word_ids
+        num_tokens = len(offsets)
+        budget = self.token_budget
+        
+        def is_word_start(k: int) -> bool:
+            return k == 0 or k >= num_tokens or word_ids[k] != word_ids[k - 1]
+        
+        begin = 0
+        while begin < num_tokens:
+            end = min(begin + budget, num_tokens)
+            if end < num_tokens:
+                end = self._find_break(text, offsets, begin, end, is_word_start)
+            
+            start_char, end_char = offsets[begin][0], offsets[end - 1][1]
+            token_count = end - begin
+            if not is_word_start(end):
+                # Cut inside a single over-long word: make sure re-tokenizing the
+                # piece on its own still fits the budget
+                while token_count > 1 and len(self.tokenizer.encode(
+                        text[start_char:end_char], add_special_tokens=False).ids) > budget:
+                    end -= 1
+                    token_count -= 1
+                    end_char = offsets[end - 1][1]
+            
+            yield {
+                "content": text[start_char:end_char],
+                "start": start_char,
+                "end": end_char,
+                "token_count": token_count
+            }
+            
+            if end >= num_tokens:
+                break
+            # Step back for the overlap, then forward to a token that follows whitespace
+            # (or at least starts a word) so the next chunk does not open mid-word
+            next_begin = max(begin + 1, end - self.chunk_overlap)
+            candidates = range(next_begin, end)
+            begin = next((k for k in candidates if offsets[k][0] > offsets[k - 1][1]),
+                         next((k for k in candidates if is_word_start(k)), end))
+    
+    @staticmethod
+    def _find_break(text: str, offsets: List[Tuple[int, int]], begin: int, end: int,
+                    is_word_start: Callable[[int], bool]) -> int:
+        """Pick where to end a chunk: the latest paragraph, sentence or word break in its second half"""
+        floor = begin + max(1, (end - begin) // 2)
+        sentence_break = word_break = None
+        for k in range(end, floor - 1, -1):
+            if not is_word_start(k):
+                continue
+            gap = text[offsets[k - 1][1]:offsets[k][0]]
+            if "\n" in gap and gap.count("\n") > 1:
+                return k
+            if sentence_break is None and ("\n" in gap or text[offsets[k - 1][1] - 1] in ".!?"):
+                sentence_break = k
+            if word_break is None:
+                word_break = k
+        return sentence_break or word_break or end
     
     def chunk_text(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Split text into chunks with metadata"""
@@ -173,55 +1198,69 @@ def chunk_text(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> Li
             return []
             
         logger.info(f"Chunking text of length {len(text)}")
+        
+        if self.tokenizer is not None:
+            contents = []
+            positions = []
+            for chunk in self.iter_chunks(text):
+                contents.append(chunk["content"])
+                positions.append({"char_start": chunk["start"], "char_end": chunk["end"]})
+        else:
+            contents = self._chunk_by_characters(text)
+            positions = [{} for _ in contents]
+        
+        # Add positional info to metadata
+        base_metadata = metadata or {}
+        chunks = [
+            {
+                "content": content,
+                "metadata": {**base_metadata, **position, "chunk_index": i, "total_chunks": len(contents)}
+            }
+            for i, (content, position) in enumerate(zip(contents, positions))
+        ]
+        
+        logger.info(f"Created {len(chunks)} chunks from text")
+        return chunks
+    
+    def _chunk_by_characters(self, text: str) -> List[str]:
+        """Pack paragraphs into chunks of roughly chunk_size characters"""
         chunks = []
         
         # Split text into paragraphs first
         paragraphs = self._split_into_paragraphs(text)
         logger.info(f"Split text into {len(paragraphs)} paragraphs")
         
-        current_chunk = ""
+        current_parts = []
         current_size = 0
         
         for paragraph in paragraphs:
             # If adding this paragraph would exceed chunk size
-            if current_size + len(paragraph) > self.chunk_size and current_chunk:
+            if current_size + len(paragraph) > self.chunk_size and current_parts:
                 # Save current chunk
-                chunk_data = {
-                    "content": current_chunk.strip(),
-                    "metadata": metadata.copy() if metadata else {}
-                }
-                chunks.append(chunk_data)
+                current_chunk = "".join(current_parts)
+                chunks.append(current_chunk.strip())
                 logger.debug(f"Created chunk of size {len(current_chunk)}")
                 
                 # Start new chunk with overlap
                 overlap_size = min(self.chunk_overlap, len(current_chunk))
                 if overlap_size > 0:
-                    current_chunk = current_chunk[-overlap_size:]
-                    current_size = len(current_chunk)
+                    current_parts = [current_chunk[-overlap_size:]]
+                    current_size = overlap_size
                     logger.debug(f"Started new chunk with {overlap_size} characters overlap")
                 else:
-                    current_chunk = ""
+                    current_parts = []
                     current_size = 0
             
             # Add paragraph to current chunk
-            current_chunk += paragraph
+            current_parts.append(paragraph)
             current_size += len(paragraph)
         
         # Add the last chunk if it's not empty
+        current_chunk = "".join(current_parts)
         if current_chunk.strip():
-            chunk_data = {
-                "content": current_chunk.strip(),
-                "metadata": metadata.copy() if metadata else {}
-            }
-            chunks.append(chunk_data)
+            chunks.append(current_chunk.strip())
             logger.debug(f"Added final chunk of size {len(current_chunk)}")
         
-        # Add positional info to metadata
-        for i, chunk in enumerate(chunks):
-            chunk["metadata"]["chunk_index"] = i
-            chunk["metadata"]["total_chunks"] = len(chunks)
-        
-        logger.info(f"Created {len(chunks)} chunks from text")
         return chunks
     
     def _split_into_paragraphs(self, text: str) -> List[str]:
@@ -243,16 +1282,19 @@ def _split_into_paragraphs(self, text: str) -> List[str]:
                     else:
                         # Split very long sentences
                         sentences = re.split(r'(?<=[.!?])\s+', subparagraph)
-                        current = ""
+                        current = []
+                        current_size = 0
                         for sentence in sentences:
-                            if len(current) + len(sentence) <= self.chunk_size:
-                                current += sentence + " "
+                            if current_size + len(sentence) <= self.chunk_size:
+                                current.append(sentence + " ")
+                                current_size += len(sentence) + 1
                             else:
                                 if current:
-                                    result.append(current + "\n")
-                                current = sentence + " "
+                                    result.append("".join(current) + "\n")
+                                current = [sentence + " "]
+                                current_size = len(sentence) + 1
                         if current:
-                            result.append(current + "\n")
+                            result.append("".join(current) + "\n")
                 result.append("\n")  # Add paragraph separator
         
         return result
@@ -2,6 +2,7 @@
 FAQ service for managing FAQ items
 Based on the implementation specification in FAQ_Database_Implementation.md
 """
+import os
 import uuid
 import json
 from typing import List, Dict, Any, Optional, Tuple
@@ -40,6 +41,25 @@ async def initialize(self):
         
     async def add_faq(self, faq_item: FAQItem, user_id: str) -> str:
         """Add a new FAQ item to the collection"""
+        faq_id, combined_text, metadata = self._build_faq_record(faq_item, user_id)
+        
+        # Generate embedding
+        embedding = await self.embedder.generate_embedding_async(combined_text)
+        
+        # Store in collection
+        await self.chroma.add_documents(
+            collection_name=self.collection_name,
+            documents=[combined_text],
+            metadatas=[metadata],
+            ids=[faq_id],
+            embeddings=[embedding]
+        )
+        
+        logger.info(f"Added FAQ item with ID: {faq_id}")
+        return faq_id
+        
+    def _build_faq_record(self, faq_item: FAQItem, user_id: str) -> Tuple[str, str, Dict[str, Any]]:
+        """Build the ID, embedding text and metadata stored for an FAQ item"""
         # Generate ID
         faq_id = f"faq_{uuid.uuid4().hex}"
         
@@ -47,15 +67,9 @@ async def add_faq(self, faq_item: FAQItem, user_id: str) -> str:
         if not faq_item.created_by:
             faq_item.created_by = user_id
             
-        # Convert to dict for storage
-        faq_dict = faq_item.model_dump()
-        
         # Generate combined text for embedding
         combined_text = f"TOPIC: {faq_item.topic}\nQUESTION: {faq_item.question}\nANSWER: {faq_item.answer}"
         
-        # Generate embedding
-        embedding = await self.embedder.generate_embedding_async(combined_text)
-        
         # Add metadata - ensure all values are scalar types for ChromaDB compatibility
         metadata = {
             "id": faq_id,
@@ -70,17 +84,7 @@ async def add_faq(self, faq_item: FAQItem, user_id: str) -> str:
             "type": "faq"
         }
         
-        # Store in collection
-        await self.chroma.add_documents(
-            collection_name=self.collection_name,
-            documents=[combined_text],
-            metadatas=[metadata],
-            ids=[faq_id],
-            embeddings=[embedding]
-        )
-        
-        logger.info(f"Added FAQ item with ID: {faq_id}")
-        return faq_id
+        return faq_id, combined_text, metadata
         
     async def search_faqs(self, search_query: FAQSearchQuery) -> Tuple[int, List[FAQSearchResult], float]:
         """Search for FAQs based on the query"""
@@ -172,7 +176,7 @@ async def search_faqs(self, search_query: FAQSearchQuery) -> Tuple[int, List[FAQ
             return len(faq_results), faq_results, query_time_ms
         
         # For semantic search, generate embedding
-        query_embedding = await self.embedder.generate_embedding_async(search_text)
+        query_embedding = await self.embedder.embed_query_async(search_text)
         
         # Verify embedding is not empty/zero
         if not any(query_embedding):
@@ -366,10 +370,26 @@ async def get_sources(self) -> List[str]:
             logger.error(f"Error getting sources: {str(e)}")
             return []
             
-    async def import_jsonl(self, file_path: str, user_id: str) -> Tuple[int, List[Dict[str, Any]]]:
-        """Import FAQs from a JSONL file"""
+    async def import_jsonl(
+        self,
+        file_path: str,
+        user_id: str,
+        dedup_threshold: Optional[float] = None
+    ) -> Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Import FAQs from a JSONL file
+        
+        Near-duplicate FAQs within the file are only dropped when a similarity
+        threshold is given (or FAQ_IMPORT_DEDUP_THRESHOLD is set).
+        
+        Returns:
+            (number imported, failed items, duplicate items that were dropped)
+        """
         successful_imports = 0
         failed_imports = []
+        duplicate_items = []
+        if dedup_threshold is None and os.environ.get("FAQ_IMPORT_DEDUP_THRESHOLD"):
+            dedup_threshold = float(os.environ["FAQ_IMPORT_DEDUP_THRESHOLD"])
         
         try:
             # Try to detect encoding - include UTF-16 formats
@@ -407,7 +427,8 @@ async def import_jsonl(self, file_path: str, user_id: str) -> Tuple[int, List[Di
             if file_content is None:
                 raise ValueError("Unable to decode file with any supported encoding")
             
-            # Process each line
+            # Validate every line first so all FAQs are embedded in one batch
+            records = []
             for line_number, line in enumerate(file_content.splitlines(), 1):
                 if not line.strip():
                     continue
@@ -430,10 +451,7 @@ async def import_jsonl(self, file_path: str, user_id: str) -> Tuple[int, List[Di
                         is_published=True
                     )
                     
-                    # Add to database
-                    faq_id = await self.add_faq(full_faq, user_id)
-                    successful_imports += 1
-                    logger.info(f"Imported FAQ #{successful_imports}: {faq_item.question[:30]}...")
+                    records.append((line_number, line, self._build_faq_record(full_faq, user_id)))
                     
                 except Exception as e:
                     # Log the error and continue with next item
@@ -444,8 +462,52 @@ async def import_jsonl(self, file_path: str, user_id: str) -> Tuple[int, List[Di
                     }
                     logger.error(f"Error importing FAQ at line {line_number}: {str(e)}")
                     failed_imports.append(error_detail)
+            
+            if not records:
+                return successful_imports, failed_imports, duplicate_items
+            
+            # Embed the whole file in one pass (large files fan out to worker processes)
+            embeddings = await self.embedder.generate_embeddings_array_async(
+                [combined_text for _, _, (_, combined_text, _) in records]
+            )
+            
+            # Optionally skip FAQs that repeat an earlier FAQ of the same file
+            if dedup_threshold:
+                duplicates = self.embedder.find_near_duplicates(embeddings, threshold=dedup_threshold)
+                for index, (original, similarity) in sorted(duplicates.items()):
+                    line_number, line, _ = records[index]
+                    duplicate_items.append({
+                        "line": line_number,
+                        "content": line[:100] + "..." if len(line) > 100 else line,
+                        "duplicate_of_line": records[original][0],
+                        "similarity": round(similarity, 4)
+                    })
+                if duplicates:
+                    logger.info(f"Skipping {len(duplicates)} duplicate FAQs in {file_path}")
+                    keep = [i for i in range(len(records)) if i not in duplicates]
+                    records = [records[i] for i in keep]
+                    embeddings = embeddings[keep]
+            
+            # Upsert in batches the server accepts; a failing batch only fails its own lines
+            result = await self.chroma.upsert_documents(
+                collection_name=self.collection_name,
+                documents=[combined_text for _, _, (_, combined_text, _) in records],
+                metadatas=[metadata for _, _, (_, _, metadata) in records],
+                ids=[faq_id for _, _, (faq_id, _, _) in records],
+                embeddings=embeddings
+            )
+            successful_imports = result["upserted"]
+            for failed in result["failed_batches"]:
+                logger.error(f"Error storing imported FAQs {failed['start']}-{failed['end']}: {failed['error']}")
+                for line_number, line, _ in records[failed["start"]:failed["end"]]:
+                    failed_imports.append({
+                        "line": line_number,
+                        "content": line[:100] + "..." if len(line) > 100 else line,
+                        "error": failed["error"]
+                    })
+            logger.info(f"Imported {successful_imports} FAQs from {file_path} in {result['batches']} batches")
                     
-            return successful_imports, failed_imports
+            return successful_imports, failed_imports, duplicate_items
             
         except Exception as e:
             logger.error(f"Error importing JSONL file: {str(e)}")
@@ -14,9 +14,12 @@
 import logging
 import json
 import time
+import asyncio
 from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
 
+import numpy as np
+
 from ..models.integrity_check import (
     GradedAssignmentInfo,
     GradedAssignmentQuestion,
@@ -99,6 +102,102 @@ def index_assignment_sync(self, assignment_data: Dict[str, Any]) -> str:
         if not self._initialized:
             self.initialize_sync()
             
+        assignment_id, document_ids, documents, metadatas = self._prepare_assignment_documents(assignment_data)
+        
+        # Generate embeddings for all questions in one batch
+        embeddings = self.embedder.generate_embeddings_array(documents)
+        
+        # Store in ChromaDB
+        self.chroma.add_documents_sync(
+            collection_name=self.collection_name,
+            documents=documents,
+            metadatas=metadatas,
+            ids=document_ids,
+            embeddings=embeddings
+        )
+            
+        logger.info(f"Indexed assignment {assignment_data.get('title', '')} (ID: {assignment_id}) with {len(documents)} questions")
+        return assignment_id
+    
+    def index_assignments_bulk_sync(self, assignments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Index many graded assignments with a single embedding pass
+        
+        All questions of all assignments are embedded together, so large
+        imports are sharded across the embedding worker processes.
+        
+        Args:
+            assignments: List of assignment dictionaries (see index_assignment_sync)
+            
+        Returns:
+            Dictionary with indexed and failed assignments
+        """
+        if not self._initialized:
+            self.initialize_sync()
+            
+        results = {
+            "success": True,
+            "total_indexed": 0,
+            "failed": [],
+            "indexed": []
+        }
+        
+        # Validate and build documents for every assignment first
+        prepared = []
+        all_documents = []
+        for assignment_data in assignments:
+            try:
+                prepared.append((assignment_data, *self._prepare_assignment_documents(assignment_data)))
+                all_documents.extend(prepared[-1][3])
+            except Exception as e:
+                results["failed"].append({
+                    "title": assignment_data.get("title", ""),
+                    "error": str(e)
+                })
+        
+        # One embedding call for every question in the import
+        all_embeddings = self.embedder.generate_embeddings_array(all_documents) if all_documents else []
+        
+        offset = 0
+        for assignment_data, assignment_id, document_ids, documents, metadatas in prepared:
+            embeddings = all_embeddings[offset:offset + len(documents)]
+            offset += len(documents)
+            try:
+                self.chroma.add_documents_sync(
+                    collection_name=self.collection_name,
+                    documents=documents,
+                    metadatas=metadatas,
+                    ids=document_ids,
+                    embeddings=embeddings
+                )
+                results["indexed"].append({
+                    "assignment_id": assignment_id,
+                    "title": assignment_data.get("title", "")
+                })
+                results["total_indexed"] += 1
+            except Exception as e:
+                results["failed"].append({
+                    "title": assignment_data.get("title", ""),
+                    "error": str(e)
+                })
+        
+        if results["failed"]:
+            results["success"] = False
+            
+        logger.info(f"Bulk indexed {results['total_indexed']} assignments ({len(results['failed'])} failed)")
+        return results
+    
+    async def index_assignments_bulk(self, assignments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Async wrapper for index_assignments_bulk_sync"""
+        # Keep the bulk import off the event loop so other requests are served
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.index_assignments_bulk_sync, assignments)
+    
+    def _prepare_assignment_documents(
+        self,
+        assignment_data: Dict[str, Any]
+    ) -> Tuple[str, List[str], List[str], List[Dict[str, Any]]]:
+        """Build document IDs, texts and metadata for every question of an assignment"""
         # Extract assignment info
         assignment_id = str(assignment_data.get("assignment_id"))
         if not assignment_id:
@@ -107,13 +206,16 @@ def index_assignment_sync(self, assignment_data: Dict[str, Any]) -> str:
         course_id = str(assignment_data.get("course_id", ""))
         course_code = assignment_data.get("course_code", "")
         title = assignment_data.get("title", "")
-        description = assignment_data.get("description", "")
         
         # Get questions
         questions = assignment_data.get("questions", [])
         if not questions:
             raise ValueError("Assignment must have at least one question")
             
+        document_ids = []
+        documents = []
+        metadatas = []
+        
         # Process each question
         for question_index, question in enumerate(questions):
             question_id = str(question.get("question_id"))
@@ -121,9 +223,6 @@ def index_assignment_sync(self, assignment_data: Dict[str, Any]) -> str:
                 # Generate a question ID if not provided
                 question_id = f"{assignment_id}_q{question_index+1}"
                 
-            # Create document ID combining assignment and question
-            document_id = f"{assignment_id}_{question_id}"
-            
             # Get question content
             question_title = question.get("title", "")
             question_content = question.get("content", "")
@@ -136,14 +235,14 @@ def index_assignment_sync(self, assignment_data: Dict[str, Any]) -> str:
                 options_text = "\n".join([f"Option {i+1}: {opt.get('text', '')}" 
                                          for i, opt in enumerate(options)])
             
-            # Combine all text for this question
-            combined_text = f"QUESTION: {question_title}\n{question_content}\n{options_text}"
+            # Create document ID combining assignment and question
+            document_ids.append(f"{assignment_id}_{question_id}")
             
-            # Generate embedding
-            embedding = self.embedder.generate_embedding(combined_text)
+            # Combine all text for this question
+            documents.append(f"QUESTION: {question_title}\n{question_content}\n{options_text}")
             
             # Prepare metadata
-            metadata = {
+            metadatas.append({
                 "assignment_id": assignment_id,
                 "question_id": question_id,
                 "course_id": course_id,
@@ -152,30 +251,25 @@ def index_assignment_sync(self, assignment_data: Dict[str, Any]) -> str:
                 "question_title": question_title[:100] if question_title else "",
                 "question_type": question_type,
                 "indexed_at": datetime.utcnow().isoformat(),
-            }
-            
-            # Store in ChromaDB
-            self.chroma.add_documents_sync(
-                collection_name=self.collection_name,
-                documents=[combined_text],
-                metadatas=[metadata],
-                ids=[document_id],
-                embeddings=[embedding]
-            )
+            })
             
-        logger.info(f"Indexed assignment {title} (ID: {assignment_id}) with {len(questions)} questions")
-        return assignment_id
+        return assignment_id, document_ids, documents, metadatas
     
     async def index_assignment(self, assignment_data: Dict[str, Any]) -> str:
         """Async wrapper for index_assignment_sync"""
         return self.index_assignment_sync(assignment_data)
         
-    def check_integrity_sync(self, query: IntegrityCheckQuery) -> IntegrityCheckResponse:
+    def check_integrity_sync(
+        self,
+        query: IntegrityCheckQuery,
+        query_embedding: Optional[List[float]] = None
+    ) -> IntegrityCheckResponse:
         """
         Check a submission against indexed graded assignments
         
         Args:
             query: IntegrityCheckQuery with submission text and optional filters
+            query_embedding: Optional precomputed embedding of the submission text
                 
         Returns:
             IntegrityCheckResponse with potential matches
@@ -202,8 +296,11 @@ def check_integrity_sync(self, query: IntegrityCheckQuery) -> IntegrityCheckResp
         # Use the submission text directly without chunking for simplicity
         chunks = [submission_text]
         
-        # Generate embeddings for each chunk
-        embeddings = [self.embedder.generate_embedding(chunk) for chunk in chunks]
+        # Generate embeddings for all chunks in one batch
+        if query_embedding is not None:
+            embeddings = [query_embedding]
+        else:
+            embeddings = self.embedder.generate_embeddings_array(chunks)
         
         # Prepare search filters
         where_filter = None
@@ -223,16 +320,15 @@ def check_integrity_sync(self, query: IntegrityCheckQuery) -> IntegrityCheckResp
         highest_similarity = 0.0
         highest_match = None
         
-        for chunk_idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            # Search for similar questions
-            result = self.chroma.search_sync(
-                collection_name=self.collection_name,
-                query="",  # Empty as we're using embeddings directly
-                n_results=5,  # Get top 5 matches
-                where=where_filter,
-                query_embedding=embedding
-            )
-            
+        # Search for similar questions for every chunk in one query
+        results = self.chroma.search_many_sync(
+            collection_name=self.collection_name,
+            query_embeddings=embeddings,
+            n_results=5,  # Get top 5 matches
+            where=where_filter
+        )
+        
+        for chunk_idx, (chunk, result) in enumerate(zip(chunks, results)):
             # Process results
             for doc_idx, (doc_id, distance, metadata, document) in enumerate(zip(
                 result.ids, result.distances, result.metadatas, result.documents
@@ -318,7 +414,11 @@ def check_integrity_sync(self, query: IntegrityCheckQuery) -> IntegrityCheckResp
     
     async def check_integrity(self, query: IntegrityCheckQuery) -> IntegrityCheckResponse:
         """Async wrapper for check_integrity_sync"""
-        return self.check_integrity_sync(query)
+        # Embed through the batching dispatcher so concurrent checks share a forward pass
+        query_embedding = None
+        if query.query and isinstance(query.query, str) and query.query.strip():
+            query_embedding = await self.embedder.generate_embedding_async(query.query)
+        return self.check_integrity_sync(query, query_embedding=query_embedding)
     
     def get_assignment_sync(self, assignment_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -394,39 +494,26 @@ def get_all_assignments_sync(self) -> List[Dict[str, Any]]:
             self.initialize_sync()
             
         try:
-            # Query all documents using search_sync instead of get_collection_sync
-            query_result = self.chroma.search_sync(
-                collection_name=self.collection_name,
-                query="",  # Empty query to match all documents
-                n_results=1000,  # Get up to 1000 documents
-                where={}  # No filters
-            )
-            
-            if not query_result or not query_result.ids:
-                return []
-                
             # Group by assignment ID to get unique assignments
             assignments = {}
             
-            for doc_id, metadata in zip(query_result.ids, query_result.metadatas):
-                assignment_id = metadata.get("assignment_id")
-                if not assignment_id or assignment_id in assignments:
-                    continue
+            # Metadata-only scan of every indexed question, page by page
+            for page in self.chroma.iter_collection(self.collection_name, include=["metadatas"]):
+                for metadata in page.metadatas:
+                    assignment_id = metadata.get("assignment_id")
+                    if not assignment_id:
+                        continue
                     
-                # Create assignment entry
-                assignments[assignment_id] = {
-                    "assignment_id": assignment_id,
-                    "title": metadata.get("title", ""),
-                    "course_id": metadata.get("course_id", ""),
-                    "course_code": metadata.get("course_code", ""),
-                    "indexed_at": metadata.get("indexed_at", ""),
-                    "question_count": 0  # Will count questions below
-                }
-            
-            # Count questions for each assignment
-            for metadata in query_result.metadatas:
-                assignment_id = metadata.get("assignment_id")
-                if assignment_id and assignment_id in assignments:
+                    if assignment_id not in assignments:
+                        # Create assignment entry
+                        assignments[assignment_id] = {
+                            "assignment_id": assignment_id,
+                            "title": metadata.get("title", ""),
+                            "course_id": metadata.get("course_id", ""),
+                            "course_code": metadata.get("course_code", ""),
+                            "indexed_at": metadata.get("indexed_at", ""),
+                            "question_count": 0
+                        }
                     assignments[assignment_id]["question_count"] += 1
             
             return list(assignments.values())
@@ -439,12 +526,96 @@ async def get_all_assignments(self) -> List[Dict[str, Any]]:
         """Async wrapper for get_all_assignments_sync"""
         return self.get_all_assignments_sync()
     
+    def cross_check_assignments_sync(
+        self,
+        course_id: Optional[str] = None,
+        threshold: float = 0.9,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Find indexed questions that nearly duplicate a question of another assignment
+        
+        All question embeddings are compared against each other in one blocked
+        matrix pass instead of one search per question. Questions of the same
+        assignment are masked out of that pass, so the neighbours kept for each
+        question all belong to other assignments.
+        
+        Args:
+            course_id: Only cross-check assignments of this course
+            threshold: Minimum cosine similarity for a pair to be reported
+            limit: Maximum number of pairs to return
+            
+        Returns:
+            Question pairs sorted by descending similarity
+        """
+        if not self._initialized:
+            self.initialize_sync()
+            
+        # Page through the questions, keeping the vectors as compact float32 blocks
+        ids, metadatas, blocks = [], [], []
+        for page in self.chroma.iter_collection(
+            self.collection_name,
+            include=["embeddings", "metadatas"],
+            where={"course_id": str(course_id)} if course_id else None
+        ):
+            ids.extend(page.ids)
+            metadatas.extend(page.metadatas)
+            blocks.append(np.asarray(page.embeddings, dtype=np.float32))
+        if len(ids) < 2:
+            return []
+        embeddings = np.vstack(blocks)
+        
+        def describe(index: int) -> Dict[str, Any]:
+            metadata = metadatas[index] or {}
+            return {
+                "document_id": ids[index],
+                "assignment_id": metadata.get("assignment_id", ""),
+                "question_id": metadata.get("question_id", ""),
+                "title": metadata.get("title", ""),
+                "question_title": metadata.get("question_title", ""),
+                "course_code": metadata.get("course_code", "")
+            }
+        
+        neighbours, scores = self.embedder.similarity_top_k(
+            embeddings, embeddings, k=min(10, len(ids) - 1), exclude_self=True,
+            groups=[(metadata or {}).get("assignment_id") for metadata in metadatas]
+        )
+        
+        pairs = {}
+        for i, (row_indices, row_scores) in enumerate(zip(neighbours.tolist(), scores.tolist())):
+            for j, score in zip(row_indices, row_scores):
+                if j < 0 or score < threshold:
+                    break
+                key = (min(i, j), max(i, j))
+                if key in pairs:
+                    continue
+                pairs[key] = {
+                    "similarity": round(float(score), 4),
+                    "question": describe(key[0]),
+                    "matched_question": describe(key[1])
+                }
+        
+        return sorted(pairs.values(), key=lambda p: p["similarity"], reverse=True)[:limit]
+    
+    async def cross_check_assignments(
+        self,
+        course_id: Optional[str] = None,
+        threshold: float = 0.9,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Async wrapper for cross_check_assignments_sync"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, self.cross_check_assignments_sync, course_id, threshold, limit
+        )
+    
     def search_graded_assignments_sync(
         self, 
         search_query: Optional[str] = None, 
         course_ids: Optional[List[int]] = None,
         limit: int = 50,
-        threshold: float = 0.5
+        threshold: float = 0.5,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for graded assignments with optional filters
@@ -454,6 +625,7 @@ def search_graded_assignments_sync(
             course_ids: Optional list of course IDs to filter by
             limit: Maximum number of results to return
             threshold: Minimum similarity threshold (default 0.5)
+            query_embedding: Optional precomputed embedding of search_query
             
         Returns:
             List of matching assignment metadata dictionaries with question-level matches
@@ -487,7 +659,8 @@ def search_graded_assignments_sync(
                 collection_name=self.collection_name,
                 query=search_query,
                 n_results=1000,  # Get more results to process and filter
-                where=where_filter
+                where=where_filter,
+                query_embedding=query_embedding
             )
             
             if not query_result or not query_result.ids:
@@ -576,4 +749,10 @@ async def search_graded_assignments(
         threshold: float = 0.5
     ) -> List[Dict[str, Any]]:
         """Async wrapper for search_graded_assignments_sync"""
-        return self.search_graded_assignments_sync(search_query, course_ids, limit, threshold) 
\ No newline at end of file
+        # Embed through the batching dispatcher so concurrent searches share a forward pass
+        query_embedding = None
+        if search_query and search_query.strip():
+            query_embedding = await self.embedder.embed_query_async(search_query.strip())
+        return self.search_graded_assignments_sync(
+            search_query, course_ids, limit, threshold, query_embedding=query_embedding
+        ) 
\ No newline at end of file
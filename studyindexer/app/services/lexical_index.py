@@ -0,0 +1,170 @@
+"""
+In-process BM25 index over lecture chunks
+
+Vector search misses exact course terms (acronyms, identifiers, rare words)
+that a lexical index finds cheaply. CourseContentService keeps this index in
+sync with every chunk it writes or deletes and fuses its ranking with the
+vector ranking using reciprocal-rank fusion.
+"""
+import math
+import heapq
+import threading
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from .course_store import tokenize_terms
+
+logger = logging.getLogger(__name__)
+
+# Words too common to carry lexical signal
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how",
+    "in", "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when",
+    "where", "which", "who", "why", "with"
+))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [token for token in tokenize_terms(text) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = 60) -> Dict[str, float]:
+    """Fuse ranked id lists: each id scores the sum of 1 / (k + rank) over the lists it appears in"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index held in memory
+
+    Each document is stored with its course id and code so searches can be
+    limited to some courses and a course's documents removed at once.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """Create an empty index"""
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._owners: Dict[str, Tuple[str, str]] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, doc_id: str, text: str, course_id: str = "", course_code: str = "") -> None:
+        """Index a document, replacing any earlier version with the same id"""
+        counts = Counter(tokenize(text))
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, count in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+            length = sum(counts.values())
+            self._lengths[doc_id] = length
+            self._doc_terms[doc_id] = list(counts)
+            self._owners[doc_id] = (str(course_id), str(course_code))
+            self._total_length += length
+
+    def add_many(self, documents: Iterable[Tuple[str, str, str, str]]) -> None:
+        """Index (doc_id, text, course_id, course_code) tuples"""
+        for doc_id, text, course_id, course_code in documents:
+            self.add(doc_id, text, course_id, course_code)
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        """Drop documents by id; unknown ids are ignored"""
+        with self._lock:
+            for doc_id in doc_ids:
+                self._remove_locked(doc_id)
+
+    def remove_course(self, course_id: Optional[str] = None, course_code: Optional[str] = None) -> int:
+        """Drop every document of a course, matched by id or code; returns how many were removed"""
+        with self._lock:
+            doc_ids = [
+                doc_id for doc_id, (owner_id, owner_code) in self._owners.items()
+                if (course_id is not None and owner_id == str(course_id))
+                or (course_code is not None and owner_code == str(course_code))
+            ]
+            for doc_id in doc_ids:
+                self._remove_locked(doc_id)
+        return len(doc_ids)
+
+    def clear(self) -> None:
+        """Remove every document"""
+        with self._lock:
+            self._postings.clear()
+            self._lengths.clear()
+            self._doc_terms.clear()
+            self._owners.clear()
+            self._total_length = 0
+
+    def _remove_locked(self, doc_id: str) -> None:
+        """Drop one document (caller holds the lock)"""
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._owners.pop(doc_id, None)
+        self._total_length -= length
+        for term in self._doc_terms.pop(doc_id, []):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def owner(self, doc_id: str) -> Optional[Tuple[str, str]]:
+        """(course_id, course_code) of an indexed document"""
+        return self._owners.get(doc_id)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        course_codes: Optional[List[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank documents for a query
+
+        Args:
+            query: Free-text query
+            top_k: Number of documents to return
+            course_codes: Only rank documents of these courses (codes or ids)
+
+        Returns:
+            (doc_id, score) pairs, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        allowed = set(course_codes) if course_codes else None
+
+        with self._lock:
+            doc_count = len(self._lengths)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    if allowed is not None and not allowed.intersection(self._owners[doc_id]):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def stats(self) -> Dict[str, Any]:
+        """Document and term counts"""
+        return {"documents": len(self._lengths), "terms": len(self._postings)}
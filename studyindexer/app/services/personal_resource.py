@@ -355,9 +355,9 @@ def delete_resource_sync(self, resource_id: int) -> bool:
         # Find documents to delete
         where_clause = {"resource_id": str_resource_id}
         
-        # Delete documents from ChromaDB
+        # Delete documents from ChromaDB in one filtered call
         try:
-            self.chroma.delete_sync(
+            self.chroma.delete_where_sync(
                 collection_name=self.collection_name,
                 where=where_clause
             )
@@ -469,7 +469,7 @@ def search_resources_sync(
         
         # Generate embedding for query
         search_text = search_query.query
-        query_embedding = self.embedder.generate_embedding(search_text)
+        query_embedding = self.embedder.embed_query(search_text)
         
         # Search collection
         results = self.chroma.search_sync(
@@ -565,8 +565,8 @@ async def search_resources(
             filters["$id"] = {"$in": resource_ids}
             
         try:
-            # Get embeddings for query
-            query_embedding = self.embedder.generate_embedding(query)
+            # Get embeddings for query through the batching dispatcher
+            query_embedding = await self.embedder.embed_query_async(query)
             
             # Search in ChromaDB
             results = self.chroma.search_sync(
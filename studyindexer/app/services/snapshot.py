@@ -0,0 +1,267 @@
+"""
+Snapshot export/import for vector collections
+
+A snapshot is a directory holding one collection:
+
+- manifest.json: collection name and metadata, record count, embedding shape and dtype
+- embeddings.bin: float32 embeddings, row-major, one row per record, memory-mappable
+- records.jsonl: one {"id", "document", "metadata"} line per record, in the same order
+- course_store.jsonl: course-content snapshots only, the course store entries
+  (course and week fields, original course JSON) of the exported courses
+
+Export pages through the collection so it never holds more than one page in
+memory. Import memory-maps the embeddings and upserts them in batches, so a
+node can be rebuilt without re-embedding any text. Importing into the course
+content collections resyncs the course store and BM25 index built from them.
+"""
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+from .chroma import ChromaService
+from .course_content import CourseContentService
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.bin"
+RECORDS_FILE = "records.jsonl"
+COURSE_STORE_FILE = "course_store.jsonl"
+
+
+def default_snapshot_dir() -> str:
+    """Directory snapshots are written to when no path is given"""
+    return os.environ.get("SNAPSHOT_DIR", "./data/snapshots")
+
+
+def resolve_snapshot_path(name: str, base_dir: Optional[str] = None) -> str:
+    """
+    Path of a named snapshot under base_dir (default SNAPSHOT_DIR)
+
+    Raises:
+        ValueError: If the name is empty or resolves outside base_dir
+    """
+    base = os.path.realpath(base_dir or default_snapshot_dir())
+    path = os.path.realpath(os.path.join(base, name or ""))
+    if path == base or os.path.commonpath([base, path]) != base:
+        raise ValueError(f"Invalid snapshot name: {name!r}")
+    return path
+
+
+def read_manifest(snapshot_dir: str) -> Dict[str, Any]:
+    """Load and validate a snapshot manifest"""
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"No snapshot manifest found at {manifest_path}")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version: {manifest.get('format_version')}")
+    return manifest
+
+
+def list_snapshots(base_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Manifests of the snapshots stored under base_dir"""
+    base_dir = base_dir or default_snapshot_dir()
+    if not os.path.isdir(base_dir):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(base_dir)):
+        path = os.path.join(base_dir, name)
+        if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            try:
+                snapshots.append({"name": name, "path": path, **read_manifest(path)})
+            except Exception as e:
+                logger.warning(f"Skipping unreadable snapshot {path}: {str(e)}")
+    return snapshots
+
+
+def export_collection(
+    collection_name: str,
+    output_dir: Optional[str] = None,
+    page_size: Optional[int] = None,
+    chroma: Optional[ChromaService] = None
+) -> Dict[str, Any]:
+    """
+    Export a collection's ids, embeddings, documents and metadata to a snapshot
+
+    Args:
+        collection_name: Collection to export
+        output_dir: Snapshot directory (default SNAPSHOT_DIR/<collection>)
+        page_size: Records read per request (default CHROMA_PAGE_SIZE)
+        chroma: ChromaService to read from
+
+    Returns:
+        The snapshot manifest plus its path and the export time
+    """
+    chroma = chroma or ChromaService()
+    output_dir = output_dir or os.path.join(default_snapshot_dir(), collection_name)
+    os.makedirs(output_dir, exist_ok=True)
+    start_time = time.time()
+
+    collection = chroma.get_or_create_collection_sync(collection_name)
+    count = 0
+    dimensions = None
+    course_ids = set()
+    with open(os.path.join(output_dir, EMBEDDINGS_FILE), "wb") as embeddings_file, \
+            open(os.path.join(output_dir, RECORDS_FILE), "w", encoding="utf-8") as records_file:
+        for page in chroma.iter_collection(
+            collection_name,
+            page_size=page_size,
+            include=["embeddings", "documents", "metadatas"]
+        ):
+            embeddings = np.asarray(page.embeddings, dtype=np.float32)
+            if embeddings.ndim != 2 or len(embeddings) != len(page.ids):
+                raise ValueError(f"Collection {collection_name} returned records without embeddings")
+            if dimensions is None:
+                dimensions = embeddings.shape[1]
+            elif embeddings.shape[1] != dimensions:
+                raise ValueError(f"Mixed embedding dimensions in {collection_name}: "
+                                 f"{dimensions} and {embeddings.shape[1]}")
+
+            embeddings_file.write(np.ascontiguousarray(embeddings).tobytes())
+            for doc_id, document, metadata in zip(page.ids, page.documents, page.metadatas):
+                records_file.write(json.dumps(
+                    {"id": doc_id, "document": document, "metadata": metadata},
+                    ensure_ascii=False
+                ) + "\n")
+                if metadata and metadata.get("course_id"):
+                    course_ids.add(str(metadata["course_id"]))
+            count += len(page.ids)
+
+    files = {"embeddings": EMBEDDINGS_FILE, "records": RECORDS_FILE}
+    # Course and week fields no longer live in the chunks, so the course store travels with them
+    course_content = CourseContentService()
+    if collection_name == course_content.collection_name:
+        with open(os.path.join(output_dir, COURSE_STORE_FILE), "w", encoding="utf-8") as store_file:
+            for entry in course_content.store.export_courses(sorted(course_ids)):
+                store_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        files["course_store"] = COURSE_STORE_FILE
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "collection": collection_name,
+        "collection_metadata": collection.metadata or None,
+        "count": count,
+        "dimensions": dimensions or 0,
+        "dtype": "float32",
+        "created_at": datetime.now().isoformat(),
+        "files": files
+    }
+    # The manifest is written last, so a directory without one is an incomplete export
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    elapsed = time.time() - start_time
+    logger.info(f"Exported {count} records from {collection_name} to {output_dir} in {elapsed:.2f}s")
+    return {"path": output_dir, "export_time_s": round(elapsed, 3), **manifest}
+
+
+def import_snapshot(
+    snapshot_dir: str,
+    collection_name: Optional[str] = None,
+    replace: bool = False,
+    batch_size: Optional[int] = None,
+    chroma: Optional[ChromaService] = None
+) -> Dict[str, Any]:
+    """
+    Bulk-load a snapshot into a collection without recomputing embeddings
+
+    Args:
+        snapshot_dir: Directory written by export_collection
+        collection_name: Target collection (default: the exported collection's name)
+        replace: Drop the target collection before loading
+        batch_size: Records per upsert (capped by the server's max batch size)
+        chroma: ChromaService to write to
+
+    Returns:
+        Dictionary with the target collection, imported count, batches and failed_batches
+    """
+    chroma = chroma or ChromaService()
+    manifest = read_manifest(snapshot_dir)
+    collection_name = collection_name or manifest["collection"]
+    count = manifest["count"]
+    start_time = time.time()
+
+    if replace and collection_name in chroma.list_collection_names():
+        chroma.delete_collection_sync(collection_name)
+    chroma.get_or_create_collection_sync(collection_name, metadata=manifest.get("collection_metadata"))
+
+    report = {"collection": collection_name, "imported": 0, "batches": 0, "failed_batches": []}
+    embeddings = None
+    if count:
+        embeddings = np.memmap(
+            os.path.join(snapshot_dir, manifest["files"]["embeddings"]),
+            dtype=manifest["dtype"],
+            mode="r",
+            shape=(count, manifest["dimensions"])
+        )
+    batch_size = min(batch_size or chroma.get_max_batch_size(), chroma.get_max_batch_size())
+
+    def load_batch(start: int, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        result = chroma.upsert_documents_sync(
+            collection_name=collection_name,
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids,
+            embeddings=embeddings[start:start + len(ids)],
+            batch_size=batch_size
+        )
+        report["imported"] += result["upserted"]
+        report["batches"] += result["batches"]
+        for failed in result["failed_batches"]:
+            report["failed_batches"].append({**failed, "start": start + failed["start"], "end": start + failed["end"]})
+
+    start = 0
+    ids, documents, metadatas = [], [], []
+    with open(os.path.join(snapshot_dir, manifest["files"]["records"]), encoding="utf-8") as records_file:
+        for line in records_file:
+            record = json.loads(line)
+            ids.append(record["id"])
+            documents.append(record["document"])
+            metadatas.append(record["metadata"])
+            if len(ids) == batch_size:
+                load_batch(start, ids, documents, metadatas)
+                start += len(ids)
+                ids, documents, metadatas = [], [], []
+    if ids:
+        load_batch(start, ids, documents, metadatas)
+        start += len(ids)
+
+    if start != count:
+        raise ValueError(f"Snapshot {snapshot_dir} has {start} records but its manifest lists {count}")
+
+    # The course store and BM25 index are derived from the course content collections
+    course_content = CourseContentService()
+    if collection_name == course_content.collection_name and "course_store" in manifest["files"]:
+        with open(os.path.join(snapshot_dir, manifest["files"]["course_store"]), encoding="utf-8") as store_file:
+            report["course_store_entries"] = course_content.store.import_courses(
+                [json.loads(line) for line in store_file if line.strip()]
+            )
+    if collection_name == course_content.collection_name or collection_name.startswith(course_content.shard_prefix):
+        report["resync"] = course_content.resync_sync()
+
+    report["import_time_s"] = round(time.time() - start_time, 3)
+    logger.info(f"Imported {report['imported']}/{count} records from {snapshot_dir} into "
+                f"{collection_name} in {report['import_time_s']}s")
+    return report
+
+
+async def export_collection_async(collection_name: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Run export_collection on the ChromaDB executor"""
+    return await ChromaService().executor.run(export_collection, collection_name, output_dir)
+
+
+async def import_snapshot_async(
+    snapshot_dir: str,
+    collection_name: Optional[str] = None,
+    replace: bool = False
+) -> Dict[str, Any]:
+    """Run import_snapshot on the ChromaDB executor"""
+    return await ChromaService().executor.run(import_snapshot, snapshot_dir, collection_name, replace)
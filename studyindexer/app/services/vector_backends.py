@@ -0,0 +1,551 @@
+"""
+Vector store backends for ChromaService
+
+ChromaService talks to a chromadb-style client (get_or_create_collection,
+delete_collection, list_collections) and collection (add, upsert, update,
+delete, get, query, count). Three implementations are available, selected
+with VECTOR_BACKEND:
+
+- http: the Chroma HTTP client talking to a separate `chroma run` server
+- persistent: Chroma's embedded PersistentClient writing to CHROMA_PERSISTENCE_DIR
+- local: a pure in-process index kept in memory, with no server and no HTTP
+  serialization. Collections are searched with exact NumPy brute force while
+  small and with an HNSW graph (hnswlib) once they grow past
+  VECTOR_LOCAL_HNSW_THRESHOLD records. It supports the where-filter subset the
+  services use. Nothing is written to disk, so it suits tests and single-node
+  deployments that re-index on start.
+"""
+import os
+import time
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_VECTOR_BACKENDS = ("http", "persistent", "local")
+
+# Same per-request limit the Chroma server reports, so batching code behaves identically
+LOCAL_MAX_BATCH_SIZE = 41666
+
+DEFAULT_GET_INCLUDE = ["metadatas", "documents"]
+DEFAULT_QUERY_INCLUDE = ["metadatas", "documents", "distances"]
+
+
+def create_vector_client(backend: str, host: str, port: int, persist_dir: str):
+    """
+    Create a vector store client by name
+
+    Args:
+        backend: "http", "persistent" or "local"
+        host: Chroma server host (http backend)
+        port: Chroma server port (http backend)
+        persist_dir: Data directory (persistent backend)
+
+    Returns:
+        A client exposing the chromadb client API used by ChromaService
+    """
+    if backend == "http":
+        import chromadb
+        return chromadb.HttpClient(host=host, port=port)
+    if backend == "persistent":
+        import chromadb
+        return chromadb.PersistentClient(path=persist_dir)
+    if backend == "local":
+        return LocalVectorClient(
+            hnsw_threshold=int(os.environ.get("VECTOR_LOCAL_HNSW_THRESHOLD", "10000"))
+        )
+    raise ValueError(f"Unknown vector backend '{backend}', expected one of {SUPPORTED_VECTOR_BACKENDS}")
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    """Evaluate one metadata comparison"""
+    try:
+        if op == "$eq":
+            return value == operand
+        if op == "$ne":
+            return value != operand
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        if op == "$lte":
+            return value <= operand
+        if op == "$in":
+            return value in operand
+        if op == "$nin":
+            return value not in operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported where operator: {op}")
+
+
+def matches_where(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check a record's metadata against a Chroma where filter
+
+    Supports $and, $or and per-key $eq, $ne, $gt, $gte, $lt, $lte, $in and
+    $nin; a bare value means $eq. As in Chroma, a record without the key never
+    matches a condition on that key.
+    """
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            if key not in metadata:
+                return False
+            if isinstance(condition, dict):
+                if not all(_compare(metadata[key], op, operand) for op, operand in condition.items()):
+                    return False
+            elif metadata[key] != condition:
+                return False
+    return True
+
+
+def matches_where_document(document: Optional[str], where_document: Optional[Dict[str, Any]]) -> bool:
+    """Check a document against a Chroma where_document filter ($contains, $not_contains, $and, $or)"""
+    if not where_document:
+        return True
+    document = document or ""
+    for key, condition in where_document.items():
+        if key == "$and":
+            if not all(matches_where_document(document, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where_document(document, clause) for clause in condition):
+                return False
+        elif key == "$contains":
+            if condition not in document:
+                return False
+        elif key == "$not_contains":
+            if condition in document:
+                return False
+        else:
+            raise ValueError(f"Unsupported where_document operator: {key}")
+    return True
+
+
+class LocalCollection:
+    """
+    In-memory collection with the chromadb Collection API
+
+    Records live in append-only arrays indexed by an integer label; deleted
+    records are masked out and the arrays are compacted once more than half of
+    them are dead. Distances follow the collection's hnsw:space metadata
+    ("l2" squared euclidean by default, "ip" or "cosine") exactly as Chroma
+    computes them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        embedding_function: Optional[Callable] = None,
+        hnsw_threshold: int = 10000
+    ):
+        """Create an empty collection"""
+        self.name = name
+        self.metadata = metadata
+        self._embedding_function = embedding_function
+        self.hnsw_threshold = hnsw_threshold
+
+        settings = metadata or {}
+        self.space = settings.get("hnsw:space", "l2")
+        if self.space not in ("l2", "ip", "cosine"):
+            raise ValueError(f"Unsupported hnsw:space '{self.space}' for collection {name}")
+        self.construction_ef = int(settings.get("hnsw:construction_ef", 100))
+        self.search_ef = int(settings.get("hnsw:search_ef", 10))
+        self.hnsw_m = int(settings.get("hnsw:M", 16))
+
+        self._lock = threading.RLock()
+        self._labels: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors: Optional[np.ndarray] = None
+        self._sq_norms = np.zeros(0, dtype=np.float32)
+        self._hnsw = None
+
+    # Record storage
+
+    def _ensure_capacity(self, size: int, dim: int) -> None:
+        """Grow the vector arrays to hold at least size rows"""
+        if self._vectors is None:
+            self._vectors = np.zeros((max(size, 64), dim), dtype=np.float32)
+            self._sq_norms = np.zeros(len(self._vectors), dtype=np.float32)
+            self._alive = np.zeros(len(self._vectors), dtype=bool)
+            return
+        if self._vectors.shape[1] != dim:
+            raise ValueError(
+                f"Embedding dimension {dim} does not match collection dimensionality {self._vectors.shape[1]}"
+            )
+        if size > len(self._vectors):
+            capacity = max(size, len(self._vectors) * 2)
+            vectors = np.zeros((capacity, dim), dtype=np.float32)
+            vectors[:len(self._vectors)] = self._vectors
+            self._vectors = vectors
+            self._sq_norms = np.concatenate([self._sq_norms, np.zeros(capacity - len(self._sq_norms), dtype=np.float32)])
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+
+    def _prepare_vectors(self, embeddings, documents, count: int) -> np.ndarray:
+        """Use the given embeddings or embed the documents with the collection's function"""
+        if embeddings is None:
+            if documents is None or self._embedding_function is None:
+                raise ValueError("Either embeddings or documents with an embedding function are required")
+            embeddings = self._embedding_function(list(documents))
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != count:
+            raise ValueError(f"Expected {count} embeddings, got array of shape {vectors.shape}")
+        return vectors
+
+    @staticmethod
+    def _check_ids(ids: List[str]) -> None:
+        """Reject duplicate ids within one request, as Chroma does"""
+        if len(set(ids)) != len(ids):
+            seen, duplicates = set(), []
+            for record_id in ids:
+                if record_id in seen:
+                    duplicates.append(record_id)
+                seen.add(record_id)
+            raise ValueError(f"Expected IDs to be unique, found duplicates of: {', '.join(duplicates[:10])}")
+
+    def _write(self, label: Optional[int], record_id: str, vector: np.ndarray,
+               document: Optional[str], metadata: Optional[Dict[str, Any]]) -> int:
+        """Store one record, appending a new label when label is None"""
+        if label is None:
+            label = len(self._ids)
+            self._ids.append(record_id)
+            self._documents.append(document)
+            self._metadatas.append(metadata)
+            self._labels[record_id] = label
+        else:
+            self._documents[label] = document
+            self._metadatas[label] = metadata
+        self._vectors[label] = vector
+        self._sq_norms[label] = float(vector @ vector)
+        self._alive[label] = True
+        return label
+
+    def _store(self, ids, embeddings, metadatas, documents, replace: bool) -> None:
+        """Insert records, replacing existing ids when replace is set and skipping them otherwise"""
+        ids = list(ids)
+        if not ids:
+            return
+        self._check_ids(ids)
+        vectors = self._prepare_vectors(embeddings, documents, len(ids))
+        with self._lock:
+            self._ensure_capacity(len(self._ids) + len(ids), vectors.shape[1])
+            written = []
+            for i, record_id in enumerate(ids):
+                label = self._labels.get(record_id)
+                if label is not None and not replace:
+                    logger.warning(f"Add of existing embedding ID: {record_id}")
+                    continue
+                label = self._write(
+                    label, record_id, vectors[i],
+                    documents[i] if documents is not None else None,
+                    metadatas[i] if metadatas is not None else None
+                )
+                written.append(label)
+            self._index_labels(written)
+
+    # Collection API
+
+    def count(self) -> int:
+        """Number of records in the collection"""
+        with self._lock:
+            return int(self._alive.sum())
+
+    def add(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs) -> None:
+        """Add records; ids that already exist are skipped"""
+        self._store(ids, embeddings, metadatas, documents, replace=False)
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs) -> None:
+        """Add records, replacing any that already exist"""
+        self._store(ids, embeddings, metadatas, documents, replace=True)
+
+    def update(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs) -> None:
+        """Update existing records; fields passed as None are left unchanged"""
+        ids = list(ids)
+        self._check_ids(ids)
+        vectors = None
+        if embeddings is not None or documents is not None:
+            vectors = self._prepare_vectors(embeddings, documents, len(ids))
+        with self._lock:
+            updated = []
+            for i, record_id in enumerate(ids):
+                label = self._labels.get(record_id)
+                if label is None:
+                    logger.warning(f"Update of nonexisting embedding ID: {record_id}")
+                    continue
+                self._write(
+                    label, record_id,
+                    vectors[i] if vectors is not None else self._vectors[label],
+                    documents[i] if documents is not None else self._documents[label],
+                    metadatas[i] if metadatas is not None else self._metadatas[label]
+                )
+                updated.append(label)
+            if vectors is not None:
+                self._index_labels(updated)
+
+    def delete(self, ids=None, where=None, where_document=None) -> List[str]:
+        """Delete records by id and/or filter"""
+        with self._lock:
+            labels = self._select(ids, where, where_document)
+            deleted = []
+            for label in labels:
+                deleted.append(self._ids[label])
+                del self._labels[self._ids[label]]
+                self._alive[label] = False
+                self._ids[label] = None
+                self._documents[label] = None
+                self._metadatas[label] = None
+                if self._hnsw is not None:
+                    self._hnsw.mark_deleted(label)
+            if len(self._ids) > 64 and self._alive[:len(self._ids)].sum() * 2 < len(self._ids):
+                self._compact()
+            return deleted
+
+    def get(self, ids=None, where=None, limit=None, offset=None, where_document=None,
+            include=None) -> Dict[str, Any]:
+        """Fetch records by id and/or filter in insertion order"""
+        include = DEFAULT_GET_INCLUDE if include is None else include
+        with self._lock:
+            labels = self._select(ids, where, where_document)
+            start = offset or 0
+            labels = labels[start:start + limit] if limit is not None else labels[start:]
+            result = self._result(labels, include)
+        for key in ("embeddings", "metadatas", "documents"):
+            result.setdefault(key, None)
+        return result
+
+    def peek(self, limit: int = 10) -> Dict[str, Any]:
+        """First records of the collection"""
+        return self.get(limit=limit, include=["embeddings", "metadatas", "documents"])
+
+    def query(self, query_embeddings=None, query_texts=None, n_results: int = 10, where=None,
+              where_document=None, include=None) -> Dict[str, Any]:
+        """Nearest neighbours of each query, optionally restricted by filters"""
+        include = DEFAULT_QUERY_INCLUDE if include is None else include
+        if query_embeddings is None:
+            if query_texts is None or self._embedding_function is None:
+                raise ValueError("Either query_embeddings or query_texts with an embedding function are required")
+            query_embeddings = self._embedding_function(list(query_texts))
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        result = {key: [] for key in ["ids"] + list(include)}
+        with self._lock:
+            if where or where_document:
+                candidates = np.asarray(self._select(None, where, where_document), dtype=np.int64)
+            else:
+                candidates = None
+            for query in queries:
+                labels, distances = self._nearest(query, n_results, candidates)
+                row = self._result(labels, include)
+                for key in row:
+                    result[key].append(row[key])
+                if "distances" in include:
+                    result["distances"].append([float(d) for d in distances])
+        for key in ("embeddings", "metadatas", "documents", "distances"):
+            result.setdefault(key, None)
+        return result
+
+    # Search internals
+
+    def _select(self, ids, where, where_document) -> List[int]:
+        """Labels of live records matching the ids and filters"""
+        if ids is not None:
+            labels = [self._labels[record_id] for record_id in ids if record_id in self._labels]
+        else:
+            labels = np.flatnonzero(self._alive[:len(self._ids)]).tolist()
+        if where:
+            labels = [label for label in labels if matches_where(self._metadatas[label], where)]
+        if where_document:
+            labels = [label for label in labels if matches_where_document(self._documents[label], where_document)]
+        return labels
+
+    def _result(self, labels: List[int], include: List[str]) -> Dict[str, Any]:
+        """Ids plus the included fields for the given labels"""
+        result = {"ids": [self._ids[label] for label in labels]}
+        if "documents" in include:
+            result["documents"] = [self._documents[label] for label in labels]
+        if "metadatas" in include:
+            result["metadatas"] = [self._metadatas[label] for label in labels]
+        if "embeddings" in include:
+            result["embeddings"] = self._vectors[labels].tolist() if labels else []
+        return result
+
+    def _distances(self, query: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """Exact distances from query to the given labels in the collection's space"""
+        vectors = self._vectors[labels]
+        dots = vectors @ query
+        if self.space == "ip":
+            return 1.0 - dots
+        if self.space == "cosine":
+            norms = np.sqrt(self._sq_norms[labels]) * float(np.linalg.norm(query))
+            return 1.0 - dots / np.clip(norms, 1e-12, None)
+        return np.maximum(self._sq_norms[labels] + float(query @ query) - 2.0 * dots, 0.0)
+
+    def _nearest(self, query: np.ndarray, k: int, candidates: Optional[np.ndarray]):
+        """Top-k labels and distances, brute force for small sets and HNSW for large ones"""
+        if self._vectors is None:
+            return [], []
+        if candidates is None:
+            pool_size = int(self._alive[:len(self._ids)].sum())
+        else:
+            pool_size = len(candidates)
+        k = min(k, pool_size)
+        if k <= 0:
+            return [], []
+
+        if pool_size >= self.hnsw_threshold and self._ensure_hnsw():
+            allowed = None
+            if candidates is not None:
+                allowed = np.zeros(len(self._ids), dtype=bool)
+                allowed[candidates] = True
+            self._hnsw.set_ef(max(self.search_ef, k))
+            try:
+                found, distances = self._hnsw.knn_query(
+                    query[None, :], k=k,
+                    filter=(lambda label: bool(allowed[label])) if allowed is not None else None
+                )
+                return found[0].tolist(), distances[0].tolist()
+            except RuntimeError:
+                # The graph walk found fewer than k matches for a selective filter
+                logger.info(f"HNSW search in {self.name} came up short, falling back to brute force")
+
+        labels = candidates if candidates is not None else np.flatnonzero(self._alive[:len(self._ids)])
+        distances = self._distances(query, labels)
+        if k < len(labels):
+            top = np.argpartition(distances, k - 1)[:k]
+        else:
+            top = np.arange(len(labels))
+        top = top[np.argsort(distances[top], kind="stable")]
+        return labels[top].tolist(), distances[top].tolist()
+
+    def _ensure_hnsw(self) -> bool:
+        """Build the HNSW graph on first use; False if hnswlib is not installed"""
+        if self._hnsw is not None:
+            return True
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("hnswlib is not installed, using brute-force search for all collection sizes")
+            self.hnsw_threshold = float("inf")
+            return False
+
+        start = time.perf_counter()
+        index = hnswlib.Index(space=self.space, dim=self._vectors.shape[1])
+        index.init_index(max_elements=len(self._vectors), ef_construction=self.construction_ef, M=self.hnsw_m)
+        labels = np.flatnonzero(self._alive[:len(self._ids)])
+        if len(labels):
+            index.add_items(self._vectors[labels], labels)
+        self._hnsw = index
+        logger.info(f"Built HNSW index for {self.name} with {len(labels)} records in "
+                    f"{time.perf_counter() - start:.2f}s")
+        return True
+
+    def _index_labels(self, labels: List[int]) -> None:
+        """Add or refresh labels in the HNSW graph once it exists"""
+        if self._hnsw is None or not labels:
+            return
+        if len(self._vectors) > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(len(self._vectors))
+        labels = np.asarray(labels, dtype=np.int64)
+        for label in labels:
+            try:
+                self._hnsw.unmark_deleted(int(label))
+            except RuntimeError:
+                pass
+        self._hnsw.add_items(self._vectors[labels], labels)
+
+    def _compact(self) -> None:
+        """Drop deleted rows and renumber labels; the HNSW graph is rebuilt on next use"""
+        live = np.flatnonzero(self._alive[:len(self._ids)])
+        self._ids = [self._ids[label] for label in live]
+        self._documents = [self._documents[label] for label in live]
+        self._metadatas = [self._metadatas[label] for label in live]
+        self._labels = {record_id: label for label, record_id in enumerate(self._ids)}
+        capacity = max(len(live) * 2, 64)
+        vectors = np.zeros((capacity, self._vectors.shape[1]), dtype=np.float32)
+        vectors[:len(live)] = self._vectors[live]
+        sq_norms = np.zeros(capacity, dtype=np.float32)
+        sq_norms[:len(live)] = self._sq_norms[live]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(live)] = True
+        self._vectors, self._sq_norms, self._alive = vectors, sq_norms, alive
+        self._hnsw = None
+
+
+class LocalVectorClient:
+    """In-process client with the subset of the chromadb client API ChromaService uses"""
+
+    max_batch_size = LOCAL_MAX_BATCH_SIZE
+
+    def __init__(self, hnsw_threshold: int = 10000):
+        """Create an empty store"""
+        self.hnsw_threshold = hnsw_threshold
+        self._collections: Dict[str, LocalCollection] = {}
+        self._lock = threading.Lock()
+
+    def heartbeat(self) -> int:
+        """Current time in nanoseconds, like the Chroma heartbeat"""
+        return time.time_ns()
+
+    def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None,
+                          embedding_function: Optional[Callable] = None, get_or_create: bool = False):
+        """Create a collection, or return it when get_or_create is set and it exists"""
+        if len(name) < 3:
+            raise ValueError(f"Collection name must be at least 3 characters: {name}")
+        with self._lock:
+            if name in self._collections:
+                if not get_or_create:
+                    raise ValueError(f"Collection {name} already exists")
+                return self._collections[name]
+            collection = LocalCollection(name, metadata, embedding_function, self.hnsw_threshold)
+            self._collections[name] = collection
+            return collection
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None,
+                                 embedding_function: Optional[Callable] = None):
+        """Return the named collection, creating it if needed"""
+        return self.create_collection(name, metadata, embedding_function, get_or_create=True)
+
+    def get_collection(self, name: str, embedding_function: Optional[Callable] = None):
+        """Return an existing collection"""
+        with self._lock:
+            if name not in self._collections:
+                raise ValueError(f"Collection {name} does not exist.")
+            return self._collections[name]
+
+    def delete_collection(self, name: str) -> None:
+        """Remove a collection and all of its records"""
+        with self._lock:
+            if name not in self._collections:
+                raise ValueError(f"Collection {name} does not exist.")
+            del self._collections[name]
+
+    def list_collections(self) -> List[LocalCollection]:
+        """All collections"""
+        with self._lock:
+            return list(self._collections.values())
+
+    def reset(self) -> bool:
+        """Remove every collection"""
+        with self._lock:
+            self._collections.clear()
+        return True
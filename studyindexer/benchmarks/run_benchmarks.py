@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+"""
+Benchmarks for StudyIndexer's CPU hot paths
+
+Measures:
+1. TextChunker.chunk_text throughput (character and token modes)
+2. EmbeddingService.generate_embeddings texts/sec at several batch sizes
+3. Single-query generate_embedding latency (p50/p95/p99)
+4. ChromaEmbeddingFunction overhead over a raw model encode
+
+The embedding cache is disabled so every text is really encoded. Results are
+written as JSON; pass --compare with an earlier result file to fail on
+regressions.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--output results.json] [--compare baseline.json]
+    python benchmarks/run_benchmarks.py --suites chunker,latency --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+from typing import List, Dict, Any, Callable
+
+# Add base directory to path
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BASE_DIR)
+
+# Benchmarks must measure the model, not the persistent cache or the warm-up thread
+os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+os.environ.setdefault("EMBEDDING_WARMUP", "false")
+
+import numpy as np
+
+from app.services.embeddings import EmbeddingService, TextChunker, ChromaEmbeddingFunction
+
+DEFAULT_INPUT = os.path.join(BASE_DIR, "..", "CourseContentForLLM.txt")
+SUITES = ("chunker", "throughput", "latency", "embedding_function")
+
+# Metrics checked by --compare: (suite, key, higher_is_better)
+COMPARED_METRICS = [
+    ("chunker", "char_mode.chars_per_sec", True),
+    ("chunker", "token_mode.chars_per_sec", True),
+    ("throughput", "best_texts_per_sec", True),
+    ("latency", "p50_ms", False),
+    ("latency", "p95_ms", False),
+    ("latency", "p99_ms", False),
+    ("embedding_function", "overhead_ms", False),
+]
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> List[float]:
+    """Run func repeat times and return the durations in seconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def load_input(path: str) -> str:
+    """Read the benchmark document"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Benchmark input not found: {path}")
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def bench_chunker(service: EmbeddingService, text: str, repeat: int) -> Dict[str, Any]:
+    """Chunking throughput for a CourseContentForLLM.txt-sized document"""
+    results = {"input_chars": len(text)}
+    chunkers = {
+        "char_mode": TextChunker(chunk_size=500, chunk_overlap=100),
+        "token_mode": TextChunker.for_model(service, chunk_size=128, chunk_overlap=24),
+    }
+    for name, chunker in chunkers.items():
+        chunk_count = len(chunker.chunk_text(text))
+        best = min(time_call(lambda: chunker.chunk_text(text), repeat))
+        results[name] = {
+            "chunks": chunk_count,
+            "best_ms": round(best * 1000, 3),
+            "chars_per_sec": round(len(text) / best, 1),
+        }
+    return results
+
+
+def bench_throughput(service: EmbeddingService, texts: List[str], batch_sizes: List[int],
+                     repeat: int) -> Dict[str, Any]:
+    """generate_embeddings texts/sec at several batch sizes"""
+    service.generate_embeddings(texts[:8])  # warm up
+    results = {"texts": len(texts), "batch_sizes": {}}
+
+    for batch_size in batch_sizes:
+        def run():
+            for i in range(0, len(texts), batch_size):
+                service.generate_embeddings(texts[i:i + batch_size])
+        best = min(time_call(run, repeat))
+        results["batch_sizes"][str(batch_size)] = {
+            "best_ms": round(best * 1000, 3),
+            "texts_per_sec": round(len(texts) / best, 1),
+        }
+
+    results["best_texts_per_sec"] = max(r["texts_per_sec"] for r in results["batch_sizes"].values())
+    return results
+
+
+def bench_latency(service: EmbeddingService, queries: List[str]) -> Dict[str, Any]:
+    """Single-query generate_embedding latency percentiles"""
+    service.generate_embedding("warm up query")
+    latencies = np.array([time_call(lambda: service.generate_embedding(q), 1)[0] for q in queries]) * 1000
+    return {
+        "queries": len(queries),
+        "mean_ms": round(float(latencies.mean()), 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    }
+
+
+def bench_embedding_function(service: EmbeddingService, texts: List[str], repeat: int) -> Dict[str, Any]:
+    """Time spent in ChromaEmbeddingFunction on top of the raw model encode"""
+    embedding_function = ChromaEmbeddingFunction(service)
+    model = service._ensure_model()
+    processed = [service._preprocess_text(text) for text in texts]
+
+    raw = min(time_call(lambda: model.encode(processed), repeat))
+    wrapped = min(time_call(lambda: embedding_function(texts), repeat))
+    return {
+        "texts": len(texts),
+        "raw_encode_ms": round(raw * 1000, 3),
+        "embedding_function_ms": round(wrapped * 1000, 3),
+        "overhead_ms": round((wrapped - raw) * 1000, 3),
+        "overhead_pct": round((wrapped - raw) / raw * 100, 2) if raw > 0 else None,
+    }
+
+
+def git_commit() -> str:
+    """Current commit hash, if the benchmarks run inside a git checkout"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def lookup(results: Dict[str, Any], suite: str, key: str):
+    """Read a dotted metric path from a results document"""
+    value = results.get("results", {}).get(suite)
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a message for every metric that regressed by more than tolerance"""
+    regressions = []
+    for suite, key, higher_is_better in COMPARED_METRICS:
+        new, old = lookup(current, suite, key), lookup(baseline, suite, key)
+        if new is None or old is None or old == 0:
+            continue
+        change = (new - old) / old
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{suite}.{key}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StudyIndexer chunking and embedding")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Document used for chunking and texts")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"Comma-separated subset of {SUITES}")
+    parser.add_argument("--batch-sizes", default="1,8,32,64,128", help="Batch sizes for the throughput suite")
+    parser.add_argument("--texts", type=int, default=256, help="Texts encoded per throughput run")
+    parser.add_argument("--queries", type=int, default=200, help="Queries timed by the latency suite")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per measurement (best is kept)")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression before failing")
+    args = parser.parse_args()
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+    text = load_input(args.input)
+    service = EmbeddingService()
+
+    # Realistic inputs: the chunks the document is indexed as, and its sentences as queries
+    chunks = [c["content"] for c in TextChunker.for_model(service, chunk_size=128).chunk_text(text)]
+    texts = [chunks[i % len(chunks)] + f" ({i})" for i in range(args.texts)]
+    sentences = [s.strip() for s in text.replace("\n", " ").split(".") if len(s.strip()) > 20]
+    queries = [f"{sentences[i % len(sentences)]} {i}" for i in range(args.queries)]
+
+    results = {}
+    if "chunker" in suites:
+        results["chunker"] = bench_chunker(service, text, args.repeat)
+    if "throughput" in suites:
+        batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+        results["throughput"] = bench_throughput(service, texts, batch_sizes, args.repeat)
+    if "latency" in suites:
+        results["latency"] = bench_latency(service, queries)
+    if "embedding_function" in suites:
+        results["embedding_function"] = bench_embedding_function(service, texts[:32], args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "model": service.model_name,
+            "backend": service.backend_name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "input": os.path.basename(args.input),
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Results written to {args.output}")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@
 from app.api.course_content import router as course_content_router
 from app.api.personal_resource import router as personal_resource_router
 from app.api.integrity_check import router as integrity_check_router
+from app.api.snapshot import router as snapshot_router
+from app.services.embeddings import EmbeddingService
 
 # Configure logging
 logging.basicConfig(
@@ -60,6 +62,17 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.on_event("startup")
+async def warm_up_embedding_model():
+    """Load the embedding model in the background so startup is not blocked"""
+    if os.environ.get("EMBEDDING_WARMUP", "true").lower() == "true":
+        EmbeddingService().start_warmup()
+
+@app.on_event("shutdown")
+async def flush_embedding_cache():
+    """Persist embedding cache recency so LRU eviction survives a restart"""
+    EmbeddingService().flush_cache()
+
 # Include routers
 app.include_router(health_router, prefix="/api/health", tags=["Health"])
 app.include_router(faq_router, prefix="/api/v1/faq", tags=["FAQ"])
@@ -68,6 +81,7 @@ async def health_check():
 app.include_router(personal_resource_router, prefix="/api/v1/personal-resource", tags=["Personal Resource"])
 # app.include_router(course_guide_router, prefix="/api/v1/course-guide", tags=["Course Guide"])
 app.include_router(integrity_check_router, prefix="/api/v1/integrity-check", tags=["Integrity Check"])
+app.include_router(snapshot_router, prefix="/api/v1/snapshots", tags=["Snapshots"])
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
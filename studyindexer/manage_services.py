@@ -195,21 +195,22 @@ def start_service(service_name):
         
         logger.info(f"{service['name']} starting...")
         
-        # Use longer wait times for WSL environment
-        wait_time = 15 if service_name == "fastapi" else 30
-        logger.info(f"Waiting {wait_time} seconds for {service['name']} to start...")
-        time.sleep(wait_time)
-        
-        # Verify the service is actually running with HTTP check with more retries for FastAPI
-        retry_count = 5 if service_name == "fastapi" else 2
-        retry_delay = 3 if service_name == "fastapi" else 0.5
+        # Poll the health check instead of sleeping for a fixed time; allow longer
+        # for the WSL environment than max_startup_time suggests
+        wait_time = 30 if service_name == "fastapi" else 45
+        logger.info(f"Waiting up to {wait_time} seconds for {service['name']} to start...")
+        deadline = time.time() + wait_time
+        while time.time() < deadline:
+            try:
+                if service["health_check"]():
+                    logger.info(f"{service['name']} started successfully")
+                    return True
+            except requests.RequestException:
+                pass
+            time.sleep(0.5)
         
-        if is_service_running(service_name, retry_count=retry_count, retry_delay=retry_delay):
-            logger.info(f"{service['name']} started successfully")
-            return True
-        else:
-            logger.error(f"{service['name']} failed to start properly - check logs")
-            return False
+        logger.error(f"{service['name']} failed to start properly - check logs")
+        return False
         
     except Exception as e:
         logger.error(f"Error starting {service['name']}: {str(e)}")
@@ -286,26 +287,29 @@ def start_all():
     # Explicitly wait to ensure all processes are stopped
     time.sleep(2)
     
-    # Start ChromaDB first
-    logger.info("Starting ChromaDB server...")
-    if not start_service("chromadb"):
-        logger.error("Failed to start ChromaDB")
-        return False
-    
-    # Wait and verify ChromaDB actually started - essential for FastAPI
-    for attempt in range(3):
-        try:
-            logger.info("Verifying ChromaDB is responding...")
-            response = requests.get(SERVICES["chromadb"]["health_url"], timeout=2)
-            if response.status_code == 200:
-                logger.info("ChromaDB is responding correctly")
-                break
-        except requests.RequestException:
-            if attempt < 2:
-                logger.warning("ChromaDB not responding yet, waiting 3 more seconds...")
-                time.sleep(3)
-            else:
-                logger.error("ChromaDB failed to respond to health check - FastAPI will likely fail")
+    # Start ChromaDB first - only the http vector backend needs a separate server
+    if get_env('VECTOR_BACKEND', 'http').lower() != 'http':
+        logger.info(f"VECTOR_BACKEND={get_env('VECTOR_BACKEND')}, not starting a ChromaDB server")
+    else:
+        logger.info("Starting ChromaDB server...")
+        if not start_service("chromadb"):
+            logger.error("Failed to start ChromaDB")
+            return False
+        
+        # Wait and verify ChromaDB actually started - essential for FastAPI
+        for attempt in range(3):
+            try:
+                logger.info("Verifying ChromaDB is responding...")
+                response = requests.get(SERVICES["chromadb"]["health_url"], timeout=2)
+                if response.status_code == 200:
+                    logger.info("ChromaDB is responding correctly")
+                    break
+            except requests.RequestException:
+                if attempt < 2:
+                    logger.warning("ChromaDB not responding yet, waiting 3 more seconds...")
+                    time.sleep(3)
+                else:
+                    logger.error("ChromaDB failed to respond to health check - FastAPI will likely fail")
     
     # Then start FastAPI with longer timeout
     logger.info("Starting FastAPI server...")
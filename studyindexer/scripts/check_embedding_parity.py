@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Export the embedding model to ONNX and check it against PyTorch
+
+This script:
+1. Exports the SentenceTransformer model to ONNX (fp32 + dynamic int8)
+2. Encodes the same texts with the PyTorch and ONNX backends
+3. Prints cosine drift and per-query latency of both as JSON
+
+Usage:
+    python scripts/check_embedding_parity.py [--model all-MiniLM-L6-v2] [--fp32] [--re-export]
+
+The export is written to EMBEDDING_ONNX_DIR (default ./data/onnx), which is
+where EMBEDDING_BACKEND=onnx loads it from.
+"""
+import os
+import sys
+import json
+import argparse
+
+# Add base directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.embedding_backends import (
+    TorchBackend, OnnxBackend, export_onnx_model, default_onnx_dir, check_backend_parity
+)
+
+SAMPLE_TEXTS = [
+    "What is covered in week 3 of the Python course?",
+    "Explain the difference between a list and a tuple",
+    "How do I submit the graded assignment for week 5?",
+    "Recursion is a technique where a function calls itself to solve smaller instances of a problem.",
+    "Dictionaries map hashable keys to values and offer average O(1) lookups.",
+    "When is the end term exam and which weeks does it cover?",
+    "Normalization removes redundancy from a relational database schema.",
+    "The quiz on sorting algorithms compares bubble sort, merge sort and quick sort.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check ONNX embedding parity against PyTorch")
+    parser.add_argument("--model", default=os.environ.get("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2"),
+                        help="SentenceTransformer model name or path")
+    parser.add_argument("--fp32", action="store_true", help="Check the fp32 graph instead of int8")
+    parser.add_argument("--re-export", action="store_true", help="Export the model even if an export exists")
+    parser.add_argument("--texts", help="Optional file with one text per line to compare")
+    args = parser.parse_args()
+
+    texts = SAMPLE_TEXTS
+    if args.texts:
+        with open(args.texts) as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    model_dir = default_onnx_dir(args.model)
+    if args.re_export:
+        export_onnx_model(args.model, model_dir, quantize=True)
+
+    reference = TorchBackend(args.model)
+    candidate = OnnxBackend(args.model, model_dir=model_dir, quantized=not args.fp32)
+    report = check_backend_parity(reference, candidate, texts)
+    report["model"] = args.model
+    report["onnx_graph"] = "fp32" if args.fp32 else "int8"
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
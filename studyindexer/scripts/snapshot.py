@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Export and import vector collection snapshots
+
+A snapshot holds a collection's ids, float32 embeddings, documents and
+metadata, so a new node (or a lost data/chroma) can be rebuilt in minutes
+without re-embedding the course content.
+
+Usage:
+    python scripts/snapshot.py export --collection course_content [--output DIR]
+    python scripts/snapshot.py export --all
+    python scripts/snapshot.py import --snapshot DIR [--collection NAME] [--replace]
+    python scripts/snapshot.py list
+
+Snapshots are written to SNAPSHOT_DIR (default ./data/snapshots) unless
+--output is given. The vector store is chosen by VECTOR_BACKEND as usual.
+"""
+import os
+import sys
+import json
+import argparse
+
+# Add base directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.chroma import ChromaService
+from app.services.snapshot import export_collection, import_snapshot, list_snapshots, default_snapshot_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and import vector collection snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export collections to snapshots")
+    export_parser.add_argument("--collection", action="append", help="Collection to export (repeatable)")
+    export_parser.add_argument("--all", action="store_true", help="Export every collection")
+    export_parser.add_argument("--output", help="Snapshot directory (single collection only)")
+
+    import_parser = subparsers.add_parser("import", help="Load snapshots into collections")
+    import_parser.add_argument("--snapshot", action="append", required=True, help="Snapshot directory (repeatable)")
+    import_parser.add_argument("--collection", help="Target collection (single snapshot only)")
+    import_parser.add_argument("--replace", action="store_true", help="Drop target collections before loading")
+
+    subparsers.add_parser("list", help=f"List snapshots under SNAPSHOT_DIR ({default_snapshot_dir()})")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print(json.dumps(list_snapshots(), indent=2))
+        return
+
+    chroma = ChromaService()
+    results = []
+    if args.command == "export":
+        collections = chroma.list_collection_names() if args.all else (args.collection or [])
+        if not collections:
+            parser.error("export needs --collection or --all")
+        if args.output and len(collections) > 1:
+            parser.error("--output can only be used with a single collection")
+        for name in collections:
+            results.append(export_collection(name, output_dir=args.output, chroma=chroma))
+    else:
+        if args.collection and len(args.snapshot) > 1:
+            parser.error("--collection can only be used with a single snapshot")
+        for snapshot_dir in args.snapshot:
+            results.append(import_snapshot(snapshot_dir, collection_name=args.collection,
+                                           replace=args.replace, chroma=chroma))
+
+    print(json.dumps(results, indent=2))
+    if any(result.get("failed_batches") for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
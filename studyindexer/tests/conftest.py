@@ -0,0 +1,34 @@
+"""
+Shared pytest setup
+
+Tests run against the in-memory vector backend, with every on-disk store in a
+temporary directory, unless the environment already says otherwise.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+_data_dir = tempfile.mkdtemp(prefix="studyindexer-tests-")
+os.environ.setdefault("VECTOR_BACKEND", "local")
+os.environ.setdefault("COURSE_STORE_PATH", os.path.join(_data_dir, "course_store.sqlite3"))
+os.environ.setdefault("EMBEDDING_CACHE_DIR", os.path.join(_data_dir, "embedding_cache"))
+os.environ.setdefault("EMBEDDING_ONNX_DIR", os.path.join(_data_dir, "onnx"))
+os.environ.setdefault("SNAPSHOT_DIR", os.path.join(_data_dir, "snapshots"))
+os.environ.setdefault("EMBEDDING_WARMUP", "false")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture(scope="session")
+def embedding_service():
+    """The shared EmbeddingService, skipping the test when its model cannot be loaded"""
+    from app.services.embeddings import EmbeddingService
+
+    service = EmbeddingService()
+    try:
+        service.get_tokenizer()
+    except Exception as e:
+        pytest.skip(f"Embedding model {service.model_name} is not available: {e}")
+    return service
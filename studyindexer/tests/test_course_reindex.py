@@ -0,0 +1,114 @@
+"""
+Tests for hash-diffed incremental re-indexing of course content
+"""
+import copy
+
+import pytest
+
+from app.services.course_content import CourseContentService
+
+COURSE_ID = "reindex1"
+
+
+def make_course():
+    lectures = [
+        {
+            "lecture_id": i,
+            "week_id": 1 + i // 2,
+            "title": f"Lecture {i}",
+            "resource_type": "youtube",
+            "keywords": ["databases", f"topic {i}"],
+            "duration_minutes": 30,
+            "content_transcript": f"Lecture {i} explains the relational model and topic {i} with examples."
+        }
+        for i in range(4)
+    ]
+    return {
+        "course": {
+            "course_id": COURSE_ID,
+            "code": "RDX101",
+            "title": "Re-index Course",
+            "description": "A course used to test incremental re-indexing.",
+            "LLM_Summary": {"summary": "Course summary", "concepts_covered": ["relations"]}
+        },
+        "weeks": [
+            {"week_id": 1, "order": 1, "title": "Week one", "LLM_Summary": {"summary": "First week"}},
+            {"week_id": 2, "order": 2, "title": "Week two", "LLM_Summary": {"summary": "Second week"}}
+        ],
+        "lectures": lectures
+    }
+
+
+@pytest.fixture
+def service(embedding_service):
+    service = CourseContentService()
+    service.initialize_sync()
+    service.delete_course_content_sync(COURSE_ID)
+    yield service
+    service.delete_course_content_sync(COURSE_ID)
+
+
+def stored(service):
+    """Stored records of the test course as id -> metadata"""
+    result = service.chroma.get_or_create_collection_sync(service.collection_name).get(
+        where={"course_id": COURSE_ID}, include=["metadatas"]
+    )
+    return dict(zip(result["ids"], result["metadatas"]))
+
+
+def test_unchanged_course_is_not_re_embedded(service):
+    first = service.add_courses_sync([make_course()])
+    assert first["course_ids"] == [COURSE_ID]
+    assert first["added"] == first["chunks_added"] == len(stored(service))
+
+    again = service.add_courses_sync([make_course()])
+
+    assert again["chunks_added"] == 0
+    assert again["unchanged"] == first["added"]
+
+
+def test_changes_are_diffed_by_hash(service):
+    service.add_courses_sync([make_course()])
+    before = stored(service)
+
+    course = make_course()
+    course["lectures"][0]["content_transcript"] += " One more sentence."
+    course["lectures"] = course["lectures"][:-1]
+    course["weeks"][1]["title"] = "Week two, renamed"
+    report = service.add_courses_sync([course])
+
+    after = stored(service)
+    dropped = [record_id for record_id in before if record_id.startswith(f"{COURSE_ID}_3_")]
+    assert dropped and report["removed"] == len(dropped)
+    assert not set(dropped) & set(after)
+    # Only the edited lecture is re-embedded; the renamed week is a metadata-only update
+    assert 0 < report["chunks_added"] <= len([r for r in after if r.startswith(f"{COURSE_ID}_0_")])
+    assert all(m["week_title"] == "Week two, renamed" for m in after.values() if m.get("week_id") == "2")
+
+
+def test_failed_embedding_leaves_the_previous_version(service, monkeypatch):
+    service.add_courses_sync([make_course()])
+    before = stored(service)
+
+    course = make_course()
+    course["lectures"][0]["content_transcript"] += " One more sentence."
+    course["lectures"] = course["lectures"][:-1]
+    course["weeks"][1]["title"] = "Week two, renamed"
+
+    def fail(texts):
+        raise RuntimeError("embedder down")
+
+    monkeypatch.setattr(service.embedder, "generate_embeddings_array", fail)
+    report = service.add_courses_sync([course])
+
+    assert report["course_ids"] == []
+    assert len(report["failed_batches"]) == 1
+    assert stored(service) == before
+    assert service.store.get_document(COURSE_ID)["weeks"][1]["title"] == "Week two"
+
+    monkeypatch.undo()
+    retry = service.add_courses_sync([course])
+
+    assert retry["course_ids"] == [COURSE_ID]
+    assert retry["removed"] > 0
+    assert service.store.get_document(COURSE_ID)["weeks"][1]["title"] == "Week two, renamed"
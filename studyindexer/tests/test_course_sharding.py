@@ -0,0 +1,62 @@
+"""
+Tests for searching course content kept in per-course shards
+"""
+import pytest
+
+from app.services.course_content import CourseContentService
+
+COURSE_ID = "shard1"
+
+
+def make_course():
+    return {
+        "course": {
+            "course_id": COURSE_ID,
+            "code": "SHD101",
+            "title": "Sharded Course",
+            "description": "Query optimisation and cost-based planning in relational databases."
+        },
+        "weeks": [{"week_id": 1, "order": 1, "title": "Week one"}],
+        "lectures": [
+            {"lecture_id": 0, "week_id": 1, "title": "Lecture 0",
+             "content_transcript": "Cost-based planners estimate the cardinality of joins."}
+        ]
+    }
+
+
+@pytest.fixture
+def sharded_service(embedding_service):
+    service = CourseContentService()
+    service.initialize_sync()
+    service.sharded = True
+    service._known_shards = None
+    try:
+        service.delete_course_content_sync(COURSE_ID)
+        service.add_courses_sync([make_course()])
+        yield service
+        service.delete_course_content_sync(COURSE_ID)
+    finally:
+        service.sharded = False
+        service._known_shards = None
+
+
+def test_sharded_search_returns_course_overviews(sharded_service):
+    overview_id = f"course_{COURSE_ID}"
+    assert overview_id not in sharded_service.chroma.get_sync(
+        sharded_service._shard_name("SHD101"), ids=[overview_id]
+    ).ids
+
+    for course_ids in (["SHD101"], None):
+        results = sharded_service.search_courses_sync(
+            "query optimisation in relational databases", course_ids=course_ids, min_score=0.0
+        )
+        ids = [chunk["id"] for chunk in results["content_chunks"]]
+        assert overview_id in ids
+        assert "shard1_0_0" in ids
+
+
+def test_sharded_search_keeps_overviews_of_other_courses_out(sharded_service):
+    results = sharded_service.search_courses_sync(
+        "query optimisation in relational databases", course_ids=["OTHER1"], min_score=0.0
+    )
+    assert results["content_chunks"] == []
@@ -0,0 +1,61 @@
+"""
+Tests for filtered bulk deletes and the deletes built on them
+"""
+import numpy as np
+import pytest
+
+from app.services.chroma import ChromaService
+from app.services.personal_resource import PersonalResourceService
+
+COLLECTION = "delete-where-test"
+
+
+@pytest.fixture
+def chroma():
+    chroma = ChromaService()
+    chroma.delete_collection_sync(COLLECTION)
+    chroma.upsert_documents_sync(
+        collection_name=COLLECTION,
+        documents=[f"document {i}" for i in range(5)],
+        metadatas=[{"group": "a" if i < 3 else "b"} for i in range(5)],
+        ids=[f"doc_{i}" for i in range(5)],
+        embeddings=np.eye(5, dtype=np.float32)
+    )
+    yield chroma
+    chroma.delete_collection_sync(COLLECTION)
+
+
+def remaining(chroma):
+    return sorted(chroma.get_or_create_collection_sync(COLLECTION).get(include=[])["ids"])
+
+
+def test_deletes_only_matching_documents_and_counts_them(chroma):
+    assert chroma.delete_where_sync(COLLECTION, {"group": "a"}) == 3
+    assert remaining(chroma) == ["doc_3", "doc_4"]
+
+    assert chroma.delete_where_sync(COLLECTION, {"group": "a"}) == 0
+    assert remaining(chroma) == ["doc_3", "doc_4"]
+
+
+def test_requires_a_filter(chroma):
+    with pytest.raises(ValueError):
+        chroma.delete_where_sync(COLLECTION, {})
+    assert len(remaining(chroma)) == 5
+
+
+def test_invalidates_cached_searches(chroma):
+    search = lambda: chroma.search_sync(COLLECTION, "", n_results=1, query_embedding=[1.0, 0, 0, 0, 0])
+    assert search().ids == ["doc_0"]
+
+    chroma.delete_where_sync(COLLECTION, {"group": "a"})
+
+    assert search().ids != ["doc_0"]
+
+
+def test_deleting_a_resource_without_chunks_succeeds():
+    service = PersonalResourceService()
+    service.initialize_sync()
+    service.resource_cache["987654"] = {"id": "987654"}
+
+    assert service.delete_resource_sync(987654) is True
+    assert "987654" not in service.resource_cache
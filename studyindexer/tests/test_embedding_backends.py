@@ -0,0 +1,40 @@
+"""
+Tests for the ONNX Runtime embedding backend
+"""
+import numpy as np
+import pytest
+
+from app.services.embedding_backends import OnnxBackend, TorchBackend, check_backend_parity
+
+
+@pytest.fixture(scope="module")
+def backends(embedding_service, tmp_path_factory):
+    pytest.importorskip("onnxruntime")
+    model_name = embedding_service.model_name
+    try:
+        onnx = OnnxBackend(model_name, str(tmp_path_factory.mktemp("onnx")), quantized=False)
+    except Exception as e:
+        pytest.skip(f"Could not export {model_name} to ONNX: {e}")
+    return TorchBackend(model_name), onnx
+
+
+def test_empty_batch_returns_an_empty_matrix(backends):
+    _, onnx = backends
+
+    embeddings = onnx.encode([])
+
+    assert embeddings.shape == (0, onnx.config["dimensions"])
+    assert embeddings.dtype == np.float32
+
+
+def test_onnx_matches_torch(backends):
+    torch_backend, onnx = backends
+    texts = ["Relational algebra", "A longer sentence about normal forms and decomposition."]
+
+    assert onnx.encode(texts).shape == (2, onnx.config["dimensions"])
+    report = check_backend_parity(torch_backend, onnx, texts)
+    assert report["texts"] == 2
+    assert report["min_cosine"] > 0.99
+
+    with pytest.raises(ValueError):
+        check_backend_parity(torch_backend, onnx, [])
@@ -0,0 +1,79 @@
+"""
+Tests for the persistent EmbeddingCache
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from app.services import embeddings
+from app.services.embeddings import EmbeddingCache
+
+
+@pytest.fixture(autouse=True)
+def ticking_clock(monkeypatch):
+    """Give every cache operation a distinct timestamp so LRU order is deterministic"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(embeddings.time, "time", lambda: float(next(ticks)))
+
+
+def vector(value: float) -> np.ndarray:
+    return np.full(4, value, dtype=np.float32)
+
+
+def make_cache(tmp_path, max_entries: int = 3) -> EmbeddingCache:
+    return EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_entries=max_entries)
+
+
+def test_hits_and_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many({"a": vector(1.0)})
+
+    found = cache.get_many(["a", "b", "a"])
+
+    assert list(found) == ["a"]
+    np.testing.assert_array_equal(found["a"], vector(1.0))
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many({"a": vector(1.0)})
+    cache.put_many({"b": vector(2.0)})
+    cache.put_many({"c": vector(3.0)})
+
+    # The hit on "a" is only recorded in memory, and applied before the next put evicts
+    cache.get_many(["a"])
+    cache.put_many({"d": vector(4.0)})
+
+    assert set(cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}
+    assert cache.stats()["entries"] == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_running_count_ignores_existing_keys(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many({"a": vector(1.0), "b": vector(2.0)})
+    cache.put_many({"a": vector(1.0)})
+
+    assert cache.stats()["entries"] == 2
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+    assert cache.get_many(["a"]) == {}
+
+
+def test_survives_reopen(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many({"a": vector(1.0), "b": vector(2.0)})
+    cache.get_many(["a"])
+    cache.flush()
+
+    reopened = make_cache(tmp_path)
+
+    assert reopened.stats()["entries"] == 2
+    assert reopened.stats()["pending_touches"] == 0
+    np.testing.assert_array_equal(reopened.get_many(["b"])["b"], vector(2.0))
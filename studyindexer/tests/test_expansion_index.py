@@ -0,0 +1,57 @@
+"""
+Tests for acronym/synonym query expansion
+"""
+from app.services.course_store import CourseStore, ExpansionIndex
+
+
+def test_acronyms_expand_both_ways():
+    index = ExpansionIndex.compile({"DL": "Deep Learning"}, {})
+
+    assert index.variants("intro to dl", limit=5) == ["intro to deep learning"]
+    assert index.variants("Deep  Learning basics", limit=5) == ["dl basics"]
+
+
+def test_synonyms_expand_to_each_alternative_and_back():
+    index = ExpansionIndex.compile({}, {"join": ["merge", "combine"]})
+
+    assert index.variants("sql join", limit=5) == ["sql merge", "sql combine"]
+    assert index.variants("merge tables", limit=5) == ["join tables"]
+
+
+def test_longest_phrase_wins_and_limit_applies():
+    index = ExpansionIndex.compile({"ML": "machine learning", "ML Ops": "machine learning operations"}, {})
+
+    assert index.variants("ml ops pipeline", limit=5) == ["machine learning operations pipeline"]
+    assert len(index.variants("ml and dl and ml ops", limit=1)) == 1
+
+
+def test_unknown_terms_give_no_variants():
+    index = ExpansionIndex.compile({"DL": "deep learning"}, {"join": "not a list"})
+
+    assert index.variants("relational algebra join", limit=3) == []
+    assert index.variants("", limit=3) == []
+
+
+def test_merge_combines_courses():
+    merged = ExpansionIndex.merge([
+        ExpansionIndex.compile({"DB": "database"}, {}),
+        ExpansionIndex.compile({"DB": "decibel"}, {})
+    ])
+
+    assert merged.variants("db", limit=5) == ["database", "decibel"]
+
+
+def test_store_compiles_and_bounds_merged_indexes(tmp_path):
+    store = CourseStore(str(tmp_path / "store.sqlite3"), max_merged_expansions=2)
+    for i, full_form in enumerate(["database", "decibel", "debug"]):
+        store.put_course(str(i), {"acronyms_json": f'{{"DB": "{full_form}"}}'}, {}, course_code=f"C{i}")
+
+    assert store.expansion_index(["C0"]).variants("db", limit=3) == ["database"]
+    assert store.expansion_index(["C0", "C1"]).variants("db", limit=3) == ["database", "decibel"]
+    store.expansion_index(["C2"])
+
+    assert len(store._merged_expansions) == 2
+    assert ("0",) not in store._merged_expansions
+    # A course written after merging invalidates the cached indexes
+    store.put_course("0", {"acronyms_json": '{"DB": "datastore"}'}, {}, course_code="C0")
+    assert store.expansion_index(["C0"]).variants("db", limit=3) == ["datastore"]
@@ -0,0 +1,48 @@
+"""
+Tests for cross-checking indexed assignment questions against each other
+"""
+import numpy as np
+import pytest
+
+from app.services.integrity_check import IntegrityCheckService
+
+
+@pytest.fixture
+def service():
+    service = IntegrityCheckService()
+    service.chroma.delete_where_sync(service.collection_name, {"course_id": "xcheck"})
+    yield service
+    service.chroma.delete_where_sync(service.collection_name, {"course_id": "xcheck"})
+
+
+def index_questions(service, questions):
+    """Store (assignment_id, embedding) pairs as graded assignment questions"""
+    service.chroma.upsert_documents_sync(
+        collection_name=service.collection_name,
+        documents=[f"question {i}" for i in range(len(questions))],
+        metadatas=[
+            {"course_id": "xcheck", "assignment_id": assignment_id, "question_id": str(i)}
+            for i, (assignment_id, _) in enumerate(questions)
+        ],
+        ids=[f"xcheck_{i}" for i in range(len(questions))],
+        embeddings=np.asarray([embedding for _, embedding in questions], dtype=np.float32)
+    )
+
+
+def test_long_assignment_does_not_crowd_out_foreign_matches(service):
+    rng = np.random.default_rng(0)
+    base = rng.standard_normal(16)
+    # Twelve near-identical questions of one assignment, closer to each other than to the other assignment
+    long_assignment = [("long", base + rng.normal(0, 0.01, 16)) for _ in range(12)]
+    other = [("other", base + rng.normal(0, 0.2, 16))]
+    index_questions(service, long_assignment + other)
+
+    pairs = service.cross_check_assignments_sync(course_id="xcheck", threshold=0.8)
+
+    assert pairs
+    assert all(
+        {pair["question"]["assignment_id"], pair["matched_question"]["assignment_id"]} == {"long", "other"}
+        for pair in pairs
+    )
+    # Every question of the long assignment is paired with the other one, not just its top 10
+    assert len(pairs) == 12
@@ -0,0 +1,100 @@
+"""
+Tests for the BM25 index and reciprocal-rank fusion
+"""
+import pytest
+
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add_many([
+        ("a", "Normalization removes redundancy: 1NF, 2NF, 3NF and BCNF.", "1", "DB101"),
+        ("b", "Joins combine rows from two tables.", "1", "DB101"),
+        ("c", "BCNF is stricter than 3NF.", "2", "DB201"),
+        ("d", "Gradient descent trains neural networks.", "3", "ML101"),
+    ])
+    return index
+
+
+def test_tokenize_drops_stopwords_and_keeps_identifiers():
+    assert tokenize("What is the C++ and BCNF?") == ["c++", "bcnf"]
+
+
+def test_ranks_by_term_frequency_and_rarity(index):
+    results = index.search("BCNF normalization", top_k=10)
+
+    assert [doc_id for doc_id, _ in results] == ["a", "c"]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_filters_by_course_code_or_id(index):
+    assert [doc_id for doc_id, _ in index.search("bcnf", course_codes=["DB201"])] == ["c"]
+    assert [doc_id for doc_id, _ in index.search("bcnf", course_codes=["1"])] == ["a"]
+
+
+def test_unknown_and_stopword_queries_return_nothing(index):
+    assert index.search("quantum") == []
+    assert index.search("what is the") == []
+
+
+def test_replace_and_remove_keep_the_index_consistent(index):
+    index.add("b", "Joins and BCNF together.", "1", "DB101")
+    assert "b" in [doc_id for doc_id, _ in index.search("bcnf")]
+
+    assert index.remove_course(course_code="DB101") == 2
+    assert [doc_id for doc_id, _ in index.search("bcnf")] == ["c"]
+    assert index.owner("a") is None
+
+    index.remove(["c", "missing"])
+    index.clear()
+    assert len(index) == 0
+    assert index.stats() == {"documents": 0, "terms": 0}
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+
+    assert fused["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused["a"] == pytest.approx(1 / 61)
+    assert fused["d"] == pytest.approx(1 / 62)
+    assert max(fused, key=fused.get) == "b"
+
+
+def test_hybrid_search_applies_min_score_to_vector_similarity(embedding_service):
+    from app.services.course_content import CourseContentService
+
+    service = CourseContentService()
+    service.initialize_sync()
+    course = {
+        "course": {"course_id": "hybrid1", "code": "HYB101", "title": "Hybrid", "description": "Hybrid search"},
+        "weeks": [{"week_id": 1, "order": 1, "title": "Week one"}],
+        "lectures": [
+            {"lecture_id": i, "week_id": 1, "title": f"Lecture {i}", "content_transcript": text}
+            for i, text in enumerate([
+                "BCNF decomposition removes anomalies.",
+                "Joins combine rows from two tables.",
+                "Indexes speed up lookups with B-trees."
+            ])
+        ]
+    }
+    service.add_courses_sync([course])
+    try:
+        results = service.search_courses_sync("BCNF decomposition", course_ids=["HYB101"], min_score=0.0)
+        scores = [chunk["relevance_score"] for chunk in results["content_chunks"]]
+        assert scores and all(0.0 <= score <= 1.0 for score in scores)
+        assert results["content_chunks"][0]["metadata"]["lecture_id"] == "0"
+        lectures = {chunk["metadata"].get("lecture_id") for chunk in results["content_chunks"]}
+        assert {"1", "2"} <= lectures
+
+        # No vector hit clears this floor: the unrelated lectures go even though BM25 found lecture 0
+        filtered = service.search_courses_sync("BCNF decomposition", course_ids=["HYB101"], min_score=1.01)
+        assert filtered["content_chunks"]
+        assert {chunk["metadata"].get("lecture_id") for chunk in filtered["content_chunks"]} == {"0"}
+
+        # Without BM25 hits the same floor leaves nothing
+        assert service.search_courses_sync("xylophone melody", course_ids=["HYB101"],
+                                           min_score=1.01)["content_chunks"] == []
+    finally:
+        service.delete_course_content_sync("hybrid1")
@@ -0,0 +1,112 @@
+"""
+Tests for the in-memory query embedding cache and EmbeddingService.embed_query
+"""
+import numpy as np
+import pytest
+
+from app.services import embeddings
+from app.services.embeddings import EmbeddingService, QueryEmbeddingCache
+
+
+def test_hit_miss_and_lru_eviction():
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=0)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+
+    assert cache.get("a") == [1.0]
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("c") == [3.0]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(embeddings.time, "monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(max_entries=4, ttl_seconds=10)
+    cache.put("a", [1.0])
+
+    now[0] += 11
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_normalize_collapses_whitespace_and_keeps_case():
+    assert QueryEmbeddingCache.normalize("  SQL \t JOIN\n") == "SQL JOIN"
+    assert QueryEmbeddingCache.normalize("DL") != QueryEmbeddingCache.normalize("dl")
+
+
+@pytest.fixture
+def recording_service(monkeypatch):
+    """EmbeddingService with a fresh query cache and an encoder that records what it was given"""
+    service = EmbeddingService()
+    encoded = []
+
+    def fake_embedding(text):
+        encoded.append(text)
+        return [float(len(text)), 1.0]
+
+    def fake_array(texts):
+        encoded.extend(texts)
+        return np.asarray([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(service, "query_cache", QueryEmbeddingCache(max_entries=8))
+    monkeypatch.setattr(service, "generate_embedding", fake_embedding)
+    monkeypatch.setattr(service, "generate_embeddings_array", fake_array)
+    return service, encoded
+
+
+def test_embed_query_encodes_the_original_query(recording_service):
+    service, encoded = recording_service
+
+    first = service.embed_query("Intro to SQL")
+    second = service.embed_query("Intro  to SQL ")
+
+    assert encoded == ["Intro to SQL"]
+    assert first == second
+    assert service.query_cache.stats()["hits"] == 1
+
+
+def test_embed_queries_encodes_each_missing_key_once(recording_service):
+    service, encoded = recording_service
+    service.embed_query("DL basics")
+
+    result = service.embed_queries(["DL basics", "dl basics", "dl  basics"])
+
+    assert encoded == ["DL basics", "dl basics"]
+    assert result.shape == (3, 2)
+    np.testing.assert_array_equal(result[1], result[2])
+
+
+def test_async_text_search_embeds_through_the_query_cache(recording_service, monkeypatch):
+    import asyncio
+
+    from app.services.chroma import ChromaService
+
+    service, encoded = recording_service
+    fake_embedding = service.generate_embedding
+
+    async def fake_embedding_async(text):
+        return fake_embedding(text)
+
+    monkeypatch.setattr(service, "generate_embedding_async", fake_embedding_async)
+
+    chroma = ChromaService()
+    assert chroma.embedding_service is service
+    chroma.upsert_documents_sync(
+        collection_name="query-cache-async",
+        documents=["short", "a much longer document"],
+        metadatas=[{"n": 0}, {"n": 1}],
+        ids=["short", "long"],
+        embeddings=np.asarray([[5.0, 1.0], [21.0, 1.0]], dtype=np.float32)
+    )
+
+    result = asyncio.run(chroma.search("query-cache-async", "Intro to SQL", n_results=1))
+    asyncio.run(chroma.search("query-cache-async", "Intro  to SQL", n_results=2))
+
+    assert result.ids == ["short"]
+    assert encoded == ["Intro to SQL"]
+    assert service.query_cache.stats()["hits"] == 1
@@ -0,0 +1,79 @@
+"""
+Tests for the per-collection-version search result cache
+"""
+import numpy as np
+import pytest
+
+from app.services.chroma import ChromaService, ChromadbResult, SearchResultCache
+
+COLLECTION = "result-cache-test"
+
+
+def result(doc_id):
+    return ChromadbResult(ids=[doc_id], documents=[doc_id], metadatas=[{}], distances=[0.0])
+
+
+@pytest.fixture
+def chroma():
+    chroma = ChromaService()
+    if chroma.result_cache is None:
+        pytest.skip("Search result cache is disabled")
+    chroma.delete_collection_sync(COLLECTION)
+    chroma.add_documents_sync(
+        collection_name=COLLECTION,
+        documents=["first", "second"],
+        metadatas=[{"n": 0}, {"n": 1}],
+        ids=["a", "b"],
+        embeddings=np.asarray([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    )
+    yield chroma
+    chroma.delete_collection_sync(COLLECTION)
+
+
+def search(chroma):
+    return chroma.search_sync(COLLECTION, "", n_results=1, query_embedding=[1.0, 0.1])
+
+
+def test_writes_bump_the_version_and_invalidate_cached_results(chroma):
+    cache = chroma.result_cache
+    assert search(chroma).documents == ["first"]
+    hits = cache.hits
+    assert search(chroma).documents == ["first"]
+    assert cache.hits == hits + 1
+
+    writes = [
+        lambda: chroma.add_documents_sync(COLLECTION, ["third"], [{"n": 2}], ["c"],
+                                          np.asarray([[1.0, 0.05]], dtype=np.float32)),
+        lambda: chroma.update_sync(COLLECTION, ids=["c"], documents=["third, updated"],
+                                   embeddings=np.asarray([[1.0, 0.05]], dtype=np.float32)),
+        lambda: chroma.delete_sync(COLLECTION, ids=["c"])
+    ]
+    expected = [["third"], ["third, updated"], ["first"]]
+    for write, documents in zip(writes, expected):
+        key = chroma._result_cache_key(COLLECTION, [1.0, 0.1], None, 1, None)
+        write()
+        assert chroma._result_cache_key(COLLECTION, [1.0, 0.1], None, 1, None)[1] == key[1] + 1
+        misses = cache.misses
+        assert search(chroma).documents == documents
+        assert cache.misses == misses + 1
+
+
+def test_entry_bound_evicts_least_recently_used():
+    cache = SearchResultCache(max_entries=2, ttl_seconds=0)
+    keys = [cache.make_key("c", f"query {i}", None, 5, None) for i in range(3)]
+    cache.put(keys[0], result("0"))
+    cache.put(keys[1], result("1"))
+    assert cache.get(keys[0]).ids == ["0"]
+
+    cache.put(keys[2], result("2"))
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]).ids == ["0"]
+
+
+def test_text_keys_keep_case():
+    cache = SearchResultCache()
+    assert cache.make_key("c", "SQL", None, 5, None) != cache.make_key("c", "sql", None, 5, None)
+    assert cache.make_key("c", " SQL  joins", None, 5, None) == cache.make_key("c", "SQL joins", None, 5, None)
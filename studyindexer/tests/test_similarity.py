@@ -0,0 +1,86 @@
+"""
+Tests for the blocked similarity helpers on EmbeddingService
+"""
+import numpy as np
+import pytest
+
+from app.services.embeddings import EmbeddingService
+
+
+@pytest.fixture(scope="module")
+def service():
+    return EmbeddingService()
+
+
+def random_unit(rows, dimensions=16, seed=0):
+    matrix = np.random.default_rng(seed).standard_normal((rows, dimensions)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def brute_force(queries, candidates, k, mask=None):
+    scores = queries @ candidates.T
+    if mask is not None:
+        scores[mask] = -np.inf
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(scores, order, axis=1)
+
+
+def test_top_k_matches_brute_force_across_blocks(service):
+    queries, candidates = random_unit(37, seed=1), random_unit(101, seed=2)
+    expected_indices, expected_scores = brute_force(queries, candidates, 5)
+
+    # A tiny budget forces many query and candidate blocks
+    indices, scores = service.similarity_top_k(queries, candidates, k=5, max_block_bytes=12 * 64)
+
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_top_k_normalizes_and_pads(service):
+    indices, scores = service.similarity_top_k([[2.0, 0.0], [0.0, 3.0]], [[1.0, 0.0]], k=3)
+
+    assert indices.shape == (2, 1)
+    np.testing.assert_allclose(scores[:, 0], [1.0, 0.0], atol=1e-6)
+
+    indices, scores = service.similarity_top_k(random_unit(3), random_unit(3), k=3, exclude_self=True)
+    assert (indices[:, -1] == -1).all() and np.isneginf(scores[:, -1]).all()
+    assert all(i not in row for i, row in enumerate(indices.tolist()))
+
+
+def test_only_earlier_and_groups_mask_pairs(service):
+    matrix = random_unit(40, seed=3)
+    rows, cols = np.indices((40, 40))
+
+    indices, _ = service.similarity_top_k(matrix, matrix, k=3, only_earlier=True, max_block_bytes=12 * 64)
+    expected, _ = brute_force(matrix, matrix, 3, mask=cols >= rows)
+    valid = indices >= 0
+    np.testing.assert_array_equal(indices[valid], expected[valid])
+    assert (indices[0] == -1).all()
+
+    groups = [i % 4 for i in range(40)]
+    group_array = np.asarray(groups)
+    indices, _ = service.similarity_top_k(matrix, matrix, k=5, groups=groups, max_block_bytes=12 * 64)
+    expected, _ = brute_force(matrix, matrix, 5, mask=group_array[rows] == group_array[cols])
+    np.testing.assert_array_equal(indices, expected)
+
+
+def test_find_near_duplicates_points_at_the_earlier_item(service):
+    base = random_unit(4, seed=4)
+    embeddings = np.vstack([base, base[1] + 0.001, base[3] * 5])
+
+    duplicates = service.find_near_duplicates(embeddings, threshold=0.99)
+
+    assert set(duplicates) == {4, 5}
+    assert duplicates[4][0] == 1 and duplicates[5][0] == 3
+    assert duplicates[5][1] == pytest.approx(1.0, abs=1e-5)
+    assert service.find_near_duplicates(base[:1]) == {}
+
+
+def test_mmr_trades_relevance_for_diversity(service):
+    query = [1.0, 0.0]
+    candidates = [[1.0, 0.0], [0.99, 0.14], [0.8, -0.6]]
+
+    assert service.mmr(query, candidates, k=2, lambda_mult=1.0) == [0, 1]
+    assert service.mmr(query, candidates, k=2, lambda_mult=0.3) == [0, 2]
+    assert sorted(service.mmr(query, candidates, k=5)) == [0, 1, 2]
+    assert service.mmr(query, [], k=3) == []
@@ -0,0 +1,123 @@
+"""
+Tests for collection snapshot export/import
+"""
+import os
+
+import numpy as np
+import pytest
+
+from app.services.chroma import ChromaService
+from app.services.course_content import CourseContentService
+from app.services.snapshot import (
+    COURSE_STORE_FILE, export_collection, import_snapshot, read_manifest, resolve_snapshot_path
+)
+
+
+@pytest.fixture
+def chroma():
+    return ChromaService()
+
+
+def fill_collection(chroma, name, count=5, dimensions=8):
+    rng = np.random.default_rng(0)
+    ids = [f"doc_{i}" for i in range(count)]
+    embeddings = rng.standard_normal((count, dimensions)).astype(np.float32)
+    chroma.upsert_documents_sync(
+        collection_name=name,
+        documents=[f"document {i}" for i in range(count)],
+        metadatas=[{"position": i, "kind": "test"} for i in range(count)],
+        ids=ids,
+        embeddings=embeddings
+    )
+    return ids, embeddings
+
+
+def test_round_trip_keeps_records_and_embeddings(chroma, tmp_path):
+    ids, embeddings = fill_collection(chroma, "snapshot-source")
+
+    exported = export_collection("snapshot-source", str(tmp_path / "snap"), page_size=2, chroma=chroma)
+    manifest = read_manifest(str(tmp_path / "snap"))
+    assert exported["count"] == manifest["count"] == 5
+    assert manifest["dimensions"] == 8
+    assert "course_store" not in manifest["files"]
+
+    report = import_snapshot(str(tmp_path / "snap"), collection_name="snapshot-copy", replace=True, chroma=chroma)
+    assert report["imported"] == 5
+    assert report["failed_batches"] == []
+
+    copy = chroma.get_sync("snapshot-copy", ids=ids, include=["documents", "metadatas", "embeddings"])
+    rows = {doc_id: (document, metadata, embedding) for doc_id, document, metadata, embedding
+            in zip(copy.ids, copy.documents, copy.metadatas, copy.embeddings)}
+    for i, doc_id in enumerate(ids):
+        document, metadata, embedding = rows[doc_id]
+        assert document == f"document {i}"
+        assert metadata == {"position": i, "kind": "test"}
+        np.testing.assert_allclose(embedding, embeddings[i], rtol=1e-6)
+
+
+def test_replace_drops_existing_records(chroma, tmp_path):
+    fill_collection(chroma, "snapshot-replace", count=3)
+    export_collection("snapshot-replace", str(tmp_path / "snap"), chroma=chroma)
+    chroma.upsert_documents_sync("snapshot-replace", ["extra"], [{"kind": "extra"}], ["extra"], np.ones((1, 8)))
+
+    import_snapshot(str(tmp_path / "snap"), replace=True, chroma=chroma)
+
+    assert chroma.get_or_create_collection_sync("snapshot-replace").count() == 3
+
+
+@pytest.fixture
+def course_content(chroma):
+    """CourseContentService with an empty collection of its own, dropped again after the test"""
+    service = CourseContentService()
+    service.initialize_sync()
+    if service.collection_name in chroma.list_collection_names():
+        chroma.delete_collection_sync(service.collection_name)
+    yield service
+    chroma.delete_collection_sync(service.collection_name)
+    service.resync_sync()
+
+
+def test_course_content_snapshot_carries_the_course_store(chroma, course_content, tmp_path):
+    service = course_content
+    chroma.upsert_documents_sync(
+        collection_name=service.collection_name,
+        documents=["Snapshot course"],
+        metadatas=[{"course_id": "snap1", "course_code": "SNAP101", "content_type": "course_description"}],
+        ids=["course_snap1"],
+        embeddings=np.ones((1, 8))
+    )
+    service.store.put_course("snap1", {"course_summary": "summary"}, {"1": {"week_summary": "week one"}},
+                             course_code="SNAP101")
+
+    export_collection(service.collection_name, str(tmp_path / "snap"), chroma=chroma)
+    assert os.path.exists(tmp_path / "snap" / COURSE_STORE_FILE)
+    service.store.delete_course("snap1")
+
+    report = import_snapshot(str(tmp_path / "snap"), replace=True, chroma=chroma)
+
+    assert report["course_store_entries"] >= 1
+    hydrated = service.store.hydrate({"content_type": "lecture_chunk", "course_id": "snap1", "week_id": "1"})
+    assert hydrated["week_summary"] == "week one"
+    assert hydrated["course_summary"] == "summary"
+
+
+def test_empty_course_content_snapshot_still_resyncs(chroma, course_content, tmp_path):
+    course_content.store.put_course("stale1", {}, {}, course_code="STALE101")
+    export_collection(course_content.collection_name, str(tmp_path / "snap"), chroma=chroma)
+
+    report = import_snapshot(str(tmp_path / "snap"), replace=True, chroma=chroma)
+
+    assert report["imported"] == 0
+    assert report["resync"]["removed_from_store"] >= 1
+    assert not course_content.store.has_course("stale1")
+
+
+@pytest.mark.parametrize("name", ["../outside", "/etc", "a/../../b", "", "."])
+def test_snapshot_names_cannot_leave_the_snapshot_dir(name, tmp_path):
+    with pytest.raises(ValueError):
+        resolve_snapshot_path(name, base_dir=str(tmp_path))
+
+
+def test_snapshot_names_resolve_under_the_snapshot_dir(tmp_path):
+    assert resolve_snapshot_path("course-content", base_dir=str(tmp_path)) == \
+        os.path.join(os.path.realpath(tmp_path), "course-content")
@@ -0,0 +1,162 @@
+"""
+Tests for the in-process local vector backend
+"""
+import numpy as np
+import pytest
+
+from app.services.vector_backends import (
+    LOCAL_MAX_BATCH_SIZE, LocalCollection, LocalVectorClient, create_vector_client, matches_where
+)
+
+# High ef values make the HNSW search exact on a collection this small
+EXACT_HNSW = {"hnsw:construction_ef": 400, "hnsw:search_ef": 400, "hnsw:M": 32}
+
+
+def random_vectors(rows, dimensions=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((rows, dimensions)).astype(np.float32)
+
+
+def fill(collection, vectors):
+    collection.add(
+        ids=[f"id{i}" for i in range(len(vectors))],
+        embeddings=vectors,
+        metadatas=[{"n": i, "parity": "even" if i % 2 == 0 else "odd"} for i in range(len(vectors))],
+        documents=[f"document {i}" for i in range(len(vectors))]
+    )
+
+
+@pytest.mark.parametrize("space", ["l2", "cosine", "ip"])
+def test_brute_force_and_hnsw_return_the_same_ranking(space):
+    pytest.importorskip("hnswlib")
+    vectors, queries = random_vectors(300), random_vectors(5, seed=1)
+    metadata = {"hnsw:space": space, **EXACT_HNSW}
+    brute = LocalCollection("brute", metadata, hnsw_threshold=10 ** 9)
+    hnsw = LocalCollection("hnsw", metadata, hnsw_threshold=1)
+    fill(brute, vectors)
+    fill(hnsw, vectors)
+
+    for where in (None, {"parity": "odd"}):
+        expected = brute.query(query_embeddings=queries, n_results=10, where=where)
+        found = hnsw.query(query_embeddings=queries, n_results=10, where=where)
+        assert found["ids"] == expected["ids"]
+        np.testing.assert_allclose(found["distances"], expected["distances"], rtol=1e-4, atol=1e-4)
+    assert hnsw._hnsw is not None and brute._hnsw is None
+
+
+def test_distances_follow_the_collection_space():
+    vectors = np.asarray([[3.0, 4.0], [1.0, 0.0]], dtype=np.float32)
+    query = [[1.0, 0.0]]
+    cases = (
+        ("l2", ["near", "far"], [0.0, 20.0]),
+        # Inner product rewards the longer vector
+        ("ip", ["far", "near"], [-2.0, 0.0]),
+        ("cosine", ["near", "far"], [0.0, 0.4])
+    )
+    for space, ids, distances in cases:
+        collection = LocalCollection("space", {"hnsw:space": space})
+        collection.add(ids=["far", "near"], embeddings=vectors)
+        result = collection.query(query_embeddings=query, n_results=2)
+        assert result["ids"] == [ids]
+        np.testing.assert_allclose(result["distances"][0], distances, atol=1e-5)
+
+
+def test_matches_where_operators():
+    metadata = {"course": "CS101", "week": 3, "tag": "intro"}
+
+    assert matches_where(metadata, None)
+    assert matches_where(metadata, {"course": "CS101"})
+    assert matches_where(metadata, {"week": {"$gte": 3, "$lt": 4}})
+    assert not matches_where(metadata, {"week": {"$gt": 3}})
+    assert matches_where(metadata, {"course": {"$in": ["CS101", "CS102"]}})
+    assert matches_where(metadata, {"course": {"$nin": ["CS102"]}})
+    assert matches_where(metadata, {"tag": {"$ne": "advanced"}})
+    assert matches_where(metadata, {"$and": [{"course": "CS101"}, {"$or": [{"week": 1}, {"tag": "intro"}]}]})
+    assert not matches_where(metadata, {"$or": [{"week": 1}, {"tag": "advanced"}]})
+    # Missing keys never match, and mismatched types compare as false
+    assert not matches_where(metadata, {"missing": {"$ne": "x"}})
+    assert not matches_where(metadata, {"course": {"$gt": 3}})
+    with pytest.raises(ValueError):
+        matches_where(metadata, {"week": {"$regex": "3"}})
+
+
+def test_filtered_get_query_and_delete():
+    collection = LocalCollection("filters")
+    fill(collection, random_vectors(10))
+
+    odd = collection.get(where={"parity": "odd"}, include=["metadatas"])
+    assert odd["ids"] == [f"id{i}" for i in range(1, 10, 2)]
+    assert collection.get(where={"n": {"$lt": 3}}, limit=2, offset=1)["ids"] == ["id1", "id2"]
+    assert collection.get(where_document={"$contains": "document 7"})["ids"] == ["id7"]
+
+    result = collection.query(query_embeddings=random_vectors(1, seed=2), n_results=20, where={"parity": "even"})
+    assert len(result["ids"][0]) == 5
+    assert all(metadata["parity"] == "even" for metadata in result["metadatas"][0])
+
+    assert collection.delete(where={"parity": "even"}) == [f"id{i}" for i in range(0, 10, 2)]
+    assert collection.count() == 5
+
+
+def test_add_upsert_update_and_delete():
+    collection = LocalCollection("writes")
+    collection.add(ids=["a", "b"], embeddings=[[1.0, 0.0], [0.0, 1.0]], metadatas=[{"v": 1}, {"v": 1}],
+                   documents=["first", "second"])
+
+    # add skips existing ids, upsert replaces them
+    collection.add(ids=["a"], embeddings=[[5.0, 5.0]], metadatas=[{"v": 2}], documents=["ignored"])
+    assert collection.get(ids=["a"])["documents"] == ["first"]
+    collection.upsert(ids=["a", "c"], embeddings=[[0.0, 2.0], [3.0, 0.0]], metadatas=[{"v": 2}, {"v": 1}],
+                      documents=["replaced", "third"])
+    assert collection.get(ids=["a"], include=["documents", "metadatas"]) == {
+        "ids": ["a"], "documents": ["replaced"], "metadatas": [{"v": 2}], "embeddings": None
+    }
+
+    # update leaves fields passed as None unchanged and ignores unknown ids
+    collection.update(ids=["b", "missing"], metadatas=[{"v": 3}, {"v": 3}])
+    b = collection.get(ids=["b"], include=["documents", "metadatas", "embeddings"])
+    assert (b["documents"], b["metadatas"], b["embeddings"]) == (["second"], [{"v": 3}], [[0.0, 1.0]])
+
+    with pytest.raises(ValueError):
+        collection.upsert(ids=["d", "d"], embeddings=[[1.0, 1.0], [1.0, 1.0]])
+    with pytest.raises(ValueError):
+        collection.add(ids=["e"], embeddings=[[1.0, 1.0, 1.0]])
+
+    assert collection.delete(ids=["c", "missing"]) == ["c"]
+    assert sorted(collection.get()["ids"]) == ["a", "b"]
+    assert collection.query(query_embeddings=[[3.0, 0.0]], n_results=1)["ids"] == [["b"]]
+
+
+def test_compaction_keeps_surviving_records_searchable():
+    collection = LocalCollection("compact")
+    vectors = random_vectors(100)
+    fill(collection, vectors)
+
+    collection.delete(ids=[f"id{i}" for i in range(80)])
+
+    assert len(collection._ids) == 20
+    assert collection.count() == 20
+    result = collection.query(query_embeddings=vectors[90:91], n_results=1, include=["metadatas"])
+    assert result["ids"] == [["id90"]] and result["metadatas"] == [[{"n": 90, "parity": "even"}]]
+
+
+def test_client_collections_and_batch_size(monkeypatch):
+    monkeypatch.setenv("VECTOR_LOCAL_HNSW_THRESHOLD", "50")
+    client = create_vector_client("local", host="", port=0, persist_dir="")
+    assert isinstance(client, LocalVectorClient)
+    assert client.max_batch_size == LOCAL_MAX_BATCH_SIZE
+
+    collection = client.get_or_create_collection("first", metadata={"hnsw:space": "cosine"})
+    assert client.get_or_create_collection("first") is collection
+    assert collection.hnsw_threshold == 50 and collection.space == "cosine"
+    with pytest.raises(ValueError):
+        client.create_collection("first")
+    with pytest.raises(ValueError):
+        client.create_collection("ab")
+
+    client.delete_collection("first")
+    with pytest.raises(ValueError):
+        client.get_collection("first")
+    client.get_or_create_collection("second")
+    assert [c.name for c in client.list_collections()] == ["second"]
+    assert client.reset() and client.list_collections() == []
+    with pytest.raises(ValueError):
+        create_vector_client("memory", host="", port=0, persist_dir="")